@@ -1,9 +1,14 @@
 from google import genai
 from google.genai import types
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, NamedTuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from collections import deque
 import os
 import enum
+import queue
+import threading
+import time
 import config
 
 # ===== METADATA GENERATION MODELS =====
@@ -112,6 +117,9 @@ class TheologicalAnalysis(BaseModel):
     response_text: str
     cross_references: List[CrossReference]
 
+class FallbackAnalysis(TheologicalAnalysis):
+    """Placeholder used when a perspective could not be generated; never cached"""
+
 class MultiPerspectiveAnalysis(BaseModel):
     analyses: List[TheologicalAnalysis]
 
@@ -151,9 +159,109 @@ class ConsensusAnalysis(BaseModel):
     
     creedal_connections: List[CreedConnection]
 
+class FallbackConsensusAnalysis(ConsensusAnalysis):
+    """Placeholder used when the consensus could not be generated; never cached"""
+
+# Bump whenever the summary prompts change so cached perspectives are regenerated
+SUMMARY_PROMPT_VERSION = "v1"
+# Bump whenever the scholarly consensus prompt changes
+CONSENSUS_PROMPT_VERSION = "v1"
+
+class GenerationMode(str, enum.Enum):
+    PER_PERSPECTIVE = "per_perspective"  # One model call per perspective
+    BATCHED = "batched"                  # One structured call for all perspectives
+
+class PerspectiveTask(NamedTuple):
+    perspective: TheologicalPerspective
+    system_instruction: str
+    prompt: str
+    fallback_text: str
+    kind: str = 'per_perspective'  # Metrics label
+
+class GenerationMetrics:
+    """Thread-safe latency and token counters for model calls, grouped by call kind"""
+    
+    def __init__(self, sample_size: int = 500):
+        self._lock = threading.Lock()
+        self._sample_size = sample_size
+        self._kinds = {}
+    
+    def _stats(self, kind: str) -> dict:
+        if kind not in self._kinds:
+            self._kinds[kind] = {
+                'calls': 0,
+                'errors': 0,
+                'prompt_tokens': 0,
+                'output_tokens': 0,
+                'latencies': deque(maxlen=self._sample_size)
+            }
+        return self._kinds[kind]
+    
+    def record(self, kind: str, latency: float, usage=None, error: bool = False):
+        with self._lock:
+            stats = self._stats(kind)
+            stats['calls'] += 1
+            stats['latencies'].append(latency)
+            if error:
+                stats['errors'] += 1
+            if usage is not None:
+                stats['prompt_tokens'] += getattr(usage, 'prompt_token_count', None) or 0
+                stats['output_tokens'] += getattr(usage, 'candidates_token_count', None) or 0
+    
+    def increment(self, kind: str, counter: str, amount: int = 1):
+        with self._lock:
+            stats = self._stats(kind)
+            stats[counter] = stats.get(counter, 0) + amount
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for kind, stats in self._kinds.items():
+                latencies = sorted(stats['latencies'])
+                calls = stats['calls']
+                
+                def percentile(p):
+                    if not latencies:
+                        return None
+                    return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+                
+                result[kind] = {
+                    key: value for key, value in stats.items() if key != 'latencies'
+                }
+                result[kind].update({
+                    'latency_ms': {'p50': percentile(0.50), 'p95': percentile(0.95), 'p99': percentile(0.99)},
+                    'avg_prompt_tokens': round(stats['prompt_tokens'] / calls, 1) if calls else None,
+                    'avg_output_tokens': round(stats['output_tokens'] / calls, 1) if calls else None
+                })
+            return result
+
+# Shared by every request thread, so it bounds in-flight model calls process-wide
+_generation_executor = ThreadPoolExecutor(
+    max_workers=config.AI_MAX_CONCURRENT_CALLS,
+    thread_name_prefix='gemini'
+)
+
+# Perspective calls also time out in the HTTP client (milliseconds), so a call
+# abandoned at its deadline soon frees its executor thread
+_PERSPECTIVE_HTTP_OPTIONS = types.HttpOptions(timeout=config.AI_CALL_TIMEOUT_SECONDS * 1000)
+
 class GeminiClient:
     def __init__(self):
         self.client = genai.Client(api_key=config.GOOGLE_AI_STUDIO_API_KEY)
+        self.metrics = GenerationMetrics()
+        
+        # Guidelines and book names shared by the single- and multi-perspective prompts
+        self.analysis_guidelines = """Guidelines:
+- Be respectful of other theological traditions while maintaining your perspective
+- Cite specific verses that relate to your analysis using the format: Book Chapter:Verse or Book Chapter:Verse-Verse
+- When Strong's numbers are mentioned, reference the original language meanings to deepen your analysis. However, never directly reference Strong's numbers in your response.
+- Focus on practical application when relevant
+- Use scholarly but accessible language
+- Provide 2-5 cross-references that directly support your analysis (must be from the Bible directly)
+- Keep your response between 50-70 words
+- The only markdown formatting allowed is bold. Use this to add emphasis to specific terms or ideas. 2-3 uses per response."""
+        
+        self.book_names_instruction = """For cross-references, use these exact book names: Genesis, Exodus, Leviticus, Numbers, Deuteronomy, Joshua, Judges, Ruth, 1 Samuel, 2 Samuel, 1 Kings, 2 Kings, 1 Chronicles, 2 Chronicles, Ezra, Nehemiah, Esther, Job, Psalms, Proverbs, Ecclesiastes, Song of Solomon, Isaiah, Jeremiah, Lamentations, Ezekiel, Daniel, Hosea, Joel, Amos, Obadiah, Jonah, Micah, Nahum, Habakkuk, Zephaniah, Haggai, Zechariah, Malachi, Matthew, Mark, Luke, John, Acts, Romans, 1 Corinthians, 2 Corinthians, Galatians, Ephesians, Philippians, Colossians, 1 Thessalonians, 2 Thessalonians, 1 Timothy, 2 Timothy, Titus, Philemon, Hebrews, James, 1 Peter, 2 Peter, 1 John, 2 John, 3 John, Jude, Revelation"""
         
         # Base system prompt (70% static)
         self.base_system_prompt = """
@@ -164,20 +272,28 @@ Analyze the provided biblical text and respond with:
 2. Relevant cross-references that support your interpretation
 3. Historical and doctrinal context where appropriate
 
-Guidelines:
-- Be respectful of other theological traditions while maintaining your perspective
-- Cite specific verses that relate to your analysis using the format: Book Chapter:Verse or Book Chapter:Verse-Verse
-- When Strong's numbers are mentioned, reference the original language meanings to deepen your analysis. However, never directly reference Strong's numbers in your response.
-- Focus on practical application when relevant
-- Use scholarly but accessible language
-- Provide 2-5 cross-references that directly support your analysis (must be from the Bible directly)
-- Keep your response between 50-70 words
-- The only markdown formatting allowed is bold. Use this to add emphasis to specific terms or ideas. 2-3 uses per response.
+""" + self.analysis_guidelines + """
 
 {perspective_instructions}
 
-For cross-references, use these exact book names: Genesis, Exodus, Leviticus, Numbers, Deuteronomy, Joshua, Judges, Ruth, 1 Samuel, 2 Samuel, 1 Kings, 2 Kings, 1 Chronicles, 2 Chronicles, Ezra, Nehemiah, Esther, Job, Psalms, Proverbs, Ecclesiastes, Song of Solomon, Isaiah, Jeremiah, Lamentations, Ezekiel, Daniel, Hosea, Joel, Amos, Obadiah, Jonah, Micah, Nahum, Habakkuk, Zephaniah, Haggai, Zechariah, Malachi, Matthew, Mark, Luke, John, Acts, Romans, 1 Corinthians, 2 Corinthians, Galatians, Ephesians, Philippians, Colossians, 1 Thessalonians, 2 Thessalonians, 1 Timothy, 2 Timothy, Titus, Philemon, Hebrews, James, 1 Peter, 2 Peter, 1 John, 2 John, 3 John, Jude, Revelation
-"""
+""" + self.book_names_instruction + "\n"
+        
+        # Multi-perspective system prompt for batched mode (one call for all perspectives)
+        self.batched_system_prompt = """
+You are a biblical scholar providing theological analysis of one passage from several Christian perspectives at once.
+
+For each requested perspective, write an independent analysis that:
+1. Is rooted in that perspective's theology and tradition
+2. Includes relevant cross-references that support its interpretation
+3. Gives historical and doctrinal context where appropriate
+
+Return exactly one entry in "analyses" for each requested perspective, with perspective_name set to that perspective's identifier. Apply these guidelines to every entry independently:
+
+""" + self.analysis_guidelines + """
+
+{perspective_instructions}
+
+""" + self.book_names_instruction + "\n"
         
         # Perspective-specific instructions (30% variable)
         self.perspective_instructions = {
@@ -297,27 +413,54 @@ Emphasize Moravian theology including:
 """
         }
     
-    def generate_verse_summary(self, verse_text: str, verse_reference: str, perspectives: List[TheologicalPerspective], strongs_data: dict = None) -> MultiPerspectiveAnalysis:
+    def generate_verse_summary(self, verse_text: str, verse_reference: str, perspectives: List[TheologicalPerspective], strongs_data: dict = None, concurrent: bool = None, mode: str = None) -> MultiPerspectiveAnalysis:
         """Generate theological summaries from multiple perspectives for given verse(s)"""
-        analyses = []
+        if mode is None:
+            mode = config.AI_GENERATION_MODE
         
-        for perspective in perspectives:
-            system_instruction = self.base_system_prompt.format(
-                perspective=perspective.value.replace('_', ' ').title(),
-                perspective_instructions=self.perspective_instructions[perspective]
-            )
-            
-            # Build enhanced prompt with Strong's data if available
-            strongs_info = ""
-            if strongs_data and strongs_data.get('text_with_strongs'):
-                strongs_info = f"""
+        if mode == GenerationMode.BATCHED and len(perspectives) > 1:
+            # One structured call for every perspective; anything missing or malformed is retried individually
+            batched = self._generate_batched_analyses(verse_text, verse_reference, perspectives, strongs_data)
+            missing = [p for p in perspectives if p not in batched]
+            if missing:
+                self.metrics.increment('batched', 'retried_perspectives', len(missing))
+            retried = self._run_perspective_tasks([
+                self._summary_task(p, verse_text, verse_reference, strongs_data, kind='batched_retry')
+                for p in missing
+            ], concurrent)
+            batched.update(zip(missing, retried))
+            return MultiPerspectiveAnalysis(analyses=[batched[p] for p in perspectives])
+        
+        tasks = [
+            self._summary_task(perspective, verse_text, verse_reference, strongs_data)
+            for perspective in perspectives
+        ]
+        
+        return MultiPerspectiveAnalysis(analyses=self._run_perspective_tasks(tasks, concurrent))
+    
+    def _summary_strongs_info(self, strongs_data: dict = None) -> str:
+        """Strong's context block for summary prompts"""
+        if not (strongs_data and strongs_data.get('text_with_strongs')):
+            return ""
+        
+        return f"""
 Text with Strong's numbers: "{strongs_data['text_with_strongs']}"
 Key Strong's numbers in this passage: {', '.join(strongs_data.get('strongs_numbers', []))}
 
 Note: Use the Strong's numbers to provide deeper insights into the original Hebrew/Greek meanings where relevant to your theological perspective.
 """
-            
-            prompt = f"""
+    
+    def _summary_task(self, perspective: TheologicalPerspective, verse_text: str, verse_reference: str, strongs_data: dict = None, kind: str = 'per_perspective') -> PerspectiveTask:
+        """Build the single-perspective summary call for one perspective"""
+        system_instruction = self.base_system_prompt.format(
+            perspective=perspective.value.replace('_', ' ').title(),
+            perspective_instructions=self.perspective_instructions[perspective]
+        )
+        
+        # Build enhanced prompt with Strong's data if available
+        strongs_info = self._summary_strongs_info(strongs_data)
+        
+        prompt = f"""
 Analyze this biblical passage from a {perspective.value.replace('_', ' ')} perspective:
 
 Reference: {verse_reference}
@@ -326,31 +469,235 @@ Text: "{verse_text}"
 
 Provide your theological analysis with relevant cross-references.
 """
-            
-            try:
-                response = self.client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_instruction,
-                        response_mime_type="application/json",
-                        response_schema=TheologicalAnalysis,
-                    )
+        
+        return PerspectiveTask(
+            perspective=perspective,
+            system_instruction=system_instruction,
+            prompt=prompt,
+            fallback_text=f"Analysis temporarily unavailable for {perspective.value.replace('_', ' ')} perspective.",
+            kind=kind
+        )
+    
+    def _generate_batched_analyses(self, verse_text: str, verse_reference: str, perspectives: List[TheologicalPerspective], strongs_data: dict = None) -> Dict[TheologicalPerspective, TheologicalAnalysis]:
+        """Ask for every perspective in one call; return only the valid analyses, keyed by perspective"""
+        perspective_instructions = "\n".join(
+            f"### {p.value} ({p.value.replace('_', ' ').title()})\n{self.perspective_instructions[p].strip()}\n"
+            for p in perspectives
+        )
+        system_instruction = self.batched_system_prompt.format(perspective_instructions=perspective_instructions)
+        
+        strongs_info = self._summary_strongs_info(strongs_data)
+        
+        prompt = f"""
+Analyze this biblical passage separately from each of these perspectives: {', '.join(p.value for p in perspectives)}
+
+Reference: {verse_reference}
+Text: "{verse_text}"
+{strongs_info}
+
+Provide each perspective's theological analysis with relevant cross-references.
+"""
+        
+        # One call writes every perspective, so it gets a per-perspective share of extra time
+        timeout = config.AI_CALL_TIMEOUT_SECONDS + (len(perspectives) - 1) * config.AI_BATCHED_CALL_TIMEOUT_STEP_SECONDS
+        # On the shared executor, so the call counts against AI_MAX_CONCURRENT_CALLS
+        future = _generation_executor.submit(
+            self._call_model,
+            'batched',
+            model="gemini-2.5-flash",
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=system_instruction,
+                response_mime_type="application/json",
+                response_schema=MultiPerspectiveAnalysis,
+                http_options=types.HttpOptions(timeout=int(timeout * 1000)),
+            )
+        )
+        try:
+            parsed = future.result(timeout=timeout).parsed
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"Timed out generating batched analysis after {timeout}s")
+            return {}
+        except Exception as e:
+            print(f"Error generating batched analysis: {str(e)}")
+            return {}
+        
+        valid = {}
+        for analysis in (parsed.analyses if parsed else []):
+            if analysis.perspective_name in perspectives and analysis.perspective_name not in valid and analysis.response_text.strip():
+                valid[analysis.perspective_name] = analysis
+        return valid
+    
+    def _call_model(self, kind: str, **kwargs):
+        """Call generate_content, recording latency and token usage under `kind`"""
+        start = time.perf_counter()
+        try:
+            response = self.client.models.generate_content(**kwargs)
+        except Exception:
+            self.metrics.record(kind, time.perf_counter() - start, error=True)
+            raise
+        
+        self.metrics.record(kind, time.perf_counter() - start, getattr(response, 'usage_metadata', None))
+        return response
+    
+    def _generate_perspective_analysis(self, task: PerspectiveTask) -> TheologicalAnalysis:
+        """Make one model call for one perspective"""
+        response = self._call_model(
+            task.kind,
+            model="gemini-2.5-flash",
+            contents=task.prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=task.system_instruction,
+                response_mime_type="application/json",
+                response_schema=TheologicalAnalysis,
+                http_options=_PERSPECTIVE_HTTP_OPTIONS,
+            )
+        )
+        
+        analysis = response.parsed
+        analysis.perspective_name = task.perspective  # Keyed by what was asked for, not what the model echoed
+        return analysis
+    
+    def _stream_perspective_analysis(self, task: PerspectiveTask, on_text) -> TheologicalAnalysis:
+        """Make one streaming model call for one perspective, passing each text chunk to `on_text`"""
+        start = time.perf_counter()
+        chunks = []
+        usage = None
+        try:
+            for chunk in self.client.models.generate_content_stream(
+                model="gemini-2.5-flash",
+                contents=task.prompt,
+                config=types.GenerateContentConfig(
+                    system_instruction=task.system_instruction,
+                    response_mime_type="application/json",
+                    response_schema=TheologicalAnalysis,
+                    http_options=_PERSPECTIVE_HTTP_OPTIONS,
                 )
-                
-                analysis = response.parsed
-                analyses.append(analysis)
-                
+            ):
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    on_text(chunk.text)
+                usage = getattr(chunk, 'usage_metadata', None) or usage
+        except Exception:
+            self.metrics.record(task.kind, time.perf_counter() - start, error=True)
+            raise
+        
+        self.metrics.record(task.kind, time.perf_counter() - start, usage)
+        analysis = TheologicalAnalysis.model_validate_json(''.join(chunks))
+        analysis.perspective_name = task.perspective
+        return analysis
+    
+    def _run_perspective_tasks(self, tasks: List[PerspectiveTask], concurrent: bool = None) -> List[TheologicalAnalysis]:
+        """Run per-perspective calls and return their analyses in task order"""
+        results = [None] * len(tasks)
+        for kind, index, payload in self._iter_perspective_tasks(tasks, concurrent):
+            if kind == 'analysis':
+                results[index] = payload
+        return results
+    
+    def _iter_perspective_tasks(self, tasks: List[PerspectiveTask], concurrent: bool = None, stream_tokens: bool = False):
+        """Run per-perspective calls, yielding (kind, task index, payload) events as they happen.
+        
+        Every task yields exactly one ('analysis', index, analysis) event, in
+        completion order. With stream_tokens, model output is also yielded as
+        ('delta', index, text) chunks while the call runs.
+        
+        Concurrent mode keeps at most AI_REQUEST_FANOUT calls from this request
+        in flight, on the shared executor that caps the whole process at
+        AI_MAX_CONCURRENT_CALLS. A call that fails or outlives
+        AI_CALL_TIMEOUT_SECONDS is replaced by its fallback analysis. A
+        timed-out call can't be interrupted, so it keeps counting against this
+        request's fan-out until it actually returns (the HTTP timeout bounds
+        that), rather than letting the request start more calls than its share.
+        """
+        if concurrent is None:
+            concurrent = config.AI_CONCURRENT_PERSPECTIVES
+        
+        def fallback(task):
+            return FallbackAnalysis(
+                perspective_name=task.perspective,
+                response_text=task.fallback_text,
+                cross_references=[]
+            )
+        
+        if not stream_tokens and (not concurrent or len(tasks) <= 1):
+            for index, task in enumerate(tasks):
+                try:
+                    analysis = self._generate_perspective_analysis(task)
+                except Exception as e:
+                    print(f"Error generating analysis for {task.perspective.value}: {str(e)}")
+                    analysis = fallback(task)
+                yield 'analysis', index, analysis
+            return
+        
+        # Calls run on the shared executor and report back through this queue
+        events = queue.Queue()
+        queued = deque(enumerate(tasks))
+        running = {}  # index -> (future, deadline)
+        abandoned = set()  # Indexes of timed-out calls still occupying an executor thread
+        fanout = max(1, config.AI_REQUEST_FANOUT if concurrent else 1)
+        
+        def run(index, task):
+            try:
+                if stream_tokens:
+                    analysis = self._stream_perspective_analysis(task, lambda text: events.put(('delta', index, text)))
+                else:
+                    analysis = self._generate_perspective_analysis(task)
+                events.put(('analysis', index, analysis))
             except Exception as e:
-                print(f"Error generating analysis for {perspective.value}: {str(e)}")
-                # Create a fallback response
-                analyses.append(TheologicalAnalysis(
-                    perspective_name=perspective,
-                    response_text=f"Analysis temporarily unavailable for {perspective.value.replace('_', ' ')} perspective.",
-                    cross_references=[]
-                ))
-        
-        return MultiPerspectiveAnalysis(analyses=analyses)
+                events.put(('error', index, e))
+        
+        def submit_next():
+            while queued and len(running) + len(abandoned) < fanout:
+                index, task = queued.popleft()
+                future = _generation_executor.submit(run, index, task)
+                running[index] = (future, time.monotonic() + config.AI_CALL_TIMEOUT_SECONDS)
+        
+        submit_next()
+        
+        while running or queued:
+            if running:
+                next_deadline = min(deadline for _, deadline in running.values())
+                wait = max(0, next_deadline - time.monotonic())
+            else:
+                # Only abandoned calls hold this request's fan-out; wait for one to return
+                wait = config.AI_CALL_TIMEOUT_SECONDS
+            try:
+                kind, index, payload = events.get(timeout=wait)
+            except queue.Empty:
+                kind = None
+                if not running:
+                    # Stuck past the HTTP timeout too; stop waiting on them
+                    print(f"Abandoned calls never returned for {len(abandoned)} perspective(s)")
+                    abandoned.clear()
+                    submit_next()
+            
+            if kind is not None and index in running:
+                if kind == 'delta':
+                    yield 'delta', index, payload
+                else:
+                    if kind == 'error':
+                        print(f"Error generating analysis for {tasks[index].perspective.value}: {str(payload)}")
+                        payload = fallback(tasks[index])
+                    del running[index]
+                    submit_next()
+                    yield 'analysis', index, payload
+            elif kind in ('analysis', 'error') and index in abandoned:
+                # A timed-out call finally returned; its result was already replaced
+                abandoned.discard(index)
+                submit_next()
+            
+            # Checked after every event, so a call that keeps streaming still times out
+            now = time.monotonic()
+            for index, (future, deadline) in list(running.items()):
+                if now >= deadline:
+                    if not future.cancel():
+                        abandoned.add(index)
+                    print(f"Timed out generating analysis for {tasks[index].perspective.value}")
+                    del running[index]
+                    submit_next()
+                    yield 'analysis', index, fallback(tasks[index])
     
     def generate_scholarly_consensus_analysis(self, verse_text: str, verse_reference: str, existing_analyses: List[TheologicalAnalysis]) -> ConsensusAnalysis:
         """Generate comprehensive scholarly consensus analysis from existing perspective analyses"""
@@ -414,7 +761,8 @@ Provide specific examples and avoid generalizations. Your analysis should be sch
 """
         
         try:
-            response = self.client.models.generate_content(
+            response = self._call_model(
+                'consensus',
                 model='gemini-2.5-flash',
                 contents=f"""
 Biblical Passage: {verse_reference}
@@ -437,7 +785,7 @@ Generate a comprehensive scholarly consensus analysis examining the agreement an
         except Exception as e:
             print(f"Error generating scholarly consensus analysis: {e}")
             # Return a basic fallback response with flattened structure
-            return ConsensusAnalysis(
+            return FallbackConsensusAnalysis(
                 overall_consensus_score=0.5,
                 consensus_classification="moderate",
                 summary="Unable to generate detailed consensus analysis at this time.",
@@ -454,9 +802,27 @@ Generate a comprehensive scholarly consensus analysis examining the agreement an
                 creedal_connections=[]
             )
     
-    def generate_question_response(self, verse_text: str, verse_reference: str, user_question: str, perspectives: List[str], strongs_data: dict = None) -> MultiPerspectiveAnalysis:
+    def generate_question_response(self, verse_text: str, verse_reference: str, user_question: str, perspectives: List[str], strongs_data: dict = None, concurrent: bool = None) -> MultiPerspectiveAnalysis:
         """Generate responses to user questions from multiple theological perspectives"""
-        analyses = []
+        tasks = self._question_tasks(verse_text, verse_reference, user_question, perspectives, strongs_data)
+        return MultiPerspectiveAnalysis(analyses=self._run_perspective_tasks(tasks, concurrent))
+    
+    def stream_verse_summary(self, verse_text: str, verse_reference: str, perspectives: List[TheologicalPerspective], strongs_data: dict = None, stream_tokens: bool = False):
+        """Yield summary events as each perspective finishes; see _iter_perspective_tasks"""
+        tasks = [
+            self._summary_task(perspective, verse_text, verse_reference, strongs_data)
+            for perspective in perspectives
+        ]
+        return self._iter_perspective_tasks(tasks, concurrent=True, stream_tokens=stream_tokens)
+    
+    def stream_question_response(self, verse_text: str, verse_reference: str, user_question: str, perspectives: List[str], strongs_data: dict = None, stream_tokens: bool = False):
+        """Yield question response events as each perspective finishes; see _iter_perspective_tasks"""
+        tasks = self._question_tasks(verse_text, verse_reference, user_question, perspectives, strongs_data)
+        return self._iter_perspective_tasks(tasks, concurrent=True, stream_tokens=stream_tokens)
+    
+    def _question_tasks(self, verse_text: str, verse_reference: str, user_question: str, perspectives: List[str], strongs_data: dict = None) -> List[PerspectiveTask]:
+        """Build the per-perspective calls for a user question"""
+        tasks = []
         
         for perspective_str in perspectives:
             perspective = TheologicalPerspective(perspective_str)
@@ -487,30 +853,15 @@ Question: {user_question}
 Provide a thoughtful answer that addresses the question directly, supported by relevant cross-references.
 """
             
-            try:
-                response = self.client.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_instruction,
-                        response_mime_type="application/json",
-                        response_schema=TheologicalAnalysis,
-                    )
-                )
-                
-                analysis = response.parsed
-                analyses.append(analysis)
-                
-            except Exception as e:
-                print(f"Error generating response for {perspective.value}: {str(e)}")
-                # Create a fallback response
-                analyses.append(TheologicalAnalysis(
-                    perspective_name=perspective,
-                    response_text=f"Response temporarily unavailable for {perspective.value.replace('_', ' ')} perspective.",
-                    cross_references=[]
-                ))
-        
-        return MultiPerspectiveAnalysis(analyses=analyses)
+            tasks.append(PerspectiveTask(
+                perspective=perspective,
+                system_instruction=system_instruction,
+                prompt=prompt,
+                fallback_text=f"Response temporarily unavailable for {perspective.value.replace('_', ' ')} perspective.",
+                kind='question'
+            ))
+        
+        return tasks
 
 # Initialize the client
 gemini_client = GeminiClient()
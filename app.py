@@ -7,10 +7,14 @@ import config
 
 app = Flask(__name__)
 
-# Database configuration from config.py
-DATABASE_URL = f"postgresql://{config.POSTGRES_USER}:{config.POSTGRES_PASSWORD}@{config.POSTGRES_HOST}:{config.POSTGRES_PORT}/{config.POSTGRES_DB}"
+# Database configuration from config.py (DATABASE_URL overrides it, e.g. for tests)
+DATABASE_URL = os.environ.get('DATABASE_URL') or f"postgresql://{config.POSTGRES_USER}:{config.POSTGRES_PASSWORD}@{config.POSTGRES_HOST}:{config.POSTGRES_PORT}/{config.POSTGRES_DB}"
 app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Pool sizing, pre-ping, recycling, statement timeout and checkout-wait metrics
+from db_pool import engine_options
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
 app.config['SECRET_KEY'] = config.SECRET_KEY
 
 # Initialize extensions
@@ -22,7 +26,7 @@ migrate = Migrate(app, db)
 CORS(app, origins="*", supports_credentials=True)
 
 # Import models after db initialization
-from models import Book, Chapter, Verse, VerseSummary, SearchCache, StrongsEntry, VerseStrongsMapping, BookMetadata, ChapterMetadata
+from models import Book, Chapter, Verse, VerseSummary, StrongsEntry, VerseStrongsMapping, BookMetadata, ChapterMetadata
 
 # Import and register blueprints
 from routes.bible import bible_bp
@@ -39,6 +43,15 @@ app.register_blueprint(metadata_bp, url_prefix='/api/metadata')
 app.register_blueprint(search_bp, url_prefix='/api/search')
 app.register_blueprint(prophecy_bp, url_prefix='/api/prophecy')
 
+# Warm the suggestion index before the first /api/search/suggestions request
+if config.AUTOCOMPLETE_PRELOAD:
+    from autocomplete import start_autocomplete_preload
+    start_autocomplete_preload(app)
+
+# CLI commands for offline builds
+from commands import register_commands
+register_commands(app)
+
 @app.route('/')
 def health_check():
     return {'status': 'healthy', 'message': 'Libro Bible API is running'}
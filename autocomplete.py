@@ -0,0 +1,219 @@
+"""In-memory autocomplete index for /api/search/suggestions.
+
+Built once per worker from the canon store, Strong's transliterations and
+chapter summaries: in the background at app start with AUTOCOMPLETE_PRELOAD
+on (a suggestion request that arrives mid-build waits for it), otherwise by
+the first suggestion request. Keys are normalized (lowercased, accents
+stripped) and kept in a sorted array, so a prefix lookup is a pair of bisects. Every word-start
+inside a multi-word name is indexed too ("john" finds "1 John").
+Short prefixes, whose ranges are large, are answered from precomputed top-k
+lists.
+"""
+from bisect import bisect_left
+from collections import Counter
+import heapq
+import re
+import threading
+import unicodedata
+
+from canon import get_canon
+from models import db, ChapterMetadata, StrongsEntry
+from search_service import STOP_WORDS
+
+MAX_WORDS = 5000  # Most frequent KJV words offered as suggestions
+SHORT_PREFIX_LENGTHS = (2, 3)
+TOP_K = 25
+
+# Higher ranks sort first; frequency only orders entries of the same type
+TYPE_RANKS = {'book': 4, 'strongs': 3, 'word': 2, 'chapter': 1}
+
+_WORD_PATTERN = re.compile(r"[A-Za-z]+")
+
+
+def normalize_key(text):
+    """Lowercase, strip accents and collapse everything but letters/digits to single spaces"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(re.findall(r'[0-9a-z]+', stripped.lower()))
+
+
+class AutocompleteIndex:
+    """Immutable prefix index over typed suggestion entries"""
+
+    def __init__(self, entries):
+        # entries: iterable of (keys, score, suggestion dict)
+        self.suggestions = []
+        self.scores = []
+        keyed = []
+
+        for keys, score, suggestion in entries:
+            entry_id = len(self.suggestions)
+            self.suggestions.append(suggestion)
+            self.scores.append(score)
+            for key in keys:
+                key = normalize_key(key)
+                if not key:
+                    continue
+                words = key.split(' ')
+                # Index the full key and every word-start suffix of it
+                for i in range(len(words)):
+                    keyed.append((' '.join(words[i:]), entry_id))
+
+        keyed = sorted(set(keyed))
+        self.keys = [key for key, _ in keyed]
+        self.entry_ids = [entry_id for _, entry_id in keyed]
+
+        # Precomputed best entries for short prefixes
+        self._top = {}
+        for length in SHORT_PREFIX_LENGTHS:
+            buckets = {}
+            for key, entry_id in keyed:
+                if len(key) >= length:
+                    buckets.setdefault(key[:length], set()).add(entry_id)
+            for prefix, entry_ids in buckets.items():
+                self._top[prefix] = heapq.nlargest(TOP_K, entry_ids, key=self._sort_key)
+
+    def _sort_key(self, entry_id):
+        return (TYPE_RANKS[self.suggestions[entry_id]['type']], self.scores[entry_id], -entry_id)
+
+    def suggest(self, query, limit=10):
+        prefix = normalize_key(query)
+        if not prefix:
+            return []
+
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + '\uffff')
+
+        # Exact key matches always lead
+        exact = []
+        i = lo
+        while i < hi and self.keys[i] == prefix:
+            if self.entry_ids[i] not in exact:
+                exact.append(self.entry_ids[i])
+            i += 1
+        exact.sort(key=self._sort_key, reverse=True)
+
+        if prefix in self._top:
+            ranked = self._top[prefix]
+        else:
+            ranked = heapq.nlargest(TOP_K, set(self.entry_ids[lo:hi]), key=self._sort_key)
+
+        results = []
+        for entry_id in exact + ranked:
+            if entry_id not in results:
+                results.append(entry_id)
+            if len(results) >= limit:
+                break
+        return [self.suggestions[entry_id] for entry_id in results]
+
+    @classmethod
+    def build(cls, canon=None):
+        """Build the index from the canon store (the worker's, unless given) and the database"""
+        if canon is None:
+            canon = get_canon()
+        entries = []
+
+        # Books
+        for book in canon.books:
+            entries.append(([book.name, book.abbreviation], 0, {
+                'type': 'book',
+                'id': book.id,
+                'name': book.name,
+                'display': f"Book: {book.name}"
+            }))
+
+        # Common KJV words, weighted by frequency
+        counts = Counter()
+        for text in canon.texts:
+            counts.update(word.lower() for word in _WORD_PATTERN.findall(text))
+        common = [
+            (word, count) for word, count in counts.most_common()
+            if len(word) >= 3 and word not in STOP_WORDS
+        ][:MAX_WORDS]
+        for word, count in common:
+            entries.append(([word], count, {
+                'type': 'word',
+                'text': word,
+                'count': count,
+                'display': f"Word: {word}"
+            }))
+
+        # Strong's numbers and transliterations
+        strongs_rows = db.session.query(
+            StrongsEntry.strongs_number, StrongsEntry.transliteration
+        ).all()
+        for strongs_number, transliteration in strongs_rows:
+            keys = [strongs_number] + ([transliteration] if transliteration else [])
+            entries.append((keys, 0, {
+                'type': 'strongs',
+                'strongs_number': strongs_number,
+                'transliteration': transliteration,
+                'display': f"Strong's {strongs_number}: {transliteration}" if transliteration else f"Strong's {strongs_number}"
+            }))
+
+        # Chapter summary keywords
+        summary_rows = db.session.query(
+            ChapterMetadata.chapter_id, ChapterMetadata.summary
+        ).all()
+        for chapter_id, summary in summary_rows:
+            position = canon.get_chapter(chapter_id)
+            if position is None:
+                continue
+            book = canon.chapter_book(position)
+            reference = f"{book.name} {canon.chapter_numbers[position]}"
+            keywords = {
+                word.lower() for word in _WORD_PATTERN.findall(summary)
+                if len(word) >= 4 and word.lower() not in STOP_WORDS
+            }
+            entries.append((sorted(keywords), 0, {
+                'type': 'chapter',
+                'id': chapter_id,
+                'book_id': book.id,
+                'chapter_number': canon.chapter_numbers[position],
+                'reference': reference,
+                'display': f"Chapter: {reference}"
+            }))
+
+        return cls(entries)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index():
+    """Return the worker's autocomplete index, building it on first use"""
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AutocompleteIndex.build()
+    return _index
+
+
+def _preload(app):
+    with app.app_context():
+        try:
+            get_autocomplete_index()
+        except Exception as e:
+            print(f"Error preloading autocomplete index: {str(e)}")
+
+
+def start_autocomplete_preload(app):
+    """Build the worker's index in a background thread, so the first suggestion request doesn't pay for it"""
+    thread = threading.Thread(target=_preload, args=(app,), name='autocomplete-preload', daemon=True)
+    thread.start()
+    return thread
+
+
+def reload_autocomplete_index(index=None):
+    """Replace the autocomplete index with `index`, or a rebuilt one (e.g. after a data import)"""
+    global _index
+
+    # Build outside the lock; readers keep the old index until the swap
+    if index is None:
+        index = AutocompleteIndex.build()
+    with _index_lock:
+        _index = index
+    return _index
@@ -0,0 +1,529 @@
+"""Shared cache API with pluggable storage tiers.
+
+A Cache is a namespace over an ordered list of tiers: a per-worker LRU
+(MemoryTier) in front of an optional shared tier picked by
+CACHE_SHARED_BACKEND. The shared tier is one of:
+
+    'database'   the cache_entries table (default)
+    'redis'      any Redis-compatible server at CACHE_REDIS_URL (needs the redis package)
+    'file'       JSON files under CACHE_FILE_DIRECTORY, shared by workers on one host
+    None         memory only
+
+Keys are namespaced and versioned as ``namespace:version:key``; keys longer
+than MAX_KEY_LENGTH are replaced by their sha256. The version is the cache's
+own version string, plus the global data version for caches created with
+data_versioned=True. Bumping either one invalidates the whole
+namespace without touching storage. A hit in a lower tier is copied into the
+tiers above it. get_or_set() coalesces identical concurrent misses with
+SingleFlight within a worker, and with an advisory lock across workers when
+there is a shared tier.
+
+Shared tiers hold JSON-serializable values only; memory-only caches can hold
+anything. Expired and least recently used shared entries are trimmed by a
+background thread every CACHE_EVICTION_INTERVAL_SECONDS; the database tier
+records last access in memory and writes it in a batch before each trim.
+"""
+from collections import Counter, OrderedDict
+from datetime import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+import config
+from data_version import get_data_version
+from models import db, CacheEntry
+from singleflight import SingleFlight, advisory_lock_id, advisory_locks
+
+try:
+    import redis
+except ImportError:  # Only needed when CACHE_SHARED_BACKEND = 'redis'
+    redis = None
+
+_MISSING = object()
+
+_EVICTION_LOCK_ID = advisory_lock_id('cache_entries_eviction')
+
+# Longer keys are stored by their sha256, well inside cache_entries.key (512)
+MAX_KEY_LENGTH = 200
+
+
+def _expires_at(ttl):
+    """Absolute expiry as a Unix timestamp, or None for no expiry"""
+    return time.time() + ttl if ttl else None
+
+
+# ===== TIERS =====
+# Each tier stores (value, expires_at) under a full key and knows how to drop a
+# whole namespace. get() returns (value, expires_at) or (_MISSING, None).
+
+class MemoryTier:
+    """Per-worker LRU bounded by entry count"""
+    name = 'memory'
+    shared = False
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING, None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return _MISSING, None
+            self._entries.move_to_end(key)
+            return value, expires_at
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, namespace):
+        prefix = f"{namespace}:"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DatabaseTier:
+    """The cache_entries table, on its own connections so cache writes never commit the request's session.
+
+    Reads are plain SELECTs; the keys they hit are remembered in memory and
+    their accessed_at is written in one batch at the start of each eviction
+    pass, so least-recently-used trimming costs one UPDATE per interval
+    rather than one per hit.
+    """
+    name = 'database'
+    shared = True
+
+    def __init__(self):
+        self._touched = set()
+        self._touched_lock = threading.Lock()
+
+    @staticmethod
+    def entry_query(key):
+        """The unexpired value and expiry stored under a key"""
+        return select(CacheEntry.value, CacheEntry.expires_at).where(
+            CacheEntry.key == key, or_(CacheEntry.expires_at.is_(None), CacheEntry.expires_at > datetime.utcnow())
+        )
+
+    def get(self, key):
+        with db.engine.connect() as connection:
+            row = connection.execute(self.entry_query(key)).first()
+
+        if row is None:
+            return _MISSING, None
+        with self._touched_lock:
+            self._touched.add(key)
+        expires_at = (row.expires_at - datetime(1970, 1, 1)).total_seconds() if row.expires_at else None
+        return row.value, expires_at
+
+    def set(self, key, value, expires_at):
+        now = datetime.utcnow()
+        stmt = insert(CacheEntry).values(
+            key=key,
+            namespace=key.split(':', 1)[0],
+            value=value,
+            expires_at=datetime.utcfromtimestamp(expires_at) if expires_at else None,
+            accessed_at=now,
+            updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={
+                'value': stmt.excluded.value,
+                'expires_at': stmt.excluded.expires_at,
+                'accessed_at': stmt.excluded.accessed_at,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        with db.engine.begin() as connection:
+            connection.execute(stmt)
+
+    def delete(self, key):
+        with db.engine.begin() as connection:
+            connection.execute(delete(CacheEntry).where(CacheEntry.key == key))
+
+    def clear(self, namespace):
+        with db.engine.begin() as connection:
+            connection.execute(delete(CacheEntry).where(CacheEntry.namespace == namespace))
+
+    def flush_touched(self):
+        """Write accessed_at for the keys read since the last flush; returns how many keys were flushed"""
+        with self._touched_lock:
+            keys, self._touched = self._touched, set()
+        if not keys:
+            return 0
+
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(
+                    db.text('UPDATE cache_entries SET accessed_at = :now WHERE key = ANY(:keys)'),
+                    {'now': datetime.utcnow(), 'keys': sorted(keys)}
+                )
+        except Exception:
+            # Keep them for the next pass
+            with self._touched_lock:
+                self._touched |= keys
+            raise
+        return len(keys)
+
+    def evict(self, max_entries):
+        """Flush last access, drop expired rows, then the least recently used beyond max_entries; returns rows deleted per namespace"""
+        self.flush_touched()
+
+        with db.engine.begin() as connection:
+            locked = connection.execute(
+                db.text('SELECT pg_try_advisory_xact_lock(:lock_id)'), {'lock_id': _EVICTION_LOCK_ID}
+            ).scalar()
+            if not locked:
+                return Counter()
+
+            expired = connection.execute(
+                db.text('DELETE FROM cache_entries WHERE expires_at <= :now RETURNING namespace'),
+                {'now': datetime.utcnow()}
+            ).scalars()
+            evicted = Counter(expired)
+            overflow = connection.execute(db.text("""
+                DELETE FROM cache_entries WHERE key IN (
+                    SELECT key FROM cache_entries
+                    ORDER BY accessed_at DESC NULLS LAST
+                    OFFSET :max_entries
+                )
+                RETURNING namespace
+            """), {'max_entries': max_entries}).scalars()
+            evicted.update(overflow)
+        return evicted
+
+
+class RedisTier:
+    """Any Redis-compatible server; expiry is left to the server"""
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("CACHE_SHARED_BACKEND is 'redis' but the redis package is not installed")
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._client.get(key)
+        if raw is None:
+            return _MISSING, None
+        entry = json.loads(raw)
+        return entry['value'], entry['expires_at']
+
+    def set(self, key, value, expires_at):
+        raw = json.dumps({'value': value, 'expires_at': expires_at})
+        if expires_at is not None:
+            self._client.set(key, raw, px=max(1, int((expires_at - time.time()) * 1000)))
+        else:
+            self._client.set(key, raw)
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def clear(self, namespace):
+        keys = list(self._client.scan_iter(match=f"{namespace}:*", count=500))
+        if keys:
+            self._client.delete(*keys)
+
+    def evict(self, max_entries):
+        # The server expires keys itself and its maxmemory policy bounds size
+        return Counter()
+
+
+class FileTier:
+    """One JSON file per entry under directory/namespace/, written atomically"""
+    name = 'file'
+    shared = True
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        namespace = key.split(':', 1)[0]
+        return os.path.join(self.directory, namespace, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING, None
+        if entry['key'] != key or (entry['expires_at'] is not None and entry['expires_at'] <= time.time()):
+            return _MISSING, None
+        return entry['value'], entry['expires_at']
+
+    def set(self, key, value, expires_at):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'value': value, 'expires_at': expires_at}, f)
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self, namespace):
+        shutil.rmtree(os.path.join(self.directory, namespace), ignore_errors=True)
+
+    def evict(self, max_entries):
+        """Drop expired files, then the least recently modified beyond max_entries; returns files removed per namespace"""
+        files = []
+        removed = Counter()
+        now = time.time()
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        expires_at = json.load(f)['expires_at']
+                    if expires_at is not None and expires_at <= now:
+                        os.unlink(path)
+                        removed[os.path.basename(root)] += 1
+                    else:
+                        files.append((os.path.getmtime(path), path))
+                except (OSError, ValueError, KeyError):
+                    continue
+
+        files.sort(reverse=True)
+        for _, path in files[max_entries:]:
+            try:
+                os.unlink(path)
+                removed[os.path.basename(os.path.dirname(path))] += 1
+            except OSError:
+                pass
+        return removed
+
+
+def build_tier(backend):
+    """Construct a shared tier for a CACHE_SHARED_BACKEND value"""
+    if backend == 'database':
+        return DatabaseTier()
+    if backend == 'redis':
+        return RedisTier(config.CACHE_REDIS_URL)
+    if backend == 'file':
+        return FileTier(config.CACHE_FILE_DIRECTORY)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+_shared_tier = None
+_shared_lock = threading.Lock()
+_eviction_thread = None
+_shared_evictions = Counter()  # Shared-tier entries evicted by this worker, per namespace
+_shared_evictions_lock = threading.Lock()
+
+
+def evict_shared(tier):
+    """Trim the shared tier once, counting what this worker evicted per namespace"""
+    evicted = tier.evict(config.CACHE_SHARED_MAX_ENTRIES)
+    with _shared_evictions_lock:
+        _shared_evictions.update(evicted)
+    return evicted
+
+
+def _run_eviction(app, tier):
+    while True:
+        time.sleep(config.CACHE_EVICTION_INTERVAL_SECONDS)
+        with app.app_context():
+            try:
+                evict_shared(tier)
+            except Exception as e:
+                print(f"Error evicting shared cache entries: {str(e)}")
+
+
+def get_shared_tier():
+    """The worker's shared tier (None when CACHE_SHARED_BACKEND is None), starting its eviction thread"""
+    global _shared_tier, _eviction_thread
+
+    if config.CACHE_SHARED_BACKEND is None:
+        return None
+
+    if _shared_tier is None:
+        with _shared_lock:
+            if _shared_tier is None:
+                tier = build_tier(config.CACHE_SHARED_BACKEND)
+                _eviction_thread = threading.Thread(
+                    target=_run_eviction, args=(current_app._get_current_object(), tier),
+                    name='cache-eviction', daemon=True
+                )
+                _eviction_thread.start()
+                _shared_tier = tier
+    return _shared_tier
+
+
+# ===== CACHES =====
+
+_caches = {}
+
+
+class Cache:
+    """A namespace of cached values over a memory tier and, optionally, the shared tier"""
+
+    def __init__(self, namespace, memory_entries, ttl=None, version='1', data_versioned=False, shared=False):
+        if namespace in _caches:
+            raise ValueError(f"Cache namespace already registered: {namespace}")
+        self.namespace = namespace
+        self.ttl = ttl  # Seconds; None never expires
+        self.version = version
+        self.data_versioned = data_versioned
+        self.shared = shared
+        self.memory = MemoryTier(memory_entries)
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        _caches[namespace] = self
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _tiers(self):
+        shared = get_shared_tier() if self.shared else None
+        return [self.memory, shared] if shared is not None else [self.memory]
+
+    def full_key(self, key):
+        version = self.version
+        if self.data_versioned:
+            version = f"{version}.d{get_data_version()}"
+        if isinstance(key, tuple):
+            key = ':'.join(str(part) for part in key)
+        if len(key) > MAX_KEY_LENGTH:
+            # Free-text keys (search queries) must fit cache_entries.key
+            key = 'sha256:' + hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return f"{self.namespace}:{version}:{key}"
+
+    def _get(self, full_key, count=True):
+        tiers = self._tiers()
+        for index, tier in enumerate(tiers):
+            value, expires_at = tier.get(full_key)
+            if value is _MISSING:
+                continue
+            if count:
+                self._count(f'{tier.name}_hits')
+            # Copy into the faster tiers above
+            for upper in tiers[:index]:
+                upper.set(full_key, value, expires_at)
+            return value
+        if count:
+            self._count('misses')
+        return _MISSING
+
+    def _set(self, full_key, value, ttl):
+        expires_at = _expires_at(self.ttl if ttl is None else ttl)
+        for tier in self._tiers():
+            tier.set(full_key, value, expires_at)
+        self._count('sets')
+
+    def get(self, key, default=None):
+        value = self._get(self.full_key(key))
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        self._set(self.full_key(key), value, ttl)
+
+    def delete(self, key):
+        full_key = self.full_key(key)
+        for tier in self._tiers():
+            tier.delete(full_key)
+
+    def invalidate(self):
+        """Drop every entry in the namespace, in every tier"""
+        for tier in self._tiers():
+            tier.clear(self.namespace)
+
+    def get_or_set(self, key, compute, ttl=None, cacheable=None):
+        """Return the cached value, or compute, store and return it.
+
+        Identical concurrent misses wait for one computation. Values for which
+        `cacheable(value)` is false are returned but not stored.
+        """
+        full_key = self.full_key(key)
+        value = self._get(full_key)
+        if value is not _MISSING:
+            return value
+
+        led, followed = self._flights.claim([full_key])
+        if followed:
+            self._count('coalesced')
+            return followed[full_key].wait(timeout=config.AI_SINGLE_FLIGHT_WAIT_SECONDS)
+
+        try:
+            shared = len(self._tiers()) > 1
+            with advisory_locks([full_key] if shared else [], timeout=config.AI_SINGLE_FLIGHT_WAIT_SECONDS):
+                # Another worker may have filled it while we waited for the lock
+                value = self._get(full_key, count=False) if shared else _MISSING
+                if value is _MISSING:
+                    value = compute()
+                    if cacheable is None or cacheable(value):
+                        self._set(full_key, value, ttl)
+        except Exception as e:
+            self._flights.resolve(full_key, error=e)
+            raise
+
+        self._flights.resolve(full_key, result=value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+
+        hits = sum(count for name, count in counters.items() if name.endswith('_hits'))
+        lookups = hits + counters.get('misses', 0)
+        return {
+            'tiers': [tier.name for tier in self._tiers()],
+            'memory_entries': len(self.memory),
+            'memory_max_entries': self.memory.max_entries,
+            'memory_evictions': self.memory.evictions,
+            'shared_evictions': _shared_evictions[self.namespace],
+            'hits': {name[:-len('_hits')]: count for name, count in counters.items() if name.endswith('_hits')},
+            'misses': counters.get('misses', 0),
+            'sets': counters.get('sets', 0),
+            'coalesced': counters.get('coalesced', 0),
+            'hit_rate': round(hits / lookups, 4) if lookups else None
+        }
+
+
+def cache_stats():
+    """Stats for every registered cache, plus shared-tier evictions by this worker"""
+    return {
+        'caches': {namespace: cache.stats() for namespace, cache in sorted(_caches.items())},
+        'shared_backend': config.CACHE_SHARED_BACKEND,
+        'shared_evictions': sum(_shared_evictions.values())
+    }
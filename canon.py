@@ -0,0 +1,234 @@
+"""Read-only, in-process store of the Bible canon (books, chapters and verses).
+
+The canon never changes at runtime, so each worker loads it once into compact
+array-backed structures and serves reads from memory instead of Postgres.
+Chapters and verses are addressed by their position in canonical order:
+``chapter_offsets[i]:chapter_offsets[i + 1]`` is the slice of verse positions
+belonging to chapter position ``i``.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+import sys
+import threading
+
+from models import db, Book, Chapter, Verse
+
+CanonBook = namedtuple('CanonBook', [
+    'id', 'name', 'abbreviation', 'testament', 'order_number',
+    'chapter_start', 'chapter_end'  # Chapter positions [start, end)
+])
+
+
+class CanonStore:
+    """Immutable snapshot of the canon, built from three column-only queries"""
+
+    def __init__(self, book_rows, chapter_rows, verse_rows):
+        # Chapters
+        self.chapter_ids = array('l')
+        self.chapter_book_ids = array('l')
+        self.chapter_numbers = array('l')
+        self._chapter_positions = {}
+        self._chapter_lookup = {}
+        chapter_ranges = {}
+
+        for position, row in enumerate(chapter_rows):
+            self.chapter_ids.append(row.id)
+            self.chapter_book_ids.append(row.book_id)
+            self.chapter_numbers.append(row.chapter_number)
+            self._chapter_positions[row.id] = position
+            self._chapter_lookup[(row.book_id, row.chapter_number)] = position
+            start, _ = chapter_ranges.get(row.book_id, (position, position))
+            chapter_ranges[row.book_id] = (start, position + 1)
+
+        # Books
+        books = []
+        for row in book_rows:
+            start, end = chapter_ranges.get(row.id, (0, 0))
+            books.append(CanonBook(
+                id=row.id,
+                name=sys.intern(row.name),
+                abbreviation=sys.intern(row.abbreviation),
+                testament=sys.intern(row.testament),
+                order_number=row.order_number,
+                chapter_start=start,
+                chapter_end=end
+            ))
+        self.books = tuple(books)
+        self._books_by_id = {book.id: book for book in books}
+        self._books_by_name = {}
+        for book in books:
+            self._books_by_name.setdefault(book.abbreviation.lower(), book)
+        for book in books:
+            # Full names win over abbreviations when they collide
+            self._books_by_name[book.name.lower()] = book
+        self._chapter_books = [self._books_by_id[book_id] for book_id in self.chapter_book_ids]
+
+        # Verses, grouped by chapter in canonical order
+        self.verse_ids = array('l')
+        self.verse_numbers = array('l')
+        self.verse_chapters = array('l')  # Chapter position of each verse
+        self.texts = []
+        self.texts_with_strongs = []
+        self.strongs_numbers = []
+        self._verse_positions = {}
+        verse_counts = array('l', [0] * len(self.chapter_ids))
+
+        for position, row in enumerate(verse_rows):
+            chapter_position = self._chapter_positions[row.chapter_id]
+            self.verse_ids.append(row.id)
+            self.verse_numbers.append(row.verse_number)
+            self.verse_chapters.append(chapter_position)
+            self.texts.append(row.text)
+            self.texts_with_strongs.append(row.text_with_strongs)
+            self.strongs_numbers.append(row.strongs_numbers)
+            self._verse_positions[row.id] = position
+            verse_counts[chapter_position] += 1
+
+        self.chapter_offsets = array('l', [0])
+        for count in verse_counts:
+            self.chapter_offsets.append(self.chapter_offsets[-1] + count)
+
+        # Verse positions sorted by id, for id-range reads
+        self._id_order = array('l', sorted(range(len(self.verse_ids)), key=self.verse_ids.__getitem__))
+        self._sorted_ids = array('l', (self.verse_ids[i] for i in self._id_order))
+
+    @classmethod
+    def load(cls):
+        """Load the canon from the database"""
+        book_rows = db.session.query(
+            Book.id, Book.name, Book.abbreviation, Book.testament, Book.order_number
+        ).order_by(Book.order_number).all()
+
+        chapter_rows = db.session.query(
+            Chapter.id, Chapter.book_id, Chapter.chapter_number
+        ).join(Book, Chapter.book_id == Book.id)\
+            .order_by(Book.order_number, Chapter.chapter_number).all()
+
+        verse_rows = db.session.query(
+            Verse.id, Verse.chapter_id, Verse.verse_number, Verse.text,
+            Verse.text_with_strongs, Verse.strongs_numbers
+        ).join(Chapter, Verse.chapter_id == Chapter.id)\
+            .join(Book, Chapter.book_id == Book.id)\
+            .order_by(Book.order_number, Chapter.chapter_number, Verse.verse_number)\
+            .yield_per(5000)
+
+        return cls(book_rows, chapter_rows, verse_rows)
+
+    # ===== LOOKUPS =====
+
+    def get_book(self, book_id):
+        return self._books_by_id.get(book_id)
+
+    def find_book(self, name):
+        """Find a book by full name or abbreviation, case-insensitively"""
+        return self._books_by_name.get(name.strip().lower())
+
+    def match_books(self, fragment):
+        """Books whose name contains `fragment`, case-insensitively"""
+        fragment = fragment.strip().lower()
+        return [book for book in self.books if fragment in book.name.lower()]
+
+    def book_chapters(self, book):
+        """Chapter positions for a book, in chapter order"""
+        return range(book.chapter_start, book.chapter_end)
+
+    def get_chapter(self, chapter_id):
+        """Chapter position for a chapter id, or None"""
+        return self._chapter_positions.get(chapter_id)
+
+    def find_chapter(self, book_id, chapter_number):
+        """Chapter position for a book's chapter number, or None"""
+        return self._chapter_lookup.get((book_id, chapter_number))
+
+    def chapter_book(self, chapter_position):
+        return self._chapter_books[chapter_position]
+
+    def chapter_verses(self, chapter_position):
+        """Verse positions for a chapter, in verse order"""
+        return range(self.chapter_offsets[chapter_position], self.chapter_offsets[chapter_position + 1])
+
+    def find_verse(self, chapter_position, verse_number):
+        """Verse position for a chapter's verse number, or None"""
+        verses = self.chapter_verses(chapter_position)
+        position = bisect_left(self.verse_numbers, verse_number, verses.start, verses.stop)
+        if position < verses.stop and self.verse_numbers[position] == verse_number:
+            return position
+        return None
+
+    def get_verse(self, verse_id):
+        """Verse position for a verse id, or None"""
+        return self._verse_positions.get(verse_id)
+
+    def verse_id_range(self, start_verse_id, end_verse_id):
+        """Verse positions whose ids fall within [start, end], ordered by id"""
+        lo = bisect_left(self._sorted_ids, start_verse_id)
+        hi = bisect_right(self._sorted_ids, end_verse_id)
+        return self._id_order[lo:hi]
+
+    # ===== SERIALIZATION (mirrors the model to_dict methods) =====
+
+    def book_dict(self, book):
+        return {
+            'id': book.id,
+            'name': book.name,
+            'abbreviation': book.abbreviation,
+            'testament': book.testament,
+            'order_number': book.order_number,
+            'chapter_count': book.chapter_end - book.chapter_start
+        }
+
+    def chapter_dict(self, chapter_position):
+        return {
+            'id': self.chapter_ids[chapter_position],
+            'book_id': self.chapter_book_ids[chapter_position],
+            'chapter_number': self.chapter_numbers[chapter_position],
+            'verse_count': self.chapter_offsets[chapter_position + 1] - self.chapter_offsets[chapter_position]
+        }
+
+    def verse_reference(self, verse_position):
+        chapter_position = self.verse_chapters[verse_position]
+        return f"{self._chapter_books[chapter_position].name} {self.chapter_numbers[chapter_position]}:{self.verse_numbers[verse_position]}"
+
+    def verse_dict(self, verse_position, include_strongs=False):
+        result = {
+            'id': self.verse_ids[verse_position],
+            'chapter_id': self.chapter_ids[self.verse_chapters[verse_position]],
+            'verse_number': self.verse_numbers[verse_position],
+            'text': self.texts[verse_position],
+            'reference': self.verse_reference(verse_position)
+        }
+
+        if include_strongs and self.texts_with_strongs[verse_position]:
+            result['text_with_strongs'] = self.texts_with_strongs[verse_position]
+            result['strongs_numbers'] = self.strongs_numbers[verse_position] or []
+
+        return result
+
+
+# One snapshot per worker process, swapped atomically on reload
+_canon = None
+_canon_lock = threading.Lock()
+
+
+def get_canon():
+    """Return the worker's canon store, loading it on first use"""
+    global _canon
+
+    if _canon is None:
+        with _canon_lock:
+            if _canon is None:
+                _canon = CanonStore.load()
+    return _canon
+
+
+def reload_canon(store=None):
+    """Replace the canon store with `store`, or one rebuilt from the database (e.g. after an import)"""
+    global _canon
+
+    # Build outside the lock; readers keep the old snapshot until the swap
+    if store is None:
+        store = CanonStore.load()
+    with _canon_lock:
+        _canon = store
+    return _canon
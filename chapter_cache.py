@@ -0,0 +1,216 @@
+"""Pre-rendered, gzip-compressed payloads for the chapter reader endpoint.
+
+GET /api/bible/books/<id>/chapters/<n> is the hottest endpoint, and its
+response only depends on reference data, so each worker keeps the finished
+JSON body gzip-compressed in a memory-only, data-versioned cache (cache.py)
+keyed by (book id, chapter number).
+
+Chapters are rendered lazily on a miss. With CHAPTER_CACHE_PRELOAD on, the
+first use for a data version also renders every chapter in the background
+from two bulk prophecy queries, so readers rarely see a miss.
+"""
+import gzip
+import threading
+
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+
+from cache import Cache
+from canon import get_canon
+import config
+from data_version import get_data_version
+from http_cache import accepts_gzip
+from models import MessianicProphecy, ProphecyFulfillment
+
+COMPRESS_LEVEL = 6
+
+
+def build_chapter_payload(canon, book, chapter_position, prophecies, fulfillments):
+    """The chapter response, from the prophecies touching it and the fulfillments starting in it"""
+    chapter_number = canon.chapter_numbers[chapter_position]
+    verse_positions = canon.chapter_verses(chapter_position)
+
+    # Build prophecy highlighting data
+    prophecy_data = {
+        'prophecy_verses': [],  # Verses that are prophecies
+        'fulfillment_verses': []  # Verses that are fulfillments
+    }
+
+    # Process prophecy verses
+    for prophecy in prophecies:
+        start_position = canon.get_verse(prophecy.prophecy_verse_start)
+        end_position = canon.get_verse(prophecy.prophecy_verse_end)
+        if start_position is not None and canon.verse_chapters[start_position] == chapter_position:
+            start_verse_num = canon.verse_numbers[start_position]
+            end_verse_num = canon.verse_numbers[end_position] if end_position is not None and canon.verse_chapters[end_position] == chapter_position else start_verse_num
+            verse_range = list(range(start_verse_num, end_verse_num + 1))
+
+            prophecy_data['prophecy_verses'].append({
+                'prophecy_id': prophecy.id,
+                'verse_numbers': verse_range,
+                'category': prophecy.category.value,
+                'claim': prophecy.claim[:100] + '...' if len(prophecy.claim) > 100 else prophecy.claim
+            })
+
+    # Process fulfillment verses
+    for fulfillment in fulfillments:
+        start_position = canon.get_verse(fulfillment.verse_start_id)
+        end_position = canon.get_verse(fulfillment.verse_end_id)
+        prophecy_position = canon.get_verse(fulfillment.prophecy.prophecy_verse_start)
+        if start_position is None or end_position is None:
+            continue
+        prophecy_data['fulfillment_verses'].append({
+            'prophecy_id': fulfillment.prophecy_id,
+            'verse_numbers': list(range(canon.verse_numbers[start_position], canon.verse_numbers[end_position] + 1)),
+            'fulfillment_type': fulfillment.fulfillment_type,
+            'original_prophecy': canon.verse_reference(prophecy_position) if prophecy_position is not None else None
+        })
+
+    # Get all chapters for pagination info
+    chapter_numbers = [canon.chapter_numbers[position] for position in canon.book_chapters(book)]
+    current_index = chapter_numbers.index(chapter_number)
+
+    pagination_info = {
+        'current_chapter': chapter_number,
+        'total_chapters': len(chapter_numbers),
+        'has_previous': current_index > 0,
+        'has_next': current_index < len(chapter_numbers) - 1,
+        'previous_chapter': chapter_numbers[current_index - 1] if current_index > 0 else None,
+        'next_chapter': chapter_numbers[current_index + 1] if current_index < len(chapter_numbers) - 1 else None,
+        'all_chapters': chapter_numbers
+    }
+
+    return {
+        'book': canon.book_dict(book),
+        'chapter': canon.chapter_dict(chapter_position),
+        'verses': [canon.verse_dict(position, include_strongs=True) for position in verse_positions],
+        'pagination': pagination_info,
+        'prophecies': prophecy_data
+    }
+
+
+def render_payload(payload):
+    """Serialize exactly like jsonify and gzip the result"""
+    body = current_app.json.response(payload).get_data()
+    return gzip.compress(body, COMPRESS_LEVEL, mtime=0)
+
+
+def chapter_fulfillments_query(chapter_id):
+    """Fulfillments starting in a chapter, with their prophecies, in verse order"""
+    return ProphecyFulfillment.query.options(
+        joinedload(ProphecyFulfillment.prophecy)
+    ).filter_by(chapter_id=chapter_id).order_by(
+        ProphecyFulfillment.verse_start_id, ProphecyFulfillment.prophecy_id, ProphecyFulfillment.position
+    )
+
+
+def render_chapter(canon, chapter_position):
+    """Render one chapter, querying only its own prophecies and fulfillments"""
+    verse_ids = [canon.verse_ids[position] for position in canon.chapter_verses(chapter_position)]
+
+    # Find prophecies where this chapter contains the prophecy verse(s)
+    prophecies = MessianicProphecy.query.filter(
+        or_(
+            MessianicProphecy.prophecy_verse_start.in_(verse_ids),
+            MessianicProphecy.prophecy_verse_end.in_(verse_ids)
+        )
+    ).order_by(MessianicProphecy.id).all()
+
+    # Find fulfillments that start in this chapter (one indexed query)
+    fulfillments = chapter_fulfillments_query(canon.chapter_ids[chapter_position]).all()
+
+    book = canon.chapter_book(chapter_position)
+    return render_payload(build_chapter_payload(canon, book, chapter_position, prophecies, fulfillments))
+
+
+def render_all_chapters(canon):
+    """Yield ((book id, chapter number), rendered chapter) for the whole canon from two queries"""
+    prophecies_by_chapter = {}
+    for prophecy in MessianicProphecy.query.order_by(MessianicProphecy.id).all():
+        chapter_positions = {
+            canon.verse_chapters[position]
+            for position in (canon.get_verse(prophecy.prophecy_verse_start), canon.get_verse(prophecy.prophecy_verse_end))
+            if position is not None
+        }
+        for chapter_position in chapter_positions:
+            prophecies_by_chapter.setdefault(chapter_position, []).append(prophecy)
+
+    fulfillments_by_chapter = {}
+    fulfillments = ProphecyFulfillment.query.options(
+        joinedload(ProphecyFulfillment.prophecy)
+    ).order_by(
+        ProphecyFulfillment.verse_start_id, ProphecyFulfillment.prophecy_id, ProphecyFulfillment.position
+    ).all()
+    for fulfillment in fulfillments:
+        fulfillments_by_chapter.setdefault(fulfillment.chapter_id, []).append(fulfillment)
+
+    for book in canon.books:
+        for chapter_position in canon.book_chapters(book):
+            payload = build_chapter_payload(
+                canon, book, chapter_position,
+                prophecies_by_chapter.get(chapter_position, []),
+                fulfillments_by_chapter.get(canon.chapter_ids[chapter_position], [])
+            )
+            yield (book.id, canon.chapter_numbers[chapter_position]), render_payload(payload)
+
+
+chapter_cache = Cache(
+    'chapters',
+    memory_entries=config.CHAPTER_CACHE_MAX_ENTRIES,
+    data_versioned=True
+)
+_preloaded_versions = set()
+_preload_lock = threading.Lock()
+
+
+def _preload(app, version):
+    with app.app_context():
+        try:
+            canon = get_canon()
+            for key, rendered in render_all_chapters(canon):
+                # Stop rather than store renders of superseded data under the new version
+                if get_data_version() != version:
+                    return
+                chapter_cache.set(key, rendered)
+        except Exception as e:
+            print(f"Error preloading chapter cache: {str(e)}")
+
+
+def _start_preload(version):
+    with _preload_lock:
+        if version in _preloaded_versions:
+            return
+        _preloaded_versions.add(version)
+
+    thread = threading.Thread(
+        target=_preload, args=(current_app._get_current_object(), version),
+        name='chapter-cache-preload', daemon=True
+    )
+    thread.start()
+
+
+def get_rendered_chapter(book_id, chapter_number):
+    """Return the chapter's gzip-compressed JSON body, or None if the book or chapter doesn't exist"""
+    if config.CHAPTER_CACHE_PRELOAD:
+        _start_preload(get_data_version())
+
+    canon = get_canon()
+    chapter_position = canon.find_chapter(book_id, chapter_number)
+    if canon.get_book(book_id) is None or chapter_position is None:
+        return None
+
+    return chapter_cache.get_or_set(
+        (book_id, chapter_number), lambda: render_chapter(canon, chapter_position)
+    )
+
+
+def chapter_response(rendered):
+    """Serve the stored gzip bytes as-is, decompressing only for clients that don't accept gzip"""
+    if accepts_gzip():
+        response = current_app.response_class(rendered, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = current_app.response_class(gzip.decompress(rendered), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    return response
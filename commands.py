@@ -0,0 +1,172 @@
+"""Flask CLI commands for offline data builds and checks (run with `flask <command>`)."""
+import click
+from flask.cli import with_appcontext
+
+from ai_client import TheologicalPerspective
+from cache import DatabaseTier
+from chapter_cache import chapter_fulfillments_query
+from concordance import build_concordance, concordance_row_query
+from data_version import bump_data_version
+from models import db
+from routes.strongs import chapter_mappings_query, concordance_page_query, verse_mappings_query
+from search_service import search_verse_ids_query, strongs_search_query
+from serializers import verses_by_id_query
+from summary_cache import cached_analyses_query
+
+# (description, table that must not be sequentially scanned, index the plan must use,
+# builder). Each builder takes sample parameters from the database and returns
+# the statement a blueprint runs, built by the same function the route calls.
+EXPLAIN_QUERIES = [
+    ('verse text search', 'verses', 'ix_verses_text_search',
+     lambda samples: search_verse_ids_query('grace')),
+    ('verses missing from the canon store', 'verses', 'verses_pkey',
+     lambda samples: verses_by_id_query([samples['verse_id']])),
+    ('word mappings of a verse', 'verse_strongs_mappings', 'ix_verse_strongs_mappings_verse_id',
+     lambda samples: verse_mappings_query(samples['verse_id'])),
+    ('word mappings of a chapter', 'verse_strongs_mappings', 'ix_verse_strongs_mappings_verse_id',
+     lambda samples: chapter_mappings_query(samples['chapter_verse_ids'])),
+    ('concordance by book', 'verse_strongs_mappings', 'ix_verse_strongs_mappings_number_verse_position',
+     lambda samples: concordance_page_query(samples['strongs_number'], samples['book_id'], None, 51)),
+    ('concordance by book, next page', 'verse_strongs_mappings', 'ix_verse_strongs_mappings_number_verse_position',
+     lambda samples: concordance_page_query(samples['strongs_number'], samples['book_id'], (1, 1), 51)),
+    ('lexicon search', 'strongs_entries', 'ix_strongs_entries_definition_search',
+     lambda samples: strongs_search_query('love')),
+    ('lexicon transliteration search', 'strongs_entries', 'ix_strongs_entries_transliteration_trgm',
+     lambda samples: strongs_search_query('agapo')),
+    ('concordance row', 'strongs_concordance', 'strongs_concordance_pkey',
+     lambda samples: concordance_row_query(samples['strongs_number'])),
+    ('chapter fulfillments', 'prophecy_fulfillments', 'ix_prophecy_fulfillments_chapter_id_verse_start_id',
+     lambda samples: chapter_fulfillments_query(samples['chapter_id'])),
+    ('cached perspectives', 'perspective_summaries', 'uq_perspective_summaries_key',
+     lambda samples: cached_analyses_query(samples['verse_id'], samples['verse_id'], list(TheologicalPerspective)[:2])),
+    ('shared cache entry', 'cache_entries', 'cache_entries_pkey',
+     lambda samples: DatabaseTier.entry_query('search_grouped:1:grace')),
+]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+def explain_sample_params():
+    """Parameters for EXPLAIN_QUERIES, taken from a real Strong's mapping (None if there are none)"""
+    row = db.session.execute(db.text("""
+        SELECT m.verse_id, m.strongs_number, v.chapter_id, c.book_id, c.chapter_number
+        FROM verse_strongs_mappings m
+        JOIN verses v ON v.id = m.verse_id
+        JOIN chapters c ON c.id = v.chapter_id
+        LIMIT 1
+    """)).mappings().first()
+    if row is None:
+        return None
+    samples = dict(row)
+    samples['chapter_verse_ids'] = db.session.execute(
+        db.text('SELECT id FROM verses WHERE chapter_id = :chapter_id ORDER BY verse_number'),
+        {'chapter_id': row['chapter_id']}
+    ).scalars().all()
+    return samples
+
+
+def explain_scans(table, statement):
+    """EXPLAIN a statement or ORM query; returns (scan node types on `table`, names of every index the plan uses)"""
+    statement = getattr(statement, 'statement', statement)
+    compiled = statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params).scalar()
+    nodes = list(_plan_nodes(plan[0]['Plan']))
+    scans = {node['Node Type'] for node in nodes if node.get('Relation Name') == table}
+    indexes = {node['Index Name'] for node in nodes if 'Index Name' in node}
+    return scans, indexes
+
+
+@click.command('build-concordance')
+@click.option('--strongs-number', default=None, help="Rebuild a single number (e.g. H430) instead of all of them")
+@with_appcontext
+def build_concordance_command(strongs_number):
+    """Precompute the Strong's concordance table"""
+    rows = build_concordance(strongs_number)
+    click.echo(f"Built concordance for {rows} Strong's number(s)")
+    click.echo(f"Data version is now {bump_data_version()}")
+
+
+@click.command('bump-data-version')
+@with_appcontext
+def bump_data_version_command():
+    """Invalidate HTTP caches and in-memory stores after changing reference data"""
+    click.echo(f"Data version is now {bump_data_version()}")
+
+
+@click.command('explain-queries')
+@click.option('--force-index', is_flag=True,
+              help="Disable sequential scans, to check indexes are usable on a small local database")
+@with_appcontext
+def explain_queries_command(force_index):
+    """EXPLAIN the blueprints' hot queries and fail if any sequentially scans its table or misses its index"""
+    samples = explain_sample_params()
+    if samples is None:
+        raise click.ClickException("No Strong's mappings to sample query parameters from")
+
+    if force_index:
+        db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+
+    failures = 0
+    for description, table, index, build in EXPLAIN_QUERIES:
+        scans, indexes = explain_scans(table, build(samples))
+        failed = 'Seq Scan' in scans or index not in indexes
+        if failed:
+            failures += 1
+        click.echo(f"{'FAIL' if failed else 'ok  '}  {description}: {table} via {', '.join(sorted(scans)) or 'no scan'}"
+                   f" ({', '.join(sorted(indexes)) or 'no index'})")
+
+    db.session.rollback()
+    if failures:
+        raise click.ClickException(f"{failures} quer{'y' if failures == 1 else 'ies'} sequentially scanned their table or missed their index")
+
+
+@click.command('cache-benchmark')
+@click.option('--entries', default=500, show_default=True, help='Entries written and read per tier')
+@with_appcontext
+def cache_benchmark_command(entries):
+    """Time set/get round trips through each available cache tier"""
+    import tempfile
+    import time
+
+    from cache import FileTier, MemoryTier, RedisTier, build_tier
+    import config
+
+    # Shaped like a grouped search result
+    value = {
+        'query': 'benchmark',
+        'book_groups': [
+            {'book': {'id': book_id, 'name': f'Book {book_id}'}, 'verse_count': book_id,
+             'sample_verses': [{'id': i, 'text': 'In the beginning God created the heaven and the earth.'} for i in range(3)]}
+            for book_id in range(20)
+        ]
+    }
+
+    tiers = [MemoryTier(entries), build_tier('database'), FileTier(tempfile.mkdtemp(prefix='cache-benchmark-'))]
+    if config.CACHE_SHARED_BACKEND == 'redis':
+        tiers.append(RedisTier(config.CACHE_REDIS_URL))
+
+    for tier in tiers:
+        keys = [f"benchmark:1:{i}" for i in range(entries)]
+        start = time.perf_counter()
+        for key in keys:
+            tier.set(key, value, time.time() + 300)
+        set_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for key in keys:
+            tier.get(key)
+        get_time = time.perf_counter() - start
+
+        tier.clear('benchmark')
+        click.echo(f"{tier.name:<10} set {set_time / entries * 1e6:10.1f} us/op   get {get_time / entries * 1e6:10.1f} us/op")
+
+
+def register_commands(app):
+    app.cli.add_command(build_concordance_command)
+    app.cli.add_command(bump_data_version_command)
+    app.cli.add_command(cache_benchmark_command)
+    app.cli.add_command(explain_queries_command)
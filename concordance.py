@@ -0,0 +1,114 @@
+"""Precomputed Strong's concordance.
+
+`build_concordance()` computes every Strong's number's per-book occurrence
+counts and first three sample verses in one set-based statement (GROUP BY
+plus a ROW_NUMBER window) and writes one compact strongs_concordance row per
+number. The concordance endpoint then reads a single row and renders books and
+verses from the canon store. Run `flask build-concordance` after importing
+Strong's data; numbers missing from the table are built on first request.
+"""
+from models import db, StrongsConcordance, StrongsEntry
+from serializers import book_payload, verse_payloads
+
+SAMPLE_VERSES = 3
+
+# Rows for every Strong's entry (zero counts included) or, with
+# :strongs_number set, just that one. Samples follow the concordance's
+# reading order within a book: chapter, verse, word position.
+_BUILD_SQL = f"""
+    WITH occurrences AS (
+        SELECT m.strongs_number,
+               c.book_id,
+               m.verse_id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY m.strongs_number, c.book_id
+                   ORDER BY c.chapter_number, v.verse_number, m.word_position
+               ) AS occurrence
+        FROM verse_strongs_mappings m
+        JOIN verses v ON v.id = m.verse_id
+        JOIN chapters c ON c.id = v.chapter_id
+        WHERE CAST(:strongs_number AS VARCHAR) IS NULL OR m.strongs_number = :strongs_number
+    ),
+    per_book AS (
+        SELECT strongs_number,
+               book_id,
+               COUNT(*) AS verse_count,
+               array_agg(verse_id ORDER BY occurrence) FILTER (WHERE occurrence <= {SAMPLE_VERSES}) AS sample_ids
+        FROM occurrences
+        GROUP BY strongs_number, book_id
+    ),
+    per_number AS (
+        SELECT strongs_number,
+               SUM(verse_count) AS total_verses,
+               COUNT(*) AS total_books,
+               json_agg(json_build_array(book_id, verse_count, sample_ids) ORDER BY book_id) AS book_groups
+        FROM per_book
+        GROUP BY strongs_number
+    )
+    INSERT INTO strongs_concordance (strongs_number, total_verses, total_books, book_groups, built_at)
+    SELECT e.strongs_number,
+           COALESCE(p.total_verses, 0),
+           COALESCE(p.total_books, 0),
+           COALESCE(p.book_groups, '[]'::json),
+           now()
+    FROM strongs_entries e
+    LEFT JOIN per_number p ON p.strongs_number = e.strongs_number
+    WHERE CAST(:strongs_number AS VARCHAR) IS NULL OR e.strongs_number = :strongs_number
+    ON CONFLICT (strongs_number) DO UPDATE SET
+        total_verses = EXCLUDED.total_verses,
+        total_books = EXCLUDED.total_books,
+        book_groups = EXCLUDED.book_groups,
+        built_at = EXCLUDED.built_at
+"""
+
+
+def build_concordance(strongs_number=None):
+    """Rebuild the concordance for every Strong's number, or just one; returns rows written"""
+    if strongs_number is None:
+        # Full rebuild in one transaction; readers keep seeing the old rows until commit.
+        # It runs longer than the per-statement timeout request traffic gets.
+        db.session.execute(db.text('SET LOCAL statement_timeout = 0'))
+        db.session.execute(db.text('DELETE FROM strongs_concordance'))
+    result = db.session.execute(db.text(_BUILD_SQL), {'strongs_number': strongs_number})
+    db.session.commit()
+    return result.rowcount
+
+
+def concordance_row_query(strongs_number):
+    """The entry and its concordance row, outer joined"""
+    return db.session.query(StrongsEntry, StrongsConcordance)\
+        .outerjoin(StrongsConcordance, StrongsConcordance.strongs_number == StrongsEntry.strongs_number)\
+        .filter(StrongsEntry.strongs_number == strongs_number)
+
+
+def get_concordance_row(strongs_number):
+    """Return (StrongsEntry, StrongsConcordance or None) in one query, or (None, None)"""
+    row = concordance_row_query(strongs_number).first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def concordance_payload(entry, concordance):
+    """Render a concordance row in the /concordance response shape"""
+    sample_ids = [verse_id for _, _, ids in concordance.book_groups for verse_id in ids or []]
+    verses_by_id = {
+        verse_data['id']: verse_data
+        for verse_data in verse_payloads(
+            list(dict.fromkeys(sample_ids)), include_strongs=True, include_book=True, include_chapter=True
+        )
+    }
+
+    book_groups = [
+        {
+            'book': book_payload(book_id),
+            'verse_count': verse_count,
+            'sample_verses': [verses_by_id[verse_id] for verse_id in ids or [] if verse_id in verses_by_id]
+        }
+        for book_id, verse_count, ids in concordance.book_groups
+    ]
+
+    return {
+        'strongs_entry': entry.to_dict(),
+        'book_groups': book_groups,
+        'total_books': concordance.total_books,
+        'total_verses': concordance.total_verses
+    }
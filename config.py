@@ -14,3 +14,51 @@ JWT_SECRET_KEY = "your-jwt-secret-key-change-in-production"
 
 # Flask environment
 FLASK_ENV = "production"
+
+# Database connection pool (see db_pool.py)
+DB_POOL_SIZE = 8  # One per gunicorn thread
+DB_MAX_OVERFLOW = 4  # Headroom for background threads (cache preload and eviction)
+DB_POOL_TIMEOUT_SECONDS = 10  # Longest a request waits for a connection before failing
+DB_POOL_PRE_PING = True  # Test connections on checkout; RDS and NAT gateways drop idle ones
+DB_POOL_RECYCLE_SECONDS = 1800  # Replace connections older than this
+DB_STATEMENT_TIMEOUT_MS = 30000  # Per-statement limit; offline builds and migrations lift it
+DB_LOCK_POOL_SIZE = 4  # Separate pool for advisory locks held during model calls
+DB_LOCK_POOL_MAX_OVERFLOW = 12
+
+# Gemini perspective fan-out
+AI_CONCURRENT_PERSPECTIVES = True  # Run per-perspective calls concurrently
+AI_MAX_CONCURRENT_CALLS = 16  # Process-wide limit on in-flight model calls
+AI_REQUEST_FANOUT = 4  # Per-request limit on in-flight model calls
+AI_CALL_TIMEOUT_SECONDS = 45  # Per-call timeout, including time queued for a slot
+AI_GENERATION_MODE = "per_perspective"  # Default summary mode: "per_perspective" or "batched"
+AI_BATCHED_CALL_TIMEOUT_STEP_SECONDS = 20  # Added to AI_CALL_TIMEOUT_SECONDS per extra perspective in a batched call
+AI_SINGLE_FLIGHT_WAIT_SECONDS = 120  # Longest a request waits on an identical in-flight generation
+CONSENSUS_CACHE_TTL_HOURS = 720  # Cached scholarly consensus results expire after 30 days
+CONSENSUS_CACHE_MEMORY_ENTRIES = 200  # Per-worker LRU in front of the shared tier
+ANALYSIS_DEBUG_LOGGING = False  # Log full analysis request/response payloads (slow for large responses)
+
+# Question answer cache (in-process, per worker)
+QUESTION_CACHE_MAX_ENTRIES = 5000  # Cached (verse range, perspective, question) answers
+QUESTION_CACHE_SIMILARITY_ENABLED = True  # Let close paraphrases of a cached question hit
+QUESTION_CACHE_SIMILARITY = 0.8  # Minimum estimated shingle similarity for a paraphrase hit
+
+# HTTP caching of reference data
+DATA_VERSION_TTL_SECONDS = 30  # How often each worker re-reads the data version
+HTTP_CACHE_CANON_MAX_AGE = 86400  # Books, chapters and verses
+HTTP_CACHE_DEFAULT_MAX_AGE = 3600  # Metadata, Strong's and concordance data
+CHAPTER_CACHE_MAX_ENTRIES = 1189  # Rendered reader chapters per worker (1189 holds the whole canon)
+CHAPTER_CACHE_PRELOAD = True  # Render every chapter in the background on first use of a data version
+
+# Shared cache tiers (see cache.py)
+CACHE_SHARED_BACKEND = "database"  # "database", "redis", "file" or None for memory-only caches
+CACHE_REDIS_URL = "redis://localhost:6379/0"  # Used when CACHE_SHARED_BACKEND = "redis"
+CACHE_FILE_DIRECTORY = "/tmp/libros-cache"  # Used when CACHE_SHARED_BACKEND = "file"
+CACHE_SHARED_MAX_ENTRIES = 50000  # Least recently used shared entries beyond this are evicted
+CACHE_EVICTION_INTERVAL_SECONDS = 600
+
+# Grouped search cache
+SEARCH_CACHE_MEMORY_ENTRIES = 500  # Per-worker LRU in front of the shared tier
+SEARCH_CACHE_MAX_AGE_HOURS = 168  # Entries expire after a week
+
+# Search suggestions (see autocomplete.py)
+AUTOCOMPLETE_PRELOAD = True  # Build the autocomplete index in the background when the app starts
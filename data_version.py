@@ -0,0 +1,120 @@
+"""Global data version for the reference data (canon, lexicon, metadata, concordance).
+
+The version is a single-row counter in the data_version table. Anything that
+changes reference data bumps it: import scripts call bump_data_version() or
+run `flask bump-data-version`, MessianicProphecy.sync_fulfillments() bumps it
+in the caller's transaction, and `flask db upgrade` / `downgrade` bump it
+whenever they apply a revision (migrations/env.py).
+
+Each worker caches the version in memory and re-reads it at most every
+DATA_VERSION_TTL_SECONDS. When it changes, the worker's in-memory stores are
+rebuilt by the request that noticed and swapped in, and ETags derived from it
+(see http_cache.py) change with it.
+"""
+import threading
+import time
+
+import config
+from models import db, DataVersion
+
+BUMP_DATA_VERSION_SQL = """
+    INSERT INTO data_version (id, version, updated_at) VALUES (1, 1, now())
+    ON CONFLICT (id) DO UPDATE SET version = data_version.version + 1, updated_at = now()
+    RETURNING version
+"""
+
+_version = None
+_checked_at = 0.0
+_reloading = False
+_lock = threading.Lock()
+
+
+def _build_stores():
+    """Build every in-memory store derived from reference data, without installing them"""
+    from autocomplete import AutocompleteIndex
+    from canon import CanonStore
+    from lexicon import Lexicon
+
+    canon = CanonStore.load()
+    return canon, Lexicon.load(), AutocompleteIndex.build(canon)
+
+
+def _install_stores(stores):
+    from autocomplete import reload_autocomplete_index
+    from canon import reload_canon
+    from lexicon import reload_lexicon
+
+    canon, lexicon, index = stores
+    reload_canon(canon)
+    reload_lexicon(lexicon)
+    reload_autocomplete_index(index)
+
+
+def _read_version():
+    return db.session.query(DataVersion.version).filter(DataVersion.id == 1).scalar() or 0
+
+
+def get_data_version():
+    """Current data version, from memory unless the TTL has passed.
+
+    When the version changes, the thread that notices rebuilds the stores
+    without holding the lock; other requests keep getting the old version
+    (and the old stores) until the new ones are swapped in together.
+    """
+    global _version, _checked_at, _reloading
+
+    if _version is not None and time.monotonic() - _checked_at < config.DATA_VERSION_TTL_SECONDS:
+        return _version
+
+    with _lock:
+        if _version is not None and time.monotonic() - _checked_at < config.DATA_VERSION_TTL_SECONDS:
+            return _version
+
+        try:
+            version = _read_version()
+        except Exception as e:
+            # Keep serving the last known version rather than failing the request
+            db.session.rollback()
+            print(f"Error reading data version: {str(e)}")
+            version = _version or 0
+
+        if _version is None or version == _version or _reloading:
+            if not _reloading:
+                _version = version
+            _checked_at = time.monotonic()
+            return _version
+
+        # Other threads take the fast path with the old version while this one rebuilds
+        _reloading = True
+        _checked_at = time.monotonic()
+
+    try:
+        stores = _build_stores()
+    except Exception as e:
+        print(f"Error rebuilding stores for data version {version}: {str(e)}")
+        with _lock:
+            # Retry after the TTL
+            _reloading = False
+            return _version
+
+    with _lock:
+        _install_stores(stores)
+        _version, _checked_at, _reloading = version, time.monotonic(), False
+        return _version
+
+
+def bump_data_version(commit=True):
+    """Increment the data version (after importing or changing reference data); returns the new version.
+
+    With commit=False the bump joins the session's transaction, so it only
+    takes effect if the caller commits the data change it belongs to.
+    """
+    global _checked_at
+
+    version = db.session.execute(db.text(BUMP_DATA_VERSION_SQL)).scalar()
+    if commit:
+        db.session.commit()
+
+    # Pick the new version up in this worker on the next request
+    _checked_at = float('-inf')
+    return version
@@ -0,0 +1,157 @@
+"""SQLAlchemy engine options, connection pool instrumentation and the advisory-lock engine.
+
+The app engine's pool is sized for the gunicorn threads (DB_POOL_SIZE) plus
+background threads (DB_MAX_OVERFLOW). Connections are pre-pinged, recycled
+before RDS or a NAT can drop them, and every statement runs under
+DB_STATEMENT_TIMEOUT_MS. Offline builds and migrations lift that timeout.
+
+Pools record how long each checkout waited, including opening a new
+connection, in a histogram exposed by pool_stats(). Advisory locks that are
+held across model calls come from their own small autocommit engine, so a
+slow generation never holds a connection that fast reads need.
+"""
+from bisect import bisect_left
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+import config
+from models import db
+
+# Upper bounds of the checkout-wait histogram buckets, in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """Checkout-wait histogram for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait_ms, timed_out=False):
+        with self._lock:
+            self._counts[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+            self.total_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total_ms, max_ms, timeouts = self.total_ms, self.max_ms, self.timeouts
+
+        # Cumulative counts, one per upper bound
+        buckets = {}
+        running = 0
+        for bound, count in zip([str(bound) for bound in WAIT_BUCKETS_MS] + ['+Inf'], counts):
+            running += count
+            buckets[bound] = running
+        return {
+            'checkouts': running,
+            'wait_ms_buckets': buckets,
+            'wait_ms_total': round(total_ms, 3),
+            'wait_ms_max': round(max_ms, 3),
+            'wait_ms_mean': round(total_ms / running, 3) if running else None,
+            'timeouts': timeouts
+        }
+
+
+_pool_metrics = {}
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout; subclassed per engine by instrumented_pool_class()"""
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except Exception:
+            # TimeoutError when the pool and its overflow are exhausted for pool_timeout
+            timed_out = True
+            raise
+        finally:
+            self.metrics.observe((time.perf_counter() - start) * 1000, timed_out)
+
+
+def instrumented_pool_class(name):
+    """A pool class with its own metrics, so they survive engine.dispose() recreating the pool"""
+    metrics = _pool_metrics.setdefault(name, PoolMetrics())
+    return type(f'InstrumentedQueuePool_{name}', (InstrumentedQueuePool,), {'metrics': metrics})
+
+
+def engine_options():
+    """SQLALCHEMY_ENGINE_OPTIONS for the app engine"""
+    return {
+        'poolclass': instrumented_pool_class('app'),
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_timeout': config.DB_POOL_TIMEOUT_SECONDS,
+        'pool_pre_ping': config.DB_POOL_PRE_PING,
+        'pool_recycle': config.DB_POOL_RECYCLE_SECONDS,
+        'connect_args': {'options': f'-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}'}
+    }
+
+
+def release_db_connection():
+    """Hand the request's pooled connection back before slow non-database work, such as a model call.
+
+    Everything the session loaded is detached first: attributes already loaded
+    stay readable, but a lazy load or refresh raises DetachedInstanceError
+    rather than quietly checking a connection back out. Copy what the slow
+    work needs into plain values before calling this.
+    """
+    db.session.expunge_all()
+    db.session.close()
+
+
+_lock_engine = None
+_lock_engine_lock = threading.Lock()
+
+
+def get_lock_engine():
+    """Autocommit engine for session-level advisory locks, with its own small pool"""
+    global _lock_engine
+
+    if _lock_engine is None:
+        with _lock_engine_lock:
+            if _lock_engine is None:
+                _lock_engine = create_engine(
+                    db.engine.url,
+                    poolclass=instrumented_pool_class('locks'),
+                    pool_size=config.DB_LOCK_POOL_SIZE,
+                    max_overflow=config.DB_LOCK_POOL_MAX_OVERFLOW,
+                    pool_timeout=config.DB_POOL_TIMEOUT_SECONDS,
+                    pool_pre_ping=config.DB_POOL_PRE_PING,
+                    pool_recycle=config.DB_POOL_RECYCLE_SECONDS,
+                    isolation_level='AUTOCOMMIT'
+                )
+    return _lock_engine
+
+
+def _pool_status(pool):
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0)
+    }
+
+
+def pool_stats():
+    """Current usage and checkout-wait histograms for this worker's pools"""
+    stats = {name: {'wait': metrics.snapshot()} for name, metrics in sorted(_pool_metrics.items())}
+    if 'app' in stats and isinstance(db.engine.pool, QueuePool):
+        stats['app'].update(_pool_status(db.engine.pool))
+    if 'locks' in stats and _lock_engine is not None:
+        stats['locks'].update(_pool_status(_lock_engine.pool))
+    return stats
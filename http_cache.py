@@ -0,0 +1,51 @@
+"""HTTP validators and Cache-Control for endpoints that only depend on reference data.
+
+Responses are a pure function of the request URL and the global data version,
+so the ETag is derived from those two alone and a matching If-None-Match is
+answered with 304 before the view (or the database) is touched. Views that
+negotiate gzip themselves also fold the chosen content-coding into the ETag,
+since the gzip and identity bodies are different representations.
+"""
+from functools import wraps
+import hashlib
+
+from flask import make_response, request
+
+from data_version import get_data_version
+
+
+def accepts_gzip():
+    """Whether the request accepts a gzip-encoded response"""
+    return 'gzip' in request.accept_encodings
+
+
+def http_cached(max_age, vary_encoding=False):
+    """Decorate a GET view with a strong, data-versioned ETag and `Cache-Control: public, max-age`.
+
+    Pass vary_encoding=True for views that choose gzip with accepts_gzip():
+    the ETag then includes the content-coding, and both 200 and 304
+    responses carry `Vary: Accept-Encoding`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tag = f"{get_data_version()}:{request.full_path}"
+            if vary_encoding:
+                tag += ':gzip' if accepts_gzip() else ':identity'
+            etag = hashlib.sha1(tag.encode('utf-8')).hexdigest()
+            cache_control = f'public, max-age={max_age}'
+
+            if request.if_none_match.contains(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            if vary_encoding:
+                response.vary.add('Accept-Encoding')
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,86 @@
+"""In-process Strong's lexicon.
+
+Strong's entries never change at runtime, so each worker loads them once into
+a dictionary of ready-to-serve payloads keyed by Strong's number. Numbers
+missing from the snapshot (e.g. imported after it was loaded) are resolved
+with a single IN query.
+"""
+import threading
+
+from models import db, StrongsEntry
+
+
+class Lexicon:
+    """Immutable snapshot of every StrongsEntry, serialized like StrongsEntry.to_dict"""
+
+    def __init__(self, rows):
+        self._entries = {
+            row.strongs_number: {
+                'id': row.id,
+                'strongs_number': row.strongs_number,
+                'language': row.language,
+                'transliteration': row.transliteration,
+                'pronunciation': row.pronunciation,
+                'definition': row.definition,
+                'kjv_usage': row.kjv_usage,
+                'created_at': row.created_at.isoformat() if row.created_at else None
+            }
+            for row in rows
+        }
+
+    @classmethod
+    def load(cls):
+        """Load the lexicon from the database"""
+        return cls(db.session.query(
+            StrongsEntry.id, StrongsEntry.strongs_number, StrongsEntry.language,
+            StrongsEntry.transliteration, StrongsEntry.pronunciation,
+            StrongsEntry.definition, StrongsEntry.kjv_usage, StrongsEntry.created_at
+        ).all())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, strongs_number):
+        return self._entries.get(strongs_number)
+
+    def entries(self, strongs_numbers):
+        """Return {strongs_number: entry payload} for the numbers that exist"""
+        found = {}
+        missing = []
+        for number in set(strongs_numbers):
+            if number in self._entries:
+                found[number] = self._entries[number]
+            else:
+                missing.append(number)
+
+        if missing:
+            for entry in StrongsEntry.query.filter(StrongsEntry.strongs_number.in_(missing)).all():
+                found[entry.strongs_number] = entry.to_dict()
+        return found
+
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon():
+    """Return the worker's lexicon, loading it on first use"""
+    global _lexicon
+
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = Lexicon.load()
+    return _lexicon
+
+
+def reload_lexicon(lexicon=None):
+    """Replace the lexicon with `lexicon`, or one rebuilt from the database (e.g. after an import)"""
+    global _lexicon
+
+    # Build outside the lock; readers keep the old snapshot until the swap
+    if lexicon is None:
+        lexicon = Lexicon.load()
+    with _lexicon_lock:
+        _lexicon = lexicon
+    return _lexicon
@@ -5,6 +5,8 @@ from flask import current_app
 
 from alembic import context
 
+from data_version import BUMP_DATA_VERSION_SQL
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -94,17 +96,33 @@ def run_migrations_online():
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
 
+    # Migrations may change reference data, so applying any revision bumps the
+    # data version; workers then rebuild their stores and ETags change
+    applied = []
+
+    def on_version_apply(ctx, step, heads, run_args):
+        if not step.is_stamp:
+            applied.append(step.up_revision_id)
+
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # Index builds and data migrations outlast the app's per-statement timeout
+        connection.exec_driver_sql('SET statement_timeout = 0')
+        connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            on_version_apply=on_version_apply,
             **conf_args
         )
 
         with context.begin_transaction():
             context.run_migrations()
+            has_data_version = connection.exec_driver_sql("SELECT to_regclass('data_version')").scalar()
+            if applied and has_data_version:
+                connection.exec_driver_sql(BUMP_DATA_VERSION_SQL)
 
 
 if context.is_offline_mode():
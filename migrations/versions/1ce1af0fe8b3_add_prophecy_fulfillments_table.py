@@ -0,0 +1,64 @@
+"""Add prophecy_fulfillments table
+
+Revision ID: 1ce1af0fe8b3
+Revises: df2accd2aa67
+Create Date: 2026-10-16 09:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1ce1af0fe8b3'
+down_revision = 'df2accd2aa67'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('prophecy_fulfillments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('prophecy_id', sa.Integer(), nullable=False),
+    sa.Column('verse_start_id', sa.Integer(), nullable=False),
+    sa.Column('verse_end_id', sa.Integer(), nullable=False),
+    sa.Column('chapter_id', sa.Integer(), nullable=False),
+    sa.Column('fulfillment_type', sa.String(length=20), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['chapter_id'], ['chapters.id'], ),
+    sa.ForeignKeyConstraint(['prophecy_id'], ['messianic_prophecies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['verse_end_id'], ['verses.id'], ),
+    sa.ForeignKeyConstraint(['verse_start_id'], ['verses.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('prophecy_fulfillments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_prophecy_fulfillments_chapter_id'), ['chapter_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_prophecy_fulfillments_prophecy_id'), ['prophecy_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_prophecy_fulfillments_verse_start_id'), ['verse_start_id'], unique=False)
+
+    # Backfill from the JSON fulfillment_references; entries without a
+    # resolvable verse_start_id were never matched by the old LIKE scan either
+    op.execute("""
+        INSERT INTO prophecy_fulfillments
+            (prophecy_id, verse_start_id, verse_end_id, chapter_id, fulfillment_type, position)
+        SELECT mp.id,
+               vs.id,
+               COALESCE(ve.id, vs.id),
+               vs.chapter_id,
+               ref.value->>'fulfillment_type',
+               ref.ordinality - 1
+        FROM messianic_prophecies mp
+        CROSS JOIN LATERAL json_array_elements(mp.fulfillment_references) WITH ORDINALITY AS ref(value, ordinality)
+        JOIN verses vs ON vs.id = (ref.value->>'verse_start_id')::int
+        LEFT JOIN verses ve ON ve.chapter_id = vs.chapter_id
+                           AND ve.verse_number = (ref.value->>'verse_end')::int
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('prophecy_fulfillments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_prophecy_fulfillments_verse_start_id'))
+        batch_op.drop_index(batch_op.f('ix_prophecy_fulfillments_prophecy_id'))
+        batch_op.drop_index(batch_op.f('ix_prophecy_fulfillments_chapter_id'))
+
+    op.drop_table('prophecy_fulfillments')
@@ -0,0 +1,60 @@
+"""Add perspective_summaries table
+
+Revision ID: 5a7e9c0d2b64
+Revises: 8f3b2d6a41c7
+Create Date: 2026-10-16 11:20:05.917342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a7e9c0d2b64'
+down_revision = '8f3b2d6a41c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('perspective_summaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('verse_range_start', sa.Integer(), nullable=False),
+    sa.Column('verse_range_end', sa.Integer(), nullable=False),
+    sa.Column('perspective', sa.String(length=40), nullable=False),
+    sa.Column('prompt_version', sa.String(length=20), nullable=False),
+    sa.Column('response_text', sa.Text(), nullable=False),
+    sa.Column('cross_references', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['verse_range_end'], ['verses.id'], ),
+    sa.ForeignKeyConstraint(['verse_range_start'], ['verses.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('verse_range_start', 'verse_range_end', 'perspective', 'prompt_version', name='uq_perspective_summaries_key')
+    )
+
+    # Carry over the perspectives already stored in verse_summaries (newest row
+    # wins), skipping the placeholder text saved when a model call failed
+    op.execute("""
+        INSERT INTO perspective_summaries
+            (verse_range_start, verse_range_end, perspective, prompt_version,
+             response_text, cross_references, created_at, updated_at)
+        SELECT DISTINCT ON (vs.verse_range_start, vs.verse_range_end, p.key)
+               vs.verse_range_start,
+               vs.verse_range_end,
+               p.key,
+               'v1',
+               p.value->>'response_text',
+               COALESCE(p.value->'cross_references', '[]'::json),
+               vs.created_at,
+               vs.created_at
+        FROM verse_summaries vs
+        CROSS JOIN LATERAL json_each(vs.perspectives) AS p
+        WHERE p.value->>'response_text' IS NOT NULL
+          AND p.value->>'response_text' NOT LIKE '%temporarily unavailable%'
+        ORDER BY vs.verse_range_start, vs.verse_range_end, p.key, vs.created_at DESC
+    """)
+
+
+def downgrade():
+    op.drop_table('perspective_summaries')
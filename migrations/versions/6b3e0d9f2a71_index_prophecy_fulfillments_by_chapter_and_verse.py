@@ -0,0 +1,31 @@
+"""Index prophecy_fulfillments by (chapter_id, verse_start_id)
+
+The chapter view filters on chapter_id and orders by verse_start_id, which the
+single-column chapter_id index could not serve in order.
+
+Revision ID: 6b3e0d9f2a71
+Revises: a4e19c6b2d85
+Create Date: 2026-10-16 23:41:17.208519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b3e0d9f2a71'
+down_revision = 'a4e19c6b2d85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('prophecy_fulfillments', schema=None) as batch_op:
+        batch_op.create_index('ix_prophecy_fulfillments_chapter_id_verse_start_id', ['chapter_id', 'verse_start_id'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_prophecy_fulfillments_chapter_id'))
+
+
+def downgrade():
+    with op.batch_alter_table('prophecy_fulfillments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_prophecy_fulfillments_chapter_id'), ['chapter_id'], unique=False)
+        batch_op.drop_index('ix_prophecy_fulfillments_chapter_id_verse_start_id')
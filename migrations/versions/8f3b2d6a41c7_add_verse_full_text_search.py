@@ -0,0 +1,34 @@
+"""Add full-text search vector to verses
+
+Revision ID: 8f3b2d6a41c7
+Revises: 1ce1af0fe8b3
+Create Date: 2026-10-16 10:02:17.284611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3b2d6a41c7'
+down_revision = '1ce1af0fe8b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('verses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'text_search',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', text)", persisted=True),
+            nullable=True
+        ))
+        batch_op.create_index('ix_verses_text_search', ['text_search'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('verses', schema=None) as batch_op:
+        batch_op.drop_index('ix_verses_text_search', postgresql_using='gin')
+        batch_op.drop_column('text_search')
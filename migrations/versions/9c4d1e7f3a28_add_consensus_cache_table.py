@@ -0,0 +1,42 @@
+"""Add consensus_cache table
+
+Revision ID: 9c4d1e7f3a28
+Revises: 5a7e9c0d2b64
+Create Date: 2026-10-16 13:02:41.508216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4d1e7f3a28'
+down_revision = '5a7e9c0d2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('consensus_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('verse_range_start', sa.Integer(), nullable=False),
+    sa.Column('verse_range_end', sa.Integer(), nullable=False),
+    sa.Column('perspectives_key', sa.String(length=400), nullable=False),
+    sa.Column('prompt_version', sa.String(length=40), nullable=False),
+    sa.Column('consensus_data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['verse_range_end'], ['verses.id'], ),
+    sa.ForeignKeyConstraint(['verse_range_start'], ['verses.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('verse_range_start', 'verse_range_end', 'perspectives_key', 'prompt_version', name='uq_consensus_cache_key')
+    )
+    with op.batch_alter_table('consensus_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_consensus_cache_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('consensus_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_consensus_cache_expires_at'))
+
+    op.drop_table('consensus_cache')
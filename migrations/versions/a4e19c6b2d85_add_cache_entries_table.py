@@ -0,0 +1,98 @@
+"""Add cache_entries table and move existing caches onto it
+
+Revision ID: a4e19c6b2d85
+Revises: f2b7d94c1e3a
+Create Date: 2026-10-16 20:27:05.913462
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e19c6b2d85'
+down_revision = 'f2b7d94c1e3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_entries',
+    sa.Column('key', sa.String(length=512), nullable=False),
+    sa.Column('namespace', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.JSON(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.Column('accessed_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('cache_entries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cache_entries_namespace'), ['namespace'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cache_entries_expires_at'), ['expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cache_entries_accessed_at'), ['accessed_at'], unique=False)
+
+    # Carry unexpired consensus results over, keyed the way summary_cache.py builds them
+    op.execute("""
+        INSERT INTO cache_entries (key, namespace, value, expires_at, accessed_at, updated_at)
+        SELECT 'consensus:' || prompt_version || ':' || verse_range_start || ':' || verse_range_end || ':' || perspectives_key,
+               'consensus', consensus_data, expires_at, now(), created_at
+        FROM consensus_cache
+        WHERE expires_at > now()
+        ON CONFLICT (key) DO NOTHING
+    """)
+
+    # Grouped search results are cheap to recompute; the concordance cache was
+    # superseded by strongs_concordance and is no longer read
+    op.drop_table('consensus_cache')
+    op.drop_table('search_cache')
+    op.drop_table('strongs_concordance_cache')
+
+
+def downgrade():
+    op.create_table('strongs_concordance_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('strongs_number', sa.String(length=10), nullable=False),
+    sa.Column('result_data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('strongs_concordance_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_strongs_concordance_cache_strongs_number'), ['strongs_number'], unique=True)
+
+    op.create_table('search_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('query_hash', sa.String(length=64), nullable=False),
+    sa.Column('query_text', sa.Text(), nullable=False),
+    sa.Column('result_data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_accessed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('search_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_search_cache_query_hash'), ['query_hash'], unique=True)
+        batch_op.create_index(batch_op.f('ix_search_cache_last_accessed_at'), ['last_accessed_at'], unique=False)
+
+    op.create_table('consensus_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('verse_range_start', sa.Integer(), nullable=False),
+    sa.Column('verse_range_end', sa.Integer(), nullable=False),
+    sa.Column('perspectives_key', sa.String(length=400), nullable=False),
+    sa.Column('prompt_version', sa.String(length=40), nullable=False),
+    sa.Column('consensus_data', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['verse_range_end'], ['verses.id'], ),
+    sa.ForeignKeyConstraint(['verse_range_start'], ['verses.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('verse_range_start', 'verse_range_end', 'perspectives_key', 'prompt_version', name='uq_consensus_cache_key')
+    )
+    with op.batch_alter_table('consensus_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_consensus_cache_expires_at'), ['expires_at'], unique=False)
+
+    with op.batch_alter_table('cache_entries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cache_entries_accessed_at'))
+        batch_op.drop_index(batch_op.f('ix_cache_entries_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_cache_entries_namespace'))
+
+    op.drop_table('cache_entries')
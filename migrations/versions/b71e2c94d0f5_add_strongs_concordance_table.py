@@ -0,0 +1,32 @@
+"""Add strongs_concordance table
+
+Revision ID: b71e2c94d0f5
+Revises: 9c4d1e7f3a28
+Create Date: 2026-10-16 14:37:12.220954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e2c94d0f5'
+down_revision = '9c4d1e7f3a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Populated by `flask build-concordance` (or lazily per number on first request)
+    op.create_table('strongs_concordance',
+    sa.Column('strongs_number', sa.String(length=10), nullable=False),
+    sa.Column('total_verses', sa.Integer(), nullable=False),
+    sa.Column('total_books', sa.Integer(), nullable=False),
+    sa.Column('book_groups', sa.JSON(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('strongs_number')
+    )
+
+
+def downgrade():
+    op.drop_table('strongs_concordance')
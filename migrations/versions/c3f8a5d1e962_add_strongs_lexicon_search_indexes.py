@@ -0,0 +1,43 @@
+"""Add full-text and trigram search indexes to strongs_entries
+
+Revision ID: c3f8a5d1e962
+Revises: b71e2c94d0f5
+Create Date: 2026-10-16 15:48:30.617245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a5d1e962'
+down_revision = 'b71e2c94d0f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.batch_alter_table('strongs_entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'definition_search',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(definition, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(kjv_usage, '')), 'B')",
+                persisted=True
+            ),
+            nullable=True
+        ))
+        batch_op.create_index('ix_strongs_entries_definition_search', ['definition_search'], unique=False, postgresql_using='gin')
+        batch_op.create_index('ix_strongs_entries_transliteration_trgm', ['transliteration'], unique=False,
+                              postgresql_using='gin', postgresql_ops={'transliteration': 'gin_trgm_ops'})
+
+
+def downgrade():
+    with op.batch_alter_table('strongs_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_strongs_entries_transliteration_trgm', postgresql_using='gin')
+        batch_op.drop_index('ix_strongs_entries_definition_search', postgresql_using='gin')
+        batch_op.drop_column('definition_search')
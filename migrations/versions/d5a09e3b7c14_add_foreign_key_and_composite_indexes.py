@@ -0,0 +1,40 @@
+"""Add foreign-key and composite indexes for hot lookups
+
+Revision ID: d5a09e3b7c14
+Revises: c3f8a5d1e962
+Create Date: 2026-10-16 16:55:03.184402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a09e3b7c14'
+down_revision = 'c3f8a5d1e962'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns). Composite indexes lead with the foreign key, so they
+# also serve plain lookups on it.
+INDEXES = [
+    ('ix_chapters_book_id_chapter_number', 'chapters', 'book_id, chapter_number'),
+    ('ix_verses_chapter_id_verse_number', 'verses', 'chapter_id, verse_number'),
+    ('ix_verse_strongs_mappings_verse_id', 'verse_strongs_mappings', 'verse_id'),
+    ('ix_verse_strongs_mappings_number_verse_position', 'verse_strongs_mappings', 'strongs_number, verse_id, word_position'),
+]
+
+
+def upgrade():
+    # CONCURRENTLY can't run inside a transaction, and doesn't block writes
+    # while building. IF NOT EXISTS makes a re-run after an interrupted
+    # build safe (drop any INVALID leftover index first).
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
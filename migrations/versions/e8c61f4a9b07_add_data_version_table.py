@@ -0,0 +1,30 @@
+"""Add data_version table
+
+Revision ID: e8c61f4a9b07
+Revises: d5a09e3b7c14
+Create Date: 2026-10-16 18:12:44.530718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c61f4a9b07'
+down_revision = 'd5a09e3b7c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('data_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO data_version (id, version, updated_at) VALUES (1, 1, now())")
+
+
+def downgrade():
+    op.drop_table('data_version')
@@ -0,0 +1,32 @@
+"""Add search_cache.last_accessed_at for bounded eviction
+
+Revision ID: f2b7d94c1e3a
+Revises: e8c61f4a9b07
+Create Date: 2026-10-16 19:03:27.184205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7d94c1e3a'
+down_revision = 'e8c61f4a9b07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows are keyed on the raw query text and can never be hit by
+    # the normalized, data-versioned keys, so drop them
+    op.execute("DELETE FROM search_cache")
+
+    with op.batch_alter_table('search_cache', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_accessed_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_search_cache_last_accessed_at'), ['last_accessed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('search_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_search_cache_last_accessed_at'))
+        batch_op.drop_column('last_accessed_at')
@@ -1,4 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import hashlib
 import json
@@ -62,6 +65,9 @@ class Book(db.Model):
 
 class Chapter(db.Model):
     __tablename__ = 'chapters'
+    __table_args__ = (
+        db.Index('ix_chapters_book_id_chapter_number', 'book_id', 'chapter_number'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
@@ -80,6 +86,10 @@ class Chapter(db.Model):
 
 class Verse(db.Model):
     __tablename__ = 'verses'
+    __table_args__ = (
+        db.Index('ix_verses_text_search', 'text_search', postgresql_using='gin'),
+        db.Index('ix_verses_chapter_id_verse_number', 'chapter_id', 'verse_number'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id'), nullable=False)
@@ -87,6 +97,8 @@ class Verse(db.Model):
     text = db.Column(db.Text, nullable=False)
     text_with_strongs = db.Column(db.Text, nullable=True)  # Original text with Strong's numbers
     strongs_numbers = db.Column(db.JSON, nullable=True)  # Array of Strong's numbers in this verse
+    # Full-text search vector, generated by Postgres and GIN indexed (never loaded with the row)
+    text_search = deferred(db.Column(TSVECTOR, db.Computed("to_tsvector('english', text)", persisted=True)))
     
     # Relationships
     
@@ -136,37 +148,59 @@ class VerseSummary(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
-class SearchCache(db.Model):
-    __tablename__ = 'search_cache'
+class PerspectiveSummary(db.Model):
+    """One cached theological analysis per (verse range, perspective, prompt version)"""
+    __tablename__ = 'perspective_summaries'
+    __table_args__ = (
+        db.UniqueConstraint('verse_range_start', 'verse_range_end', 'perspective', 'prompt_version',
+                            name='uq_perspective_summaries_key'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    query_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
-    query_text = db.Column(db.Text, nullable=False)
-    result_data = db.Column(db.JSON, nullable=False)
+    verse_range_start = db.Column(db.Integer, db.ForeignKey('verses.id'), nullable=False)
+    verse_range_end = db.Column(db.Integer, db.ForeignKey('verses.id'), nullable=False)
+    perspective = db.Column(db.String(40), nullable=False)  # TheologicalPerspective value
+    prompt_version = db.Column(db.String(20), nullable=False)
+    response_text = db.Column(db.Text, nullable=False)
+    cross_references = db.Column(db.JSON, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    @staticmethod
-    def generate_query_hash(query_text):
-        """Generate a hash for the search query to enable caching"""
-        return hashlib.sha256(query_text.encode('utf-8')).hexdigest()
-    
-    def __repr__(self):
-        return f'<SearchCache {self.query_text[:50]}...>'
+    def to_dict(self):
+        return {
+            'response_text': self.response_text,
+            'cross_references': self.cross_references
+        }
 
-class StrongsConcordanceCache(db.Model):
-    __tablename__ = 'strongs_concordance_cache'
+class DataVersion(db.Model):
+    """Single-row counter bumped whenever reference data changes; see data_version.py"""
+    __tablename__ = 'data_version'
     
-    id = db.Column(db.Integer, primary_key=True)
-    strongs_number = db.Column(db.String(10), unique=True, nullable=False, index=True)
-    result_data = db.Column(db.JSON, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    id = db.Column(db.Integer, primary_key=True)  # Always 1
+    version = db.Column(db.BigInteger, nullable=False, default=1)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CacheEntry(db.Model):
+    """Shared tier of the cache API in cache.py; keys are 'namespace:version:key'"""
+    __tablename__ = 'cache_entries'
+    
+    key = db.Column(db.String(512), primary_key=True)
+    namespace = db.Column(db.String(100), nullable=False, index=True)
+    value = db.Column(db.JSON, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # None never expires
+    accessed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Drives size-based eviction
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
-        return f'<StrongsConcordanceCache {self.strongs_number}>'
+        return f'<CacheEntry {self.key[:50]}>'
 
 class StrongsEntry(db.Model):
     __tablename__ = 'strongs_entries'
+    __table_args__ = (
+        db.Index('ix_strongs_entries_definition_search', 'definition_search', postgresql_using='gin'),
+        db.Index('ix_strongs_entries_transliteration_trgm', 'transliteration',
+                 postgresql_using='gin', postgresql_ops={'transliteration': 'gin_trgm_ops'}),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     strongs_number = db.Column(db.String(10), unique=True, nullable=False, index=True)  # e.g., "H430", "G2316"
@@ -176,6 +210,12 @@ class StrongsEntry(db.Model):
     definition = db.Column(db.Text)
     kjv_usage = db.Column(db.Text)  # How it's used in KJV
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Weighted search vector (definition A, KJV usage B), generated by Postgres and GIN indexed
+    definition_search = deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('english', coalesce(definition, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(kjv_usage, '')), 'B')",
+        persisted=True
+    )))
     
     # Relationships
     verse_mappings = db.relationship('VerseStrongsMapping', 
@@ -197,9 +237,12 @@ class StrongsEntry(db.Model):
 
 class VerseStrongsMapping(db.Model):
     __tablename__ = 'verse_strongs_mappings'
+    __table_args__ = (
+        db.Index('ix_verse_strongs_mappings_number_verse_position', 'strongs_number', 'verse_id', 'word_position'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    verse_id = db.Column(db.Integer, db.ForeignKey('verses.id'), nullable=False)
+    verse_id = db.Column(db.Integer, db.ForeignKey('verses.id'), nullable=False, index=True)
     strongs_number = db.Column(db.String(10), nullable=False, index=True)
     word_position = db.Column(db.Integer, nullable=False)  # Position of word in verse
     grammatical_info = db.Column(db.String(20), nullable=True)  # e.g., (H8804) for verb forms
@@ -218,6 +261,22 @@ class VerseStrongsMapping(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class StrongsConcordance(db.Model):
+    """Precomputed per-book occurrence counts and sample verses for one Strong's number.
+    
+    Built in bulk by `flask build-concordance`; see concordance.py.
+    """
+    __tablename__ = 'strongs_concordance'
+    
+    strongs_number = db.Column(db.String(10), primary_key=True)
+    total_verses = db.Column(db.Integer, nullable=False)  # Mapping rows, as the concordance has always counted
+    total_books = db.Column(db.Integer, nullable=False)
+    book_groups = db.Column(db.JSON, nullable=False)  # [[book_id, verse_count, [sample verse ids]], ...] by book id
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<StrongsConcordance {self.strongs_number}>'
+
 # ===== BOOK AND CHAPTER METADATA TABLES =====
 
 class BookMetadata(db.Model):
@@ -313,3 +372,62 @@ class MessianicProphecy(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'start_verse_reference': f"{self.start_verse.chapter.book.name} {self.start_verse.chapter.chapter_number}:{self.start_verse.verse_number}" if self.start_verse else None
         }
+
+    def sync_fulfillments(self):
+        """Rebuild the normalized fulfillment rows from fulfillment_references (call after import/edit).
+
+        Also bumps the data version in the same transaction, so cached chapter
+        payloads and ETags change once the caller commits.
+        """
+        from data_version import bump_data_version
+
+        refs = self.fulfillment_references or []
+        start_ids = {ref['verse_start_id'] for ref in refs if ref.get('verse_start_id')}
+        # Two queries for the whole list: the start verses, then the end verses in their chapters
+        start_verses = {verse.id: verse for verse in Verse.query.filter(Verse.id.in_(start_ids))} if start_ids else {}
+
+        def end_key(ref, start_verse):
+            return start_verse.chapter_id, ref.get('verse_end', start_verse.verse_number)
+
+        end_keys = {
+            end_key(ref, start_verses[ref['verse_start_id']]) for ref in refs if ref.get('verse_start_id') in start_verses
+        }
+        end_verses = {
+            (verse.chapter_id, verse.verse_number): verse
+            for verse in Verse.query.filter(tuple_(Verse.chapter_id, Verse.verse_number).in_(end_keys))
+        } if end_keys else {}
+
+        self.fulfillments = []
+        for position, ref in enumerate(refs):
+            start_verse = start_verses.get(ref.get('verse_start_id'))
+            if not start_verse:
+                continue
+            end_verse = end_verses.get(end_key(ref, start_verse)) or start_verse
+            self.fulfillments.append(ProphecyFulfillment(
+                verse_start_id=start_verse.id,
+                verse_end_id=end_verse.id,
+                chapter_id=start_verse.chapter_id,
+                fulfillment_type=ref['fulfillment_type'],
+                position=position
+            ))
+        bump_data_version(commit=False)
+
+class ProphecyFulfillment(db.Model):
+    __tablename__ = 'prophecy_fulfillments'
+    __table_args__ = (
+        # A chapter's fulfillments, already in the order the chapter view lists them
+        db.Index('ix_prophecy_fulfillments_chapter_id_verse_start_id', 'chapter_id', 'verse_start_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    prophecy_id = db.Column(db.Integer, db.ForeignKey('messianic_prophecies.id', ondelete='CASCADE'), nullable=False, index=True)
+    verse_start_id = db.Column(db.Integer, db.ForeignKey('verses.id'), nullable=False, index=True)
+    verse_end_id = db.Column(db.Integer, db.ForeignKey('verses.id'), nullable=False)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id'), nullable=False)  # Chapter of verse_start_id
+    fulfillment_type = db.Column(db.String(20), nullable=False)  # FulfillmentType value, e.g. "direct"
+    position = db.Column(db.Integer, nullable=False)  # Index within fulfillment_references
+    
+    # Relationships
+    prophecy = db.relationship('MessianicProphecy', backref=db.backref(
+        'fulfillments', lazy=True, cascade='all, delete-orphan', order_by='ProphecyFulfillment.position'
+    ))
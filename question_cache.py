@@ -0,0 +1,160 @@
+"""In-process answer cache for /api/analysis/question.
+
+Answers are cached per (verse range, perspective, normalized question). The
+normalized form is case-folded with punctuation and stop words removed, so
+"What does this verse mean?" and "what does THIS verse mean" share an entry.
+Negations, interrogatives and temporal or comparative words are never
+dropped, so "Is salvation by faith?" and "Is salvation not by faith?" stay
+distinct. An optional similarity tier compares MinHash signatures of the
+normalized questions' character shingles, so close paraphrases of a cached
+question hit without any embedding model; it only compares questions that
+share the same set of those words. Entries are evicted least-recently-used once the
+cache holds QUESTION_CACHE_MAX_ENTRIES answers.
+"""
+from collections import OrderedDict
+import hashlib
+import random
+import re
+import threading
+
+from ai_client import FallbackAnalysis
+import config
+from search_service import STOP_WORDS
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+
+_WORD_PATTERN = re.compile(r'[0-9a-z]+')
+_NEGATION_PATTERN = re.compile(r"n['’]t\b")
+
+# Stop words that change what a question asks: negations, interrogatives,
+# temporal and comparative words, and quantifiers
+MEANING_WORDS = frozenset("""
+no nor not never none nothing cannot without against
+who whom whose what which when where why how whether
+before after during until since while once again then now
+above below over under between more most less least than too very
+all any both each few some only same other
+""".split())
+QUESTION_STOP_WORDS = STOP_WORDS - MEANING_WORDS
+
+# Fixed seed, so signatures are comparable across the life of the process
+_rng = random.Random(1662)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize_question(question):
+    """Case-fold, spell out "n't" as "not", drop punctuation and stop words, collapse whitespace"""
+    words = _WORD_PATTERN.findall(_NEGATION_PATTERN.sub(' not', question.casefold()))
+    content = [word for word in words if word not in QUESTION_STOP_WORDS]
+    # A question made only of stop words keeps them rather than normalizing to nothing
+    return ' '.join(content or words)
+
+
+def meaning_words(normalized):
+    """The MEANING_WORDS in a normalized question, as a sorted, space-separated string"""
+    return ' '.join(sorted(set(normalized.split()) & MEANING_WORDS))
+
+
+def minhash_signature(normalized):
+    """MinHash signature over the character shingles of a normalized question"""
+    text = f' {normalized} '
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for shingle in shingles
+    ]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_similarity(signature, other):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+
+
+class QuestionCache:
+    """Thread-safe, size-bounded LRU of question answers with an optional similarity tier"""
+
+    def __init__(self, max_entries, similarity_threshold=None):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (signature, analysis)
+        self._buckets = {}  # (start, end, perspective, meaning words) -> keys, for the similarity scan
+        self._stats = {'exact_hits': 0, 'similar_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, start_verse_id, end_verse_id, perspective, question):
+        """Return (analysis, 'exact' | 'similar') for a cached answer, or (None, None)"""
+        normalized = normalize_question(question)
+        bucket = (start_verse_id, end_verse_id, perspective.value, meaning_words(normalized))
+        key = bucket + (normalized,)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats['exact_hits'] += 1
+                return self._entries[key][1], 'exact'
+
+        if self.similarity_threshold:
+            signature = minhash_signature(normalized)
+            with self._lock:
+                best_key, best_score = None, self.similarity_threshold
+                for candidate in self._buckets.get(bucket, ()):
+                    score = estimated_similarity(signature, self._entries[candidate][0])
+                    if score >= best_score:
+                        best_key, best_score = candidate, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self._stats['similar_hits'] += 1
+                    return self._entries[best_key][1], 'similar'
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None, None
+
+    def put(self, start_verse_id, end_verse_id, perspective, question, analysis):
+        """Cache an answer; fallback placeholders are never cached"""
+        if isinstance(analysis, FallbackAnalysis):
+            return
+
+        normalized = normalize_question(question)
+        bucket = (start_verse_id, end_verse_id, perspective.value, meaning_words(normalized))
+        key = bucket + (normalized,)
+        signature = minhash_signature(normalized) if self.similarity_threshold else None
+
+        with self._lock:
+            self._entries[key] = (signature, analysis)
+            self._entries.move_to_end(key)
+            self._buckets.setdefault(bucket, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                evicted_bucket = evicted[:4]
+                self._buckets[evicted_bucket].discard(evicted)
+                if not self._buckets[evicted_bucket]:
+                    del self._buckets[evicted_bucket]
+                self._stats['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['exact_hits'] + self._stats['similar_hits'] + self._stats['misses']
+            hits = self._stats['exact_hits'] + self._stats['similar_hits']
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                hit_rate=round(hits / lookups, 3) if lookups else None
+            )
+
+
+question_cache = QuestionCache(
+    max_entries=config.QUESTION_CACHE_MAX_ENTRIES,
+    similarity_threshold=config.QUESTION_CACHE_SIMILARITY if config.QUESTION_CACHE_SIMILARITY_ENABLED else None
+)
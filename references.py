@@ -0,0 +1,299 @@
+"""Bible reference parsing and resolution against the canon store.
+
+Parses references such as "John 3:16", "1 Jn 3:16-18", "Gen 1:1-2:3",
+"Ps 23", "Rom 8:28, 31; 12:1-2" and "Jude 5", and resolves them to verse
+position ranges without touching the database. Book names are looked up in
+an alias table built from the canon: full names, abbreviations, common
+variants, ordinal spellings ("I John", "First John", "1st John") and any
+unambiguous name prefix ("Gen", "Deut", "Rev").
+"""
+from collections import namedtuple
+import re
+import threading
+
+from canon import get_canon
+
+
+class InvalidReference(ValueError):
+    """The reference text could not be parsed"""
+
+
+class ReferenceNotFound(ValueError):
+    """The reference parsed but names a book, chapter or verse that doesn't exist"""
+
+
+# A resolved reference: verse positions [start_position, end_position], inclusive
+VerseRange = namedtuple('VerseRange', ['book', 'start_position', 'end_position'])
+
+# Common abbreviations that are not prefixes of the full name, or whose prefix is ambiguous
+COMMON_ALIASES = {
+    'genesis': ['gn'],
+    'exodus': ['ex'],
+    'leviticus': ['lv'],
+    'numbers': ['nm', 'nb'],
+    'deuteronomy': ['dt'],
+    'joshua': ['jsh'],
+    'judges': ['jdg', 'jg', 'jdgs'],
+    'ruth': ['rth'],
+    '1samuel': ['1sm'],
+    '2samuel': ['2sm'],
+    '1kings': ['1kgs', '1kg'],
+    '2kings': ['2kgs', '2kg'],
+    '1chronicles': ['1chr', '1ch'],
+    '2chronicles': ['2chr', '2ch'],
+    'nehemiah': ['nh'],
+    'esther': ['es'],
+    'job': ['jb'],
+    'psalms': ['ps', 'psa', 'psalm', 'pss', 'psm'],
+    'proverbs': ['pr', 'prv'],
+    'ecclesiastes': ['ec', 'eccl', 'qoh'],
+    'songofsolomon': ['song', 'sos', 'songofsongs', 'canticles', 'ss'],
+    'isaiah': ['is'],
+    'jeremiah': ['jr'],
+    'lamentations': ['lm'],
+    'ezekiel': ['ezk', 'ek'],
+    'daniel': ['dn'],
+    'hosea': ['hs'],
+    'joel': ['jl'],
+    'amos': ['am'],
+    'obadiah': ['ob'],
+    'jonah': ['jnh'],
+    'micah': ['mc'],
+    'nahum': ['na'],
+    'habakkuk': ['hab'],
+    'zephaniah': ['zp'],
+    'haggai': ['hg'],
+    'zechariah': ['zc'],
+    'malachi': ['ml'],
+    'matthew': ['mt'],
+    'mark': ['mk', 'mrk'],
+    'luke': ['lk'],
+    'john': ['jn', 'jhn'],
+    'acts': ['ac'],
+    'romans': ['rm'],
+    '1corinthians': ['1cor'],
+    '2corinthians': ['2cor'],
+    'philippians': ['phil', 'php', 'pp'],
+    'colossians': ['cl'],
+    '1thessalonians': ['1th', '1thess'],
+    '2thessalonians': ['2th', '2thess'],
+    '1timothy': ['1tm'],
+    '2timothy': ['2tm'],
+    'philemon': ['phlm', 'phm', 'philem'],
+    'hebrews': ['hb', 'heb'],
+    'james': ['jas', 'jm'],
+    '1john': ['1jn', '1jhn'],
+    '2john': ['2jn', '2jhn'],
+    '3john': ['3jn', '3jhn'],
+    'jude': ['jud', 'jd'],
+    'revelation': ['rv', 'revelations', 'apocalypse'],
+}
+
+MIN_PREFIX_LENGTH = 2
+
+# Longer input is rejected before parsing; item parsing is quadratic in runs of whitespace
+MAX_REFERENCE_LENGTH = 1000
+
+_ORDINALS = {
+    'i': '1', 'ii': '2', 'iii': '3',
+    'first': '1', 'second': '2', 'third': '3',
+    '1st': '1', '2nd': '2', '3rd': '3',
+}
+
+_ORDINAL_PATTERN = re.compile(r'^(i{1,3}|first|second|third|1st|2nd|3rd)\b\s*')
+
+# One item of a reference list: [book] chapter[:verse][-[chapter:]verse]
+_ITEM_PATTERN = re.compile(r"""
+    ^\s*
+    (?P<book>(?:[1-3]\s*|(?:i{1,3}|first|second|third|1st|2nd|3rd)\s+)?[a-z][a-z.'\s]*?)?
+    \s*
+    (?P<chapter>\d+)
+    (?:\s*[:.]\s*(?P<verse>\d+))?
+    (?:\s*[-–—]\s*(?P<end>\d+)(?:\s*[:.]\s*(?P<end_verse>\d+))?)?
+    \s*$
+""", re.VERBOSE)
+
+
+def normalize_book_name(name):
+    """Alias-table key for a book name: lowercase, no punctuation or spaces, ordinals as digits"""
+    name = name.lower().replace('.', ' ').strip()
+    match = _ORDINAL_PATTERN.match(name)
+    if match and len(name) > match.end():
+        name = _ORDINALS[match.group(1)] + name[match.end():]
+    return re.sub(r"[^0-9a-z]", '', name)
+
+
+class ReferenceResolver:
+    """Alias table and reference resolution for one canon snapshot"""
+
+    def __init__(self, canon):
+        self.canon = canon
+        self.aliases = {}
+
+        books_by_key = {normalize_book_name(book.name): book for book in canon.books}
+
+        # Unambiguous prefixes of full names
+        prefixes = {}
+        for key, book in books_by_key.items():
+            for length in range(MIN_PREFIX_LENGTH, len(key)):
+                prefixes.setdefault(key[:length], set()).add(book.id)
+        for prefix, book_ids in prefixes.items():
+            if len(book_ids) == 1:
+                self.aliases[prefix] = canon.get_book(next(iter(book_ids)))
+
+        # Explicit variants and abbreviations override prefixes; full names override everything
+        for key, variants in COMMON_ALIASES.items():
+            if key in books_by_key:
+                for variant in variants:
+                    self.aliases[variant] = books_by_key[key]
+        for book in canon.books:
+            self.aliases[normalize_book_name(book.abbreviation)] = book
+        self.aliases.update(books_by_key)
+
+    def find_book(self, name):
+        """Book for a name, abbreviation or alias, or None"""
+        return self.aliases.get(normalize_book_name(name))
+
+    def resolve(self, text):
+        """Resolve a reference list to VerseRanges, in the order given.
+
+        Items are separated by ';' or ','. An item without a book continues
+        the previous item's book, and a bare number after a verse reference
+        is another verse of the same chapter ("John 3:16, 18").
+        """
+        if not text or not text.strip():
+            raise InvalidReference('Empty reference')
+        if len(text) > MAX_REFERENCE_LENGTH:
+            raise InvalidReference(f'Reference is longer than {MAX_REFERENCE_LENGTH} characters')
+
+        ranges = []
+        book = None
+        chapter = None  # Set while a bare number means a verse of this chapter
+
+        for group in text.lower().split(';'):
+            for item in group.split(','):
+                match = _ITEM_PATTERN.match(item)
+                if not match:
+                    raise InvalidReference(f'Could not parse "{item.strip()}"')
+
+                if match.group('book'):
+                    book = self.find_book(match.group('book'))
+                    if book is None:
+                        raise ReferenceNotFound(f'Book "{match.group("book").strip()}" not found')
+                    chapter = None
+                elif book is None:
+                    raise InvalidReference(f'"{item.strip()}" has no book')
+
+                verse_range, verse_level = self._resolve_item(book, match, chapter)
+                ranges.append(verse_range)
+                chapter = self.canon.verse_chapters[verse_range.end_position] if verse_level else None
+            # A new ';' group never continues the previous chapter
+            chapter = None
+
+        return ranges
+
+    def _resolve_item(self, book, match, current_chapter):
+        """Resolve one parsed item; also returns whether it named verses (not whole chapters)"""
+        chapter_number, verse_number, end_number, end_verse_number = [
+            int(value) if value else None
+            for value in match.group('chapter', 'verse', 'end', 'end_verse')
+        ]
+
+        if verse_number is None and (current_chapter is not None or book.chapter_end - book.chapter_start == 1):
+            # "John 3:16, 18-20" continues chapter 3; "Jude 5" names a verse of a single-chapter book
+            start_chapter = current_chapter if current_chapter is not None else book.chapter_start
+            start_verse, verse_level = chapter_number, True
+            if end_verse_number is not None:
+                end_chapter, end_verse = self._chapter(book, end_number), end_verse_number
+            else:
+                end_chapter, end_verse = start_chapter, end_number or chapter_number
+        else:
+            start_chapter = self._chapter(book, chapter_number)
+            start_verse, verse_level = verse_number, verse_number is not None
+            if end_number is None:
+                # "John 3:16" or "Ps 23"
+                end_chapter, end_verse = start_chapter, verse_number
+            elif end_verse_number is not None or verse_number is None:
+                # "Gen 1:1-2:3" or "Gen 1-2"
+                end_chapter, end_verse = self._chapter(book, end_number), end_verse_number
+            else:
+                # "John 3:16-18"
+                end_chapter, end_verse = start_chapter, end_number
+
+        start = self._verse(start_chapter, start_verse, first=True)
+        end = self._verse(end_chapter, end_verse, first=False)
+        if end < start:
+            raise InvalidReference('Reference range ends before it starts')
+        return VerseRange(book, start, end), verse_level
+
+    def _chapter(self, book, chapter_number):
+        position = self.canon.find_chapter(book.id, chapter_number)
+        if position is None:
+            raise ReferenceNotFound(f'Chapter {chapter_number} not found in {book.name}')
+        return position
+
+    def _verse(self, chapter_position, verse_number, first):
+        """Verse position; a missing verse number means the chapter's first or last verse"""
+        verses = self.canon.chapter_verses(chapter_position)
+        if verse_number is None:
+            if not verses:
+                raise ReferenceNotFound('Chapter has no verses')
+            return verses[0] if first else verses[-1]
+        position = self.canon.find_verse(chapter_position, verse_number)
+        if position is None:
+            book = self.canon.chapter_book(chapter_position)
+            raise ReferenceNotFound(
+                f'Verse {verse_number} not found in {book.name} {self.canon.chapter_numbers[chapter_position]}'
+            )
+        return position
+
+    def resolve_parts(self, book_name, chapter_number, verse_start, verse_end=None):
+        """VerseRange for structured reference parts, or None if they don't name real verses"""
+        book = self.find_book(book_name or '')
+        if book is None:
+            return None
+        chapter_position = self.canon.find_chapter(book.id, chapter_number)
+        if chapter_position is None:
+            return None
+        start = self.canon.find_verse(chapter_position, verse_start)
+        end = self.canon.find_verse(chapter_position, verse_end) if verse_end else start
+        if start is None or end is None or end < start:
+            return None
+        return VerseRange(book, start, end)
+
+    def format(self, verse_range):
+        """Canonical reference string for a VerseRange"""
+        canon = self.canon
+        start, end = verse_range.start_position, verse_range.end_position
+        start_chapter, end_chapter = canon.verse_chapters[start], canon.verse_chapters[end]
+        name = verse_range.book.name
+
+        if start_chapter == end_chapter:
+            chapter_number = canon.chapter_numbers[start_chapter]
+            verses = canon.chapter_verses(start_chapter)
+            if start == verses[0] and end == verses[-1]:
+                return f"{name} {chapter_number}"
+            if start == end:
+                return f"{name} {chapter_number}:{canon.verse_numbers[start]}"
+            return f"{name} {chapter_number}:{canon.verse_numbers[start]}-{canon.verse_numbers[end]}"
+
+        return (
+            f"{name} {canon.chapter_numbers[start_chapter]}:{canon.verse_numbers[start]}-"
+            f"{canon.chapter_numbers[end_chapter]}:{canon.verse_numbers[end]}"
+        )
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_reference_resolver():
+    """Return the resolver for the current canon snapshot, rebuilding it after a canon reload"""
+    global _resolver
+
+    canon = get_canon()
+    if _resolver is None or _resolver.canon is not canon:
+        with _resolver_lock:
+            if _resolver is None or _resolver.canon is not canon:
+                _resolver = ReferenceResolver(canon)
+    return _resolver
@@ -1,19 +1,36 @@
-from flask import Blueprint, request, jsonify
-from models import Verse, VerseSummary, db
-from ai_client import gemini_client, TheologicalPerspective, TheologicalAnalysis
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from models import db
+from ai_client import (
+    gemini_client, TheologicalPerspective, TheologicalAnalysis, GenerationMode,
+    FallbackAnalysis, FallbackConsensusAnalysis
+)
+from cache import cache_stats
+from db_pool import pool_stats, release_db_connection
+from canon import get_canon
+from question_cache import question_cache
+from references import get_reference_resolver
+from summary_cache import get_or_generate_analyses, get_cached_consensus, store_consensus, stream_analyses
+import config
 from marshmallow import Schema, fields, ValidationError
+import json
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+if config.ANALYSIS_DEBUG_LOGGING:
+    logger.setLevel(logging.DEBUG)
 
 analysis_bp = Blueprint('analysis', __name__)
 
+GENERATION_MODES = [mode.value for mode in GenerationMode]
+STREAM_FORMATS = ['sse', 'ndjson']
+
 class SummaryRequestSchema(Schema):
     verse_range_start = fields.Int(required=True)
     verse_range_end = fields.Int(required=False)
     perspectives = fields.List(fields.Str(), required=False)
+    generation_mode = fields.Str(required=False, validate=lambda x: x in GENERATION_MODES)
 
 class QuestionRequestSchema(Schema):
     verse_range_start = fields.Int(required=True)
@@ -21,12 +38,19 @@ class QuestionRequestSchema(Schema):
     question = fields.Str(required=True, validate=lambda x: len(x.strip()) > 0)
     perspectives = fields.List(fields.Str(), required=False)
 
+class SummaryStreamRequestSchema(SummaryRequestSchema):
+    stream_tokens = fields.Bool(required=False)  # Also send raw model output chunks as they arrive
+
+class QuestionStreamRequestSchema(QuestionRequestSchema):
+    stream_tokens = fields.Bool(required=False)
+
 class ScholarlyConsensusRequestSchema(Schema):
     verse_range_start = fields.Int(required=True)
     verse_range_end = fields.Int(required=False)
     existing_analysis_id = fields.Str(required=False)  # Future: reference to cached analysis
     perspectives = fields.List(fields.Str(), required=False)
     existing_analyses = fields.List(fields.Dict(), required=False)  # Accept existing analyses from frontend
+    generation_mode = fields.Str(required=False, validate=lambda x: x in GENERATION_MODES)
 
 def validate_perspectives(perspective_names):
     """Validate that perspective names are valid"""
@@ -41,32 +65,97 @@ def get_verse_text_and_reference(start_verse_id, end_verse_id=None):
     if end_verse_id is None:
         end_verse_id = start_verse_id
     
-    start_verse = Verse.query.get(start_verse_id)
-    end_verse = Verse.query.get(end_verse_id)
+    canon = get_canon()
+    start_position = canon.get_verse(start_verse_id)
+    end_position = canon.get_verse(end_verse_id)
     
-    if not start_verse or not end_verse:
+    if start_position is None or end_position is None:
         return None, None, "Verse(s) not found"
     
     # Get all verses in range
-    verses = Verse.query.filter(
-        Verse.id >= start_verse_id,
-        Verse.id <= end_verse_id
-    ).order_by(Verse.id).all()
+    verse_positions = canon.verse_id_range(start_verse_id, end_verse_id)
     
-    if not verses:
+    if not verse_positions:
         return None, None, "No verses found in range"
     
     # Combine text
-    combined_text = ' '.join([verse.text for verse in verses])
+    combined_text = ' '.join([canon.texts[position] for position in verse_positions])
     
     # Create reference
     if start_verse_id == end_verse_id:
-        reference = f"{start_verse.chapter.book.name} {start_verse.chapter.chapter_number}:{start_verse.verse_number}"
+        reference = canon.verse_reference(start_position)
     else:
-        reference = f"{start_verse.chapter.book.name} {start_verse.chapter.chapter_number}:{start_verse.verse_number}-{end_verse.verse_number}"
+        reference = f"{canon.verse_reference(start_position)}-{canon.verse_numbers[end_position]}"
     
     return combined_text, reference, None
 
+def get_strongs_data(start_verse_id, end_verse_id):
+    """Get Strong's data for the first verse in the range, if available"""
+    canon = get_canon()
+    verse_positions = canon.verse_id_range(start_verse_id, end_verse_id)
+    
+    if verse_positions and canon.texts_with_strongs[verse_positions[0]]:
+        return {
+            'text_with_strongs': canon.texts_with_strongs[verse_positions[0]],
+            'strongs_numbers': canon.strongs_numbers[verse_positions[0]] or []
+        }
+    return None
+
+def resolve_perspective_analyses(start_verse_id, end_verse_id, verse_text, reference, perspectives, mode=None):
+    """Get analyses for the requested perspectives, generating only the uncached ones.
+    
+    Returns (analyses in requested order, set of perspectives served from cache).
+    """
+    def generate(missing):
+        strongs_data = get_strongs_data(start_verse_id, end_verse_id)
+        return gemini_client.generate_verse_summary(verse_text, reference, missing, strongs_data, mode=mode).analyses
+    
+    # Identical in-flight requests share one generation per perspective
+    analyses, cached = get_or_generate_analyses(start_verse_id, end_verse_id, perspectives, generate)
+    return [analyses[p] for p in perspectives], cached
+
+def resolve_cross_references(cross_references):
+    """Resolve model-written cross references to canonical verses, dropping any that don't exist.
+    
+    Each kept reference gains its verse ids, canonical reference and verse text,
+    so the client needs no follow-up /reference lookups.
+    """
+    resolver = get_reference_resolver()
+    canon = resolver.canon
+    resolved = []
+    
+    for ref in cross_references:
+        verse_range = resolver.resolve_parts(ref.book, ref.chapter, ref.verse_start, ref.verse_end)
+        if verse_range is None:
+            continue
+        positions = range(verse_range.start_position, verse_range.end_position + 1)
+        ref_data = ref.dict()
+        ref_data.update({
+            'start_verse_id': canon.verse_ids[verse_range.start_position],
+            'end_verse_id': canon.verse_ids[verse_range.end_position],
+            'canonical_reference': resolver.format(verse_range),
+            'text': ' '.join(canon.texts[position] for position in positions)
+        })
+        resolved.append(ref_data)
+    
+    return resolved
+
+def serialize_analyses(analyses):
+    """Convert analyses to the response format: (perspectives dict, combined cross references)"""
+    perspectives_data = {}
+    all_cross_references = []
+    
+    for analysis in analyses:
+        perspective_key = analysis.perspective_name.value
+        cross_references = resolve_cross_references(analysis.cross_references)
+        perspectives_data[perspective_key] = {
+            'response_text': analysis.response_text,
+            'cross_references': cross_references
+        }
+        all_cross_references.extend(cross_references)
+    
+    return perspectives_data, all_cross_references
+
 @analysis_bp.route('/summary', methods=['POST'])
 def generate_summary():
     """Generate theological summary for verse(s) from multiple perspectives"""
@@ -93,79 +182,12 @@ def generate_summary():
     except ValidationError as err:
         return jsonify({'error': str(err)}), 400
     
-    # Check if summary already exists in cache
-    text_hash = VerseSummary.generate_text_hash(verse_text)
-    cached_summary = VerseSummary.query.filter_by(
-        verse_range_start=start_verse_id,
-        verse_range_end=end_verse_id,
-        selected_text_hash=text_hash
-    ).first()
-    
-    if cached_summary:
-        # Filter cached perspectives based on requested ones
-        filtered_perspectives = {}
-        for perspective in perspectives:
-            perspective_key = perspective.value
-            if perspective_key in cached_summary.perspectives:
-                filtered_perspectives[perspective_key] = cached_summary.perspectives[perspective_key]
-        
-        if filtered_perspectives:
-            return jsonify({
-                'verse_range_start': start_verse_id,
-                'verse_range_end': end_verse_id,
-                'reference': reference,
-                'verse_text': verse_text,
-                'perspectives': filtered_perspectives,
-                'cross_references': cached_summary.cross_references,
-                'cached': True
-            }), 200
-    
-    # Prepare Strong's data if available
-    strongs_data = None
-    # Get verses for Strong's data
-    verse_objects = Verse.query.filter(
-        Verse.id >= start_verse_id,
-        Verse.id <= end_verse_id
-    ).order_by(Verse.id).all()
-    
-    if verse_objects and verse_objects[0].text_with_strongs:
-        strongs_data = {
-            'text_with_strongs': verse_objects[0].text_with_strongs,
-            'strongs_numbers': verse_objects[0].strongs_numbers or []
-        }
-    
-    # Generate new analysis
+    # Serve cached perspectives and generate only the missing ones
     try:
-        analysis_result = gemini_client.generate_verse_summary(verse_text, reference, perspectives, strongs_data)
-        
-        # Convert to storage format
-        perspectives_data = {}
-        all_cross_references = []
-        
-        for analysis in analysis_result.analyses:
-            perspective_key = analysis.perspective_name.value
-            perspectives_data[perspective_key] = {
-                'response_text': analysis.response_text,
-                'cross_references': [ref.dict() for ref in analysis.cross_references]
-            }
-            all_cross_references.extend([ref.dict() for ref in analysis.cross_references])
-        
-        # Save to cache if we don't have it already
-        if not cached_summary:
-            summary = VerseSummary(
-                verse_range_start=start_verse_id,
-                verse_range_end=end_verse_id,
-                selected_text_hash=text_hash,
-                perspectives=perspectives_data,
-                cross_references=all_cross_references
-            )
-            db.session.add(summary)
-            db.session.commit()
-        else:
-            # Update existing cache with new perspectives
-            cached_summary.perspectives.update(perspectives_data)
-            cached_summary.cross_references.extend(all_cross_references)
-            db.session.commit()
+        analyses, cached = resolve_perspective_analyses(
+            start_verse_id, end_verse_id, verse_text, reference, perspectives, mode=data.get('generation_mode')
+        )
+        perspectives_data, all_cross_references = serialize_analyses(analyses)
         
         return jsonify({
             'verse_range_start': start_verse_id,
@@ -174,12 +196,24 @@ def generate_summary():
             'verse_text': verse_text,
             'perspectives': perspectives_data,
             'cross_references': all_cross_references,
-            'cached': False
+            'cached': len(cached) == len(perspectives),
+            'cached_perspectives': [p.value for p in perspectives if p in cached]
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to generate analysis: {str(e)}'}), 500
 
+def lookup_question_answers(start_verse_id, end_verse_id, perspectives, question):
+    """Return ({perspective: cached analysis}, {perspective value: 'exact' | 'similar'})"""
+    analyses = {}
+    cache_hits = {}
+    for perspective in perspectives:
+        analysis, match = question_cache.get(start_verse_id, end_verse_id, perspective, question)
+        if analysis is not None:
+            analyses[perspective] = analysis
+            cache_hits[perspective.value] = match
+    return analyses, cache_hits
+
 @analysis_bp.route('/question', methods=['POST'])
 def answer_question():
     """Answer a specific question about verse(s) from multiple theological perspectives"""
@@ -208,34 +242,20 @@ def answer_question():
         return jsonify({'error': str(err)}), 400
     
     # Prepare Strong's data if available
-    strongs_data = None
-    # Get verses for Strong's data
-    verse_objects = Verse.query.filter(
-        Verse.id >= start_verse_id,
-        Verse.id <= end_verse_id
-    ).order_by(Verse.id).all()
-    
-    if verse_objects and verse_objects[0].text_with_strongs:
-        strongs_data = {
-            'text_with_strongs': verse_objects[0].text_with_strongs,
-            'strongs_numbers': verse_objects[0].strongs_numbers or []
-        }
+    strongs_data = get_strongs_data(start_verse_id, end_verse_id)
     
-    # Generate response (never cached for questions)
+    # Serve answers to the same (or a closely paraphrased) question from cache, generate the rest
     try:
-        analysis_result = gemini_client.generate_question_response(verse_text, reference, question, perspectives, strongs_data)
+        analyses, cache_hits = lookup_question_answers(start_verse_id, end_verse_id, perspectives, question)
+        missing = [p for p in perspectives if p not in analyses]
+        if missing:
+            release_db_connection()
+            analysis_result = gemini_client.generate_question_response(verse_text, reference, question, missing, strongs_data)
+            for perspective, analysis in zip(missing, analysis_result.analyses):
+                question_cache.put(start_verse_id, end_verse_id, perspective, question, analysis)
+                analyses[perspective] = analysis
         
-        # Convert to storage format
-        perspectives_data = {}
-        all_cross_references = []
-        
-        for analysis in analysis_result.analyses:
-            perspective_key = analysis.perspective_name.value
-            perspectives_data[perspective_key] = {
-                'response_text': analysis.response_text,
-                'cross_references': [ref.dict() for ref in analysis.cross_references]
-            }
-            all_cross_references.extend([ref.dict() for ref in analysis.cross_references])
+        perspectives_data, all_cross_references = serialize_analyses([analyses[p] for p in perspectives])
         
         return jsonify({
             'verse_range_start': start_verse_id,
@@ -245,23 +265,219 @@ def answer_question():
             'question': question,
             'perspectives': perspectives_data,
             'cross_references': all_cross_references,
+            'cache': {
+                'hits': cache_hits,
+                'misses': [p.value for p in missing],
+                'stats': question_cache.stats()
+            }
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to generate response: {str(e)}'}), 500
 
+def perspective_event(perspective, analysis, cached):
+    return {
+        'perspective': perspective.value,
+        'response_text': analysis.response_text,
+        'cross_references': resolve_cross_references(analysis.cross_references),
+        'cached': cached
+    }
+
+def stream_response(events, stream_format):
+    """Stream (event name, data) pairs as server-sent events or NDJSON"""
+    def generate():
+        try:
+            for event, data in events:
+                if stream_format == 'ndjson':
+                    yield json.dumps({'event': event, **data}) + '\n'
+                else:
+                    yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            logger.error(f"Error while streaming analysis: {str(e)}", exc_info=True)
+            error = {'error': f'Failed to generate analysis: {str(e)}'}
+            if stream_format == 'ndjson':
+                yield json.dumps({'event': 'error', **error}) + '\n'
+            else:
+                yield f"event: error\ndata: {json.dumps(error)}\n\n"
+    
+    mimetype = 'application/x-ndjson' if stream_format == 'ndjson' else 'text/event-stream'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Don't let a proxy buffer the stream
+    })
+
+@analysis_bp.route('/summary/stream', methods=['POST'])
+def stream_summary():
+    """Stream theological summaries, sending cached perspectives first and the rest as each finishes"""
+    
+    stream_format = request.args.get('format', 'sse')
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({'error': f'Invalid format. Valid options: {STREAM_FORMATS}'}), 400
+    
+    schema = SummaryStreamRequestSchema()
+    
+    try:
+        data = schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({'error': 'Validation failed', 'messages': err.messages}), 400
+    
+    start_verse_id = data['verse_range_start']
+    end_verse_id = data.get('verse_range_end', start_verse_id)
+    
+    # Get verse text and reference
+    verse_text, reference, error = get_verse_text_and_reference(start_verse_id, end_verse_id)
+    if error:
+        return jsonify({'error': error}), 404
+    
+    # Determine perspectives to use
+    requested_perspectives = data.get('perspectives', ['catholic', 'baptist'])
+    try:
+        perspectives = validate_perspectives(requested_perspectives)
+    except ValidationError as err:
+        return jsonify({'error': str(err)}), 400
+    
+    strongs_data = get_strongs_data(start_verse_id, end_verse_id)
+    stream_tokens = data.get('stream_tokens', False)
+    
+    def generate_stream(missing):
+        return gemini_client.stream_verse_summary(verse_text, reference, missing, strongs_data, stream_tokens=stream_tokens)
+    
+    def events():
+        yield 'start', {
+            'verse_range_start': start_verse_id,
+            'verse_range_end': end_verse_id,
+            'reference': reference,
+            'verse_text': verse_text,
+            'perspectives': [p.value for p in perspectives]
+        }
+        
+        cached_perspectives = []
+        for kind, perspective, payload in stream_analyses(start_verse_id, end_verse_id, perspectives, generate_stream):
+            if kind == 'delta':
+                yield 'delta', {'perspective': perspective.value, 'text': payload}
+            else:
+                if kind == 'cached':
+                    cached_perspectives.append(perspective.value)
+                yield 'perspective', perspective_event(perspective, payload, kind == 'cached')
+        
+        yield 'done', {'cached_perspectives': cached_perspectives}
+    
+    return stream_response(events(), stream_format)
+
+@analysis_bp.route('/question/stream', methods=['POST'])
+def stream_question():
+    """Stream answers to a question about verse(s) as each perspective finishes"""
+    
+    stream_format = request.args.get('format', 'sse')
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({'error': f'Invalid format. Valid options: {STREAM_FORMATS}'}), 400
+    
+    schema = QuestionStreamRequestSchema()
+    
+    try:
+        data = schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({'error': 'Validation failed', 'messages': err.messages}), 400
+    
+    start_verse_id = data['verse_range_start']
+    end_verse_id = data.get('verse_range_end', start_verse_id)
+    question = data['question'].strip()
+    
+    # Get verse text and reference
+    verse_text, reference, error = get_verse_text_and_reference(start_verse_id, end_verse_id)
+    if error:
+        return jsonify({'error': error}), 404
+    
+    # Determine perspectives to use
+    requested_perspectives = data.get('perspectives', ['catholic', 'baptist'])
+    try:
+        perspectives = validate_perspectives(requested_perspectives)
+    except ValidationError as err:
+        return jsonify({'error': str(err)}), 400
+    
+    strongs_data = get_strongs_data(start_verse_id, end_verse_id)
+    stream_tokens = data.get('stream_tokens', False)
+    
+    # Question answers are cached in memory, so nothing below needs the database
+    db.session.remove()
+    
+    def events():
+        yield 'start', {
+            'verse_range_start': start_verse_id,
+            'verse_range_end': end_verse_id,
+            'reference': reference,
+            'verse_text': verse_text,
+            'question': question,
+            'perspectives': [p.value for p in perspectives]
+        }
+        
+        analyses, cache_hits = lookup_question_answers(start_verse_id, end_verse_id, perspectives, question)
+        for perspective in perspectives:
+            if perspective in analyses:
+                yield 'perspective', perspective_event(perspective, analyses[perspective], True)
+        
+        missing = [p for p in perspectives if p not in analyses]
+        if missing:
+            for kind, index, payload in gemini_client.stream_question_response(
+                verse_text, reference, question, missing, strongs_data, stream_tokens=stream_tokens
+            ):
+                if kind == 'delta':
+                    yield 'delta', {'perspective': missing[index].value, 'text': payload}
+                else:
+                    question_cache.put(start_verse_id, end_verse_id, missing[index], question, payload)
+                    yield 'perspective', perspective_event(missing[index], payload, False)
+        
+        yield 'done', {'cache': {'hits': cache_hits, 'misses': [p.value for p in missing]}}
+    
+    return stream_response(events(), stream_format)
+
+def serialize_consensus(consensus_result):
+    """Convert a consensus result to JSON-serializable format with flattened structure"""
+    return {
+        'overall_consensus_score': consensus_result.overall_consensus_score,
+        'consensus_classification': consensus_result.consensus_classification,
+        'summary': consensus_result.summary,
+        'theological_dimensions': [
+            {
+                'dimension_name': dim_analysis.dimension_name,
+                'consensus_score': dim_analysis.consensus_score,
+                'agreement_summary': dim_analysis.agreement_summary,
+                'disagreement_summary': dim_analysis.disagreement_summary,
+                'denominational_positions': dim_analysis.denominational_positions
+            }
+            for dim_analysis in consensus_result.theological_dimensions
+        ],
+        'interpretive_approach_alignment': consensus_result.interpretive_approach_alignment,
+        'literal_vs_figurative': consensus_result.literal_vs_figurative,
+        'historical_context_emphasis': consensus_result.historical_context_emphasis,
+        'application_focus': consensus_result.application_focus,
+        'cross_reference_overlap': consensus_result.cross_reference_overlap,
+        'early_church_alignment': consensus_result.early_church_alignment,
+        'reformation_era_impact': consensus_result.reformation_era_impact,
+        'modern_theological_development': consensus_result.modern_theological_development,
+        'historical_trajectory': consensus_result.historical_trajectory,
+        'creedal_connections': [
+            {
+                'creed_name': connection.creed_name,
+                'relevant_doctrine': connection.relevant_doctrine,
+                'denominational_adherence': connection.denominational_adherence,
+                'interpretive_influence': connection.interpretive_influence
+            }
+            for connection in consensus_result.creedal_connections
+        ]
+    }
+
 @analysis_bp.route('/scholarly-consensus', methods=['POST'])
 def generate_scholarly_consensus():
     """Generate comprehensive scholarly consensus analysis from existing denominational perspectives"""
     
-    logger.info("=== SCHOLARLY CONSENSUS REQUEST ===")
-    logger.info(f"Request JSON: {request.json}")
+    # Full payloads are only formatted when debug logging is on
+    logger.debug("Scholarly consensus request: %s", request.json)
     
     schema = ScholarlyConsensusRequestSchema()
     
     try:
         data = schema.load(request.json)
-        logger.info(f"Validated data: {data}")
     except ValidationError as err:
         logger.error(f"Validation error: {err.messages}")
         return jsonify({'error': 'Validation failed', 'messages': err.messages}), 400
@@ -271,142 +487,60 @@ def generate_scholarly_consensus():
     
     # Get verse text and reference
     verse_text, reference, error = get_verse_text_and_reference(start_verse_id, end_verse_id)
-    logger.info(f"Verse text: {verse_text}")
-    logger.info(f"Reference: {reference}")
     if error:
         logger.error(f"Verse lookup error: {error}")
         return jsonify({'error': error}), 404
     
     # Determine perspectives to use
     requested_perspectives = data.get('perspectives', ['catholic', 'baptist', 'eastern_orthodox', 'lutheran', 'reformed'])
-    logger.info(f"Requested perspectives: {requested_perspectives}")
     try:
         perspectives = validate_perspectives(requested_perspectives)
-        logger.info(f"Validated perspectives: {[p.value for p in perspectives]}")
     except ValidationError as err:
         logger.error(f"Perspective validation error: {err}")
         return jsonify({'error': str(err)}), 400
     
-    # First, get the existing denominational analyses
-    # Check if summary already exists in cache
-    text_hash = VerseSummary.generate_text_hash(verse_text)
-    cached_summary = VerseSummary.query.filter_by(
-        verse_range_start=start_verse_id,
-        verse_range_end=end_verse_id,
-        selected_text_hash=text_hash
-    ).first()
-    
-    existing_analyses = []
+    # First, get the existing denominational analyses (cached per perspective, missing ones generated)
+    try:
+        existing_analyses, cached = resolve_perspective_analyses(
+            start_verse_id, end_verse_id, verse_text, reference, perspectives, mode=data.get('generation_mode')
+        )
+    except Exception as e:
+        logger.error(f"Error generating denominational analyses: {str(e)}", exc_info=True)
+        return jsonify({'error': f'Failed to generate scholarly consensus: {str(e)}'}), 500
     
-    logger.info(f"Cached summary found: {cached_summary is not None}")
+    # Also include the original denominational analyses for the modal
+    denominational_analyses, _ = serialize_analyses(existing_analyses)
     
-    if cached_summary:
-        logger.info(f"Cached perspectives available: {list(cached_summary.perspectives.keys())}")
-        # Use cached analyses
-        for perspective in perspectives:
-            perspective_key = perspective.value
-            if perspective_key in cached_summary.perspectives:
-                cached_data = cached_summary.perspectives[perspective_key]
-                logger.info(f"Using cached data for {perspective_key}")
-                # Convert cached data back to TheologicalAnalysis objects
-                from ai_client import CrossReference
-                cross_refs = [CrossReference(**ref) for ref in cached_data.get('cross_references', [])]
-                analysis = TheologicalAnalysis(
-                    perspective_name=perspective,
-                    response_text=cached_data['response_text'],
-                    cross_references=cross_refs
-                )
-                existing_analyses.append(analysis)
-            else:
-                logger.info(f"No cached data for {perspective_key}")
-    
-    # If we don't have enough cached analyses, generate them
-    logger.info(f"Have {len(existing_analyses)} analyses, need {len(perspectives)}")
-    if len(existing_analyses) < len(perspectives):
-        logger.info("Need to generate missing analyses")
-        # Prepare Strong's data if available
-        strongs_data = None
-        verse_objects = Verse.query.filter(
-            Verse.id >= start_verse_id,
-            Verse.id <= end_verse_id
-        ).order_by(Verse.id).all()
-        
-        if verse_objects and verse_objects[0].text_with_strongs:
-            strongs_data = {
-                'text_with_strongs': verse_objects[0].text_with_strongs,
-                'strongs_numbers': verse_objects[0].strongs_numbers or []
-            }
-        
-        # Generate missing analyses
-        missing_perspectives = [p.value for p in perspectives if p.value not in [a.perspective_name.value for a in existing_analyses]]
-        logger.info(f"Missing perspectives: {missing_perspectives}")
-        if missing_perspectives:
-            logger.info("Generating analyses for missing perspectives...")
-            analysis_result = gemini_client.generate_verse_summary(verse_text, reference, [TheologicalPerspective(p) for p in missing_perspectives], strongs_data)
-            existing_analyses.extend(analysis_result.analyses)
-            logger.info(f"Generated {len(analysis_result.analyses)} new analyses")
+    # A cached consensus is only valid if none of its inputs were just regenerated
+    if len(cached) == len(perspectives):
+        consensus_data = get_cached_consensus(start_verse_id, end_verse_id, perspectives)
+        if consensus_data is not None:
+            return jsonify({
+                'scholarly_analysis': consensus_data,
+                'denominational_analyses': denominational_analyses,
+                'cached': True
+            }), 200
     
     # Now generate the scholarly consensus analysis
-    logger.info(f"Starting scholarly consensus generation with {len(existing_analyses)} analyses")
+    logger.info(f"Generating scholarly consensus for {reference} with {len(existing_analyses)} analyses")
+    release_db_connection()
     try:
-        logger.info("Calling gemini_client.generate_scholarly_consensus_analysis...")
         consensus_result = gemini_client.generate_scholarly_consensus_analysis(verse_text, reference, existing_analyses)
-        logger.info("Successfully generated scholarly consensus")
-        logger.info(f"Raw consensus result: {consensus_result}")
-        
-        # Convert consensus result to JSON-serializable format with flattened structure
-        consensus_data = {
-            'overall_consensus_score': consensus_result.overall_consensus_score,
-            'consensus_classification': consensus_result.consensus_classification,
-            'summary': consensus_result.summary,
-            'theological_dimensions': [
-                {
-                    'dimension_name': dim_analysis.dimension_name,
-                    'consensus_score': dim_analysis.consensus_score,
-                    'agreement_summary': dim_analysis.agreement_summary,
-                    'disagreement_summary': dim_analysis.disagreement_summary,
-                    'denominational_positions': dim_analysis.denominational_positions
-                }
-                for dim_analysis in consensus_result.theological_dimensions
-            ],
-            'interpretive_approach_alignment': consensus_result.interpretive_approach_alignment,
-            'literal_vs_figurative': consensus_result.literal_vs_figurative,
-            'historical_context_emphasis': consensus_result.historical_context_emphasis,
-            'application_focus': consensus_result.application_focus,
-            'cross_reference_overlap': consensus_result.cross_reference_overlap,
-            'early_church_alignment': consensus_result.early_church_alignment,
-            'reformation_era_impact': consensus_result.reformation_era_impact,
-            'modern_theological_development': consensus_result.modern_theological_development,
-            'historical_trajectory': consensus_result.historical_trajectory,
-            'creedal_connections': [
-                {
-                    'creed_name': connection.creed_name,
-                    'relevant_doctrine': connection.relevant_doctrine,
-                    'denominational_adherence': connection.denominational_adherence,
-                    'interpretive_influence': connection.interpretive_influence
-                }
-                for connection in consensus_result.creedal_connections
-            ]
-        }
+        consensus_data = serialize_consensus(consensus_result)
         
-        logger.info(f"Formatted consensus_data: {consensus_data}")
+        # Fallback placeholders are never cached, nor is a consensus built on one
+        if not isinstance(consensus_result, FallbackConsensusAnalysis) and \
+                not any(isinstance(analysis, FallbackAnalysis) for analysis in existing_analyses):
+            store_consensus(start_verse_id, end_verse_id, perspectives, consensus_data)
         
-        # Also include the original denominational analyses for the modal
-        denominational_analyses = {}
-        for analysis in existing_analyses:
-            perspective_key = analysis.perspective_name.value
-            denominational_analyses[perspective_key] = {
-                'response_text': analysis.response_text,
-                'cross_references': [ref.dict() for ref in analysis.cross_references]
-            }
-        
-        logger.info("Preparing response data...")
         response_data = {
             'scholarly_analysis': consensus_data,
-            'denominational_analyses': denominational_analyses
+            'denominational_analyses': denominational_analyses,
+            'cached': False
         }
         
-        logger.info(f"Final response_data being sent to frontend: {response_data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Scholarly consensus response: %s", response_data)
         
         return jsonify(response_data), 200
         
@@ -414,3 +548,12 @@ def generate_scholarly_consensus():
         logger.error(f"Error generating scholarly consensus: {str(e)}", exc_info=True)
         return jsonify({'error': f'Failed to generate scholarly consensus: {str(e)}'}), 500
 
+@analysis_bp.route('/metrics', methods=['GET'])
+def get_generation_metrics():
+    """Get per-kind model call latency, token usage, cache and connection pool stats for this worker"""
+    return jsonify({
+        'metrics': gemini_client.metrics.snapshot(),
+        'question_cache': question_cache.stats(),
+        'caches': cache_stats(),
+        'db_pool': pool_stats()
+    }), 200
@@ -1,192 +1,120 @@
 from flask import Blueprint, request, jsonify
-from models import db, Book, Chapter, Verse, SearchCache, MessianicProphecy
-from sqlalchemy import func, or_
-import re
+from canon import get_canon
+from chapter_cache import chapter_response, get_rendered_chapter
+import config
+from http_cache import http_cached
+from references import InvalidReference, ReferenceNotFound, get_reference_resolver
+from serializers import book_payload, verse_payloads
+from search_cache import grouped_search_cache, normalize_search_query
+from search_service import search_verse_ids, search_verse_books
 
 bible_bp = Blueprint('bible', __name__)
 
-# Cache for books list - this data never changes
-_books_cache = None
+MAX_BATCH_REFERENCES = 500
+MAX_BATCH_RANGES = 300
+MAX_BATCH_RANGE_VERSES = 500  # Per range; a larger range is rejected rather than truncated
 
 @bible_bp.route('/books', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_books():
     """Get all books of the Bible"""
-    global _books_cache
+    canon = get_canon()
     
-    if _books_cache is None:
-        books = Book.query.order_by(Book.order_number).all()
-        _books_cache = {
-            'books': [book.to_dict() for book in books]
-        }
-    
-    return jsonify(_books_cache), 200
+    return jsonify({
+        'books': [canon.book_dict(book) for book in canon.books]
+    }), 200
 
 @bible_bp.route('/books/<int:book_id>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_book(book_id):
     """Get a specific book with its chapters"""
-    book = Book.query.get(book_id)
+    canon = get_canon()
+    book = canon.get_book(book_id)
     if not book:
         return jsonify({'error': 'Book not found'}), 404
     
-    book_data = book.to_dict()
-    book_data['chapters'] = [chapter.to_dict() for chapter in book.chapters]
+    book_data = canon.book_dict(book)
+    book_data['chapters'] = [canon.chapter_dict(position) for position in canon.book_chapters(book)]
     
     return jsonify({'book': book_data}), 200
 
 @bible_bp.route('/books/<int:book_id>/chapters', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_book_chapters(book_id):
     """Get all chapters for a specific book"""
-    book = Book.query.get(book_id)
+    canon = get_canon()
+    book = canon.get_book(book_id)
     if not book:
         return jsonify({'error': 'Book not found'}), 404
     
-    chapters = Chapter.query.filter_by(book_id=book_id).order_by(Chapter.chapter_number).all()
-    
     return jsonify({
-        'book': book.to_dict(),
-        'chapters': [chapter.to_dict() for chapter in chapters]
+        'book': canon.book_dict(book),
+        'chapters': [canon.chapter_dict(position) for position in canon.book_chapters(book)]
     }), 200
 
 @bible_bp.route('/books/<int:book_id>/chapters/<int:chapter_number>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE, vary_encoding=True)
 def get_book_chapter(book_id, chapter_number):
     """Get a specific chapter from a book with its verses"""
-    book = Book.query.get(book_id)
+    canon = get_canon()
+    book = canon.get_book(book_id)
     if not book:
         return jsonify({'error': 'Book not found'}), 404
     
-    chapter = Chapter.query.filter_by(book_id=book_id, chapter_number=chapter_number).first()
-    if not chapter:
+    rendered = get_rendered_chapter(book_id, chapter_number)
+    if rendered is None:
         return jsonify({'error': 'Chapter not found'}), 404
     
-    verses = Verse.query.filter_by(chapter_id=chapter.id).order_by(Verse.verse_number).all()
-    
-    # Get prophecy data for this chapter
-    verse_ids = [v.id for v in verses]
-    
-    # Find prophecies where this chapter contains the prophecy verse(s)
-    prophecy_verses = MessianicProphecy.query.filter(
-        or_(
-            MessianicProphecy.prophecy_verse_start.in_(verse_ids),
-            MessianicProphecy.prophecy_verse_end.in_(verse_ids)
-        )
-    ).all()
-    
-    # Find prophecies where this chapter contains fulfillment verse(s)
-    fulfillment_prophecies = []
-    for verse_id in verse_ids:
-        prophecies = db.session.execute(db.text("""
-            SELECT * FROM messianic_prophecies mp
-            WHERE mp.fulfillment_references::text LIKE :verse_pattern
-        """), {'verse_pattern': f'%"verse_start_id": {verse_id}%'}).fetchall()
-        
-        for prophecy_row in prophecies:
-            prophecy = MessianicProphecy.query.get(prophecy_row.id)
-            if prophecy not in fulfillment_prophecies:
-                fulfillment_prophecies.append(prophecy)
-    
-    # Build prophecy highlighting data
-    prophecy_data = {
-        'prophecy_verses': [],  # Verses that are prophecies
-        'fulfillment_verses': []  # Verses that are fulfillments
-    }
-    
-    # Process prophecy verses
-    for prophecy in prophecy_verses:
-        if prophecy.start_verse.chapter_id == chapter.id:
-            start_verse_num = prophecy.start_verse.verse_number
-            end_verse_num = prophecy.end_verse.verse_number if prophecy.end_verse.chapter_id == chapter.id else start_verse_num
-            verse_range = list(range(start_verse_num, end_verse_num + 1))
-            
-            prophecy_data['prophecy_verses'].append({
-                'prophecy_id': prophecy.id,
-                'verse_numbers': verse_range,
-                'category': prophecy.category.value,
-                'claim': prophecy.claim[:100] + '...' if len(prophecy.claim) > 100 else prophecy.claim
-            })
-    
-    # Process fulfillment verses
-    for prophecy in fulfillment_prophecies:
-        for fulfillment_ref in prophecy.fulfillment_references:
-            if fulfillment_ref.get('verse_start_id') in verse_ids:
-                verse_range = list(range(
-                    fulfillment_ref['verse_start'], 
-                    fulfillment_ref['verse_end'] + 1
-                ))
-                prophecy_data['fulfillment_verses'].append({
-                    'prophecy_id': prophecy.id,
-                    'verse_numbers': verse_range,
-                    'fulfillment_type': fulfillment_ref['fulfillment_type'],
-                    'original_prophecy': f"{prophecy.start_verse.chapter.book.name} {prophecy.start_verse.chapter.chapter_number}:{prophecy.start_verse.verse_number}"
-                })
-    
-    # Get all chapters for pagination info
-    all_chapters = Chapter.query.filter_by(book_id=book_id).order_by(Chapter.chapter_number).all()
-    chapter_numbers = [ch.chapter_number for ch in all_chapters]
-    
-    # Find current chapter index
-    current_index = chapter_numbers.index(chapter_number) if chapter_number in chapter_numbers else 0
-    
-    # Build pagination info
-    pagination_info = {
-        'current_chapter': chapter_number,
-        'total_chapters': len(chapter_numbers),
-        'has_previous': current_index > 0,
-        'has_next': current_index < len(chapter_numbers) - 1,
-        'previous_chapter': chapter_numbers[current_index - 1] if current_index > 0 else None,
-        'next_chapter': chapter_numbers[current_index + 1] if current_index < len(chapter_numbers) - 1 else None,
-        'all_chapters': chapter_numbers
-    }
-    
-    return jsonify({
-        'book': book.to_dict(),
-        'chapter': chapter.to_dict(),
-        'verses': [verse.to_dict(include_strongs=True) for verse in verses],
-        'pagination': pagination_info,
-        'prophecies': prophecy_data
-    }), 200
+    return chapter_response(rendered)
 
 @bible_bp.route('/chapters/<int:chapter_id>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_chapter(chapter_id):
     """Get a specific chapter with its verses"""
-    chapter = Chapter.query.get(chapter_id)
-    if not chapter:
+    canon = get_canon()
+    chapter_position = canon.get_chapter(chapter_id)
+    if chapter_position is None:
         return jsonify({'error': 'Chapter not found'}), 404
     
-    chapter_data = chapter.to_dict()
-    chapter_data['verses'] = [verse.to_dict() for verse in chapter.verses]
-    chapter_data['book'] = chapter.book.to_dict()
+    chapter_data = canon.chapter_dict(chapter_position)
+    chapter_data['verses'] = [canon.verse_dict(position) for position in canon.chapter_verses(chapter_position)]
+    chapter_data['book'] = canon.book_dict(canon.chapter_book(chapter_position))
     
     return jsonify({'chapter': chapter_data}), 200
 
 @bible_bp.route('/chapters/<int:chapter_id>/verses', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_chapter_verses(chapter_id):
     """Get all verses for a specific chapter"""
-    chapter = Chapter.query.get(chapter_id)
-    if not chapter:
+    canon = get_canon()
+    chapter_position = canon.get_chapter(chapter_id)
+    if chapter_position is None:
         return jsonify({'error': 'Chapter not found'}), 404
     
-    verses = Verse.query.filter_by(chapter_id=chapter_id).order_by(Verse.verse_number).all()
-    
     return jsonify({
-        'chapter': chapter.to_dict(),
-        'book': chapter.book.to_dict(),
-        'verses': [verse.to_dict() for verse in verses]
+        'chapter': canon.chapter_dict(chapter_position),
+        'book': canon.book_dict(canon.chapter_book(chapter_position)),
+        'verses': [canon.verse_dict(position) for position in canon.chapter_verses(chapter_position)]
     }), 200
 
 @bible_bp.route('/verses/<int:verse_id>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_verse(verse_id):
     """Get a specific verse"""
-    verse = Verse.query.get(verse_id)
-    if not verse:
+    canon = get_canon()
+    verse_position = canon.get_verse(verse_id)
+    if verse_position is None:
         return jsonify({'error': 'Verse not found'}), 404
     
-    verse_data = verse.to_dict()
-    verse_data['chapter'] = verse.chapter.to_dict()
-    verse_data['book'] = verse.chapter.book.to_dict()
+    chapter_position = canon.verse_chapters[verse_position]
+    verse_data = canon.verse_dict(verse_position)
+    verse_data['chapter'] = canon.chapter_dict(chapter_position)
+    verse_data['book'] = canon.book_dict(canon.chapter_book(chapter_position))
     
     return jsonify({'verse': verse_data}), 200
 
 @bible_bp.route('/verses/range', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_verse_range():
     """Get a range of verses"""
     start_verse_id = request.args.get('start', type=int)
@@ -199,33 +127,94 @@ def get_verse_range():
         end_verse_id = start_verse_id
     
     # Validate verse IDs
-    start_verse = Verse.query.get(start_verse_id)
-    end_verse = Verse.query.get(end_verse_id)
+    canon = get_canon()
+    start_position = canon.get_verse(start_verse_id)
+    end_position = canon.get_verse(end_verse_id)
     
-    if not start_verse or not end_verse:
+    if start_position is None or end_position is None:
         return jsonify({'error': 'One or more verses not found'}), 404
     
     # Get all verses in the range
-    verses = Verse.query.filter(
-        Verse.id >= start_verse_id,
-        Verse.id <= end_verse_id
-    ).order_by(Verse.id).all()
+    verse_positions = canon.verse_id_range(start_verse_id, end_verse_id)
     
     # Combine text for the range
-    combined_text = ' '.join([verse.text for verse in verses])
+    combined_text = ' '.join([canon.texts[position] for position in verse_positions])
     
     # Create reference string
     if start_verse_id == end_verse_id:
-        reference = f"{start_verse.chapter.book.name} {start_verse.chapter.chapter_number}:{start_verse.verse_number}"
+        reference = canon.verse_reference(start_position)
     else:
-        reference = f"{start_verse.chapter.book.name} {start_verse.chapter.chapter_number}:{start_verse.verse_number}-{end_verse.verse_number}"
+        reference = f"{canon.verse_reference(start_position)}-{canon.verse_numbers[end_position]}"
     
     return jsonify({
-        'verses': [verse.to_dict() for verse in verses],
+        'verses': [canon.verse_dict(position) for position in verse_positions],
         'combined_text': combined_text,
         'reference': reference,
-        'start_verse': start_verse.to_dict(),
-        'end_verse': end_verse.to_dict()
+        'start_verse': canon.verse_dict(start_position),
+        'end_verse': canon.verse_dict(end_position)
+    }), 200
+
+@bible_bp.route('/verses/batch', methods=['POST'])
+def get_verse_ranges_batch():
+    """Get many verse ranges at once; each range is {"start": id, "end": id} or a reference string"""
+    data = request.get_json(silent=True) or {}
+    ranges = data.get('ranges')
+    
+    if not isinstance(ranges, list):
+        return jsonify({'error': 'ranges must be a list'}), 400
+    
+    if len(ranges) > MAX_BATCH_RANGES:
+        return jsonify({'error': f'At most {MAX_BATCH_RANGES} ranges per request'}), 400
+    
+    canon = get_canon()
+    resolver = get_reference_resolver()
+    results = []
+    verse_ids = {}  # Ordered set of every verse id requested
+    
+    for item in ranges:
+        if isinstance(item, str):
+            try:
+                verse_ranges = resolver.resolve(item)
+            except (InvalidReference, ReferenceNotFound) as e:
+                results.append({'input': item, 'error': str(e)})
+                continue
+            reference = '; '.join(resolver.format(verse_range) for verse_range in verse_ranges)
+            range_ids = [
+                canon.verse_ids[position]
+                for verse_range in verse_ranges
+                for position in range(verse_range.start_position, verse_range.end_position + 1)
+            ]
+        elif isinstance(item, dict) and isinstance(item.get('start'), int):
+            start_verse_id = item['start']
+            end_verse_id = item.get('end') if isinstance(item.get('end'), int) else start_verse_id
+            start_position = canon.get_verse(start_verse_id)
+            end_position = canon.get_verse(end_verse_id)
+            if start_position is None or end_position is None:
+                results.append({'input': item, 'error': 'One or more verses not found'})
+                continue
+            if start_verse_id == end_verse_id:
+                reference = canon.verse_reference(start_position)
+            else:
+                reference = f"{canon.verse_reference(start_position)}-{canon.verse_numbers[end_position]}"
+            range_ids = [canon.verse_ids[position] for position in canon.verse_id_range(start_verse_id, end_verse_id)]
+        else:
+            results.append({'input': item, 'error': 'Each range must be {"start": id, "end": id} or a reference string'})
+            continue
+        
+        if len(range_ids) > MAX_BATCH_RANGE_VERSES:
+            results.append({'input': item, 'error': f'Range exceeds {MAX_BATCH_RANGE_VERSES} verses'})
+            continue
+        
+        verse_ids.update(dict.fromkeys(range_ids))
+        results.append({'input': item, 'reference': reference, 'verse_ids': range_ids})
+    
+    # Each verse is serialized once, however many ranges include it
+    verses = {verse_data['id']: verse_data for verse_data in verse_payloads(list(verse_ids))}
+    
+    return jsonify({
+        'ranges': results,
+        'verses': verses,
+        'verse_count': len(verses)
     }), 200
 
 @bible_bp.route('/search', methods=['GET'])
@@ -242,28 +231,14 @@ def search_verses():
     if len(query) < 3:
         return jsonify({'error': 'Query must be at least 3 characters long'}), 400
     
-    # Build query with optional book filter
-    verse_query = Verse.query.filter(
-        Verse.text.ilike(f'%{query}%')
-    )
-    
+    # Ranked full-text search with optional book filter
+    book_ids = None
     if book_filter:
-        verse_query = verse_query.join(Chapter).join(Book).filter(
-            Book.name.ilike(f'%{book_filter}%')
-        )
+        book_ids = [book.id for book in get_canon().match_books(book_filter)]
     
-    # Get total count for pagination
-    total_count = verse_query.count()
+    verse_ids, total_count = search_verse_ids(query, limit=limit, offset=offset, book_ids=book_ids)
     
-    # Apply pagination
-    verses = verse_query.offset(offset).limit(limit).all()
-    
-    results = []
-    for verse in verses:
-        verse_data = verse.to_dict()
-        verse_data['book'] = verse.chapter.book.to_dict()
-        verse_data['chapter_info'] = verse.chapter.to_dict()
-        results.append(verse_data)
+    results = verse_payloads(verse_ids, include_book=True, include_chapter=True)
     
     return jsonify({
         'query': query,
@@ -274,46 +249,30 @@ def search_verses():
         'limit': limit
     }), 200
 
-@bible_bp.route('/search/grouped', methods=['GET'])
-def search_verses_grouped():
-    """Search for verses grouped by book with caching"""
-    query = request.args.get('q', '').strip()
-    
-    if not query:
-        return jsonify({'error': 'Query parameter q is required'}), 400
-    
-    if len(query) < 3:
-        return jsonify({'error': 'Query must be at least 3 characters long'}), 400
-    
-    # Try to get from database cache first
-    query_hash = SearchCache.generate_query_hash(query)
-    cached_search = db.session.query(SearchCache).filter_by(query_hash=query_hash).first()
-    if cached_search:
-        return jsonify(cached_search.result_data), 200
-    
-    # Search verses and group by book
-    verses = Verse.query.filter(
-        Verse.text.ilike(f'%{query}%')
-    ).join(Chapter).join(Book).all()
+def group_search_results(query):
+    """Run a search and group the matches by book, with up to 3 sample verses each"""
+    rows = search_verse_books(query)
     
     # Group results by book
     book_groups = {}
-    for verse in verses:
-        book = verse.chapter.book
-        if book.id not in book_groups:
-            book_groups[book.id] = {
-                'book': book.to_dict(),
+    sample_ids = {}
+    for verse_id, book_id in rows:
+        if book_id not in book_groups:
+            book_groups[book_id] = {
+                'book': book_payload(book_id),
                 'verse_count': 0,
                 'sample_verses': []
             }
+            sample_ids[book_id] = []
         
-        book_groups[book.id]['verse_count'] += 1
+        book_groups[book_id]['verse_count'] += 1
         
         # Keep first 3 verses as samples
-        if len(book_groups[book.id]['sample_verses']) < 3:
-            verse_data = verse.to_dict()
-            verse_data['chapter_info'] = verse.chapter.to_dict()
-            book_groups[book.id]['sample_verses'].append(verse_data)
+        if len(sample_ids[book_id]) < 3:
+            sample_ids[book_id].append(verse_id)
+    
+    for book_id, group in book_groups.items():
+        group['sample_verses'] = verse_payloads(sample_ids[book_id], include_chapter=True)
     
     # Convert to list and sort by verse count (descending)
     grouped_results = list(book_groups.values())
@@ -321,122 +280,140 @@ def search_verses_grouped():
     
     total_verses = sum(group['verse_count'] for group in grouped_results)
     
-    result = {
+    return {
         'query': query,
         'book_groups': grouped_results,
         'total_books': len(grouped_results),
         'total_verses': total_verses
     }
+
+@bible_bp.route('/search/grouped', methods=['GET'])
+def search_verses_grouped():
+    """Search for verses grouped by book with caching"""
+    query = request.args.get('q', '').strip()
+    
+    if not query:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    
+    if len(query) < 3:
+        return jsonify({'error': 'Query must be at least 3 characters long'}), 400
     
-    # Save the result to database cache permanently
-    search_cache = SearchCache(
-        query_text=query,
-        query_hash=query_hash,
-        result_data=result
+    result = grouped_search_cache.get_or_set(
+        normalize_search_query(query), lambda: group_search_results(query)
     )
-    db.session.add(search_cache)
-    db.session.commit()
     
-    return jsonify(result), 200
+    # Echo this request's spelling of the query, not the one that filled the cache
+    return jsonify(dict(result, query=query)), 200
+
+@bible_bp.route('/search/grouped/cache-stats', methods=['GET'])
+def get_search_cache_stats():
+    """Get this worker's grouped search cache hit, miss and eviction counters"""
+    return jsonify({'search_cache': grouped_search_cache.stats()}), 200
 
 @bible_bp.route('/books/resolve/<book_slug>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def resolve_book_slug(book_slug):
     """Resolve a book slug (e.g., 'john' or '1-kings') to book ID and metadata"""
     # Convert slug back to potential book name
-    potential_name = book_slug.replace('-', ' ').title()
-    
-    # Try exact match first
-    book = Book.query.filter(Book.name.ilike(potential_name)).first()
+    potential_name = book_slug.replace('-', ' ')
     
+    # Names, abbreviations and common variants first, then partial name matches
+    book = get_reference_resolver().find_book(potential_name)
     if not book:
-        # Try partial matching for common abbreviations and variations
-        books = Book.query.filter(
-            or_(
-                Book.name.ilike(f'%{potential_name}%'),
-                Book.abbreviation.ilike(f'%{potential_name}%'),
-                Book.name.ilike(f'{potential_name}%')
-            )
-        ).all()
-        
-        if books:
-            # Take the first match, preferring exact name matches
-            book = books[0]
+        matches = get_canon().match_books(potential_name)
+        book = matches[0] if matches else None
     
     if not book:
         return jsonify({'error': f'Book not found for slug: {book_slug}'}), 404
     
     return jsonify({
-        'book': book.to_dict(),
+        'book': book_payload(book.id),
         'slug': book_slug,
         'resolved_name': book.name
     }), 200
 
+def reference_payload(resolver, verse_range, include_verses=True):
+    """Serialize a resolved VerseRange"""
+    canon = resolver.canon
+    positions = range(verse_range.start_position, verse_range.end_position + 1)
+    result = {
+        'reference': resolver.format(verse_range),
+        'book': canon.book_dict(verse_range.book),
+        'start_verse_id': canon.verse_ids[verse_range.start_position],
+        'end_verse_id': canon.verse_ids[verse_range.end_position],
+        'verse_count': len(positions)
+    }
+    if include_verses:
+        result['verses'] = [canon.verse_dict(position) for position in positions]
+        result['combined_text'] = ' '.join(canon.texts[position] for position in positions)
+    return result
+
 @bible_bp.route('/reference', methods=['GET'])
+@http_cached(config.HTTP_CACHE_CANON_MAX_AGE)
 def get_by_reference():
-    """Get verse(s) by reference string (e.g., 'John 3:16' or 'Romans 3:23-24')"""
+    """Get verse(s) by reference string (e.g., 'John 3:16', '1 Jn 3:16-18', 'Gen 1:1-2:3' or 'Ps 23')"""
     ref = request.args.get('ref', '').strip()
     
     if not ref:
         return jsonify({'error': 'Reference parameter ref is required'}), 400
     
+    resolver = get_reference_resolver()
     try:
-        # Parse reference (basic implementation)
-        # Format: "Book Chapter:Verse" or "Book Chapter:Verse-Verse"
-        parts = ref.split(' ')
-        if len(parts) < 2:
-            raise ValueError("Invalid reference format")
-        
-        book_name = ' '.join(parts[:-1])
-        chapter_verse = parts[-1]
-        
-        if ':' not in chapter_verse:
-            raise ValueError("Invalid reference format")
-        
-        chapter_num, verse_part = chapter_verse.split(':', 1)
-        chapter_num = int(chapter_num)
-        
-        # Find the book
-        book = Book.query.filter(
-            or_(Book.name.ilike(book_name), Book.abbreviation.ilike(book_name))
-        ).first()
-        
-        if not book:
-            return jsonify({'error': f'Book "{book_name}" not found'}), 404
-        
-        # Find the chapter
-        chapter = Chapter.query.filter_by(book_id=book.id, chapter_number=chapter_num).first()
-        
-        if not chapter:
-            return jsonify({'error': f'Chapter {chapter_num} not found in {book.name}'}), 404
-        
-        # Parse verse range
-        if '-' in verse_part:
-            start_verse_num, end_verse_num = verse_part.split('-', 1)
-            start_verse_num = int(start_verse_num)
-            end_verse_num = int(end_verse_num)
-        else:
-            start_verse_num = end_verse_num = int(verse_part)
-        
-        # Get verses
-        verses = Verse.query.filter(
-            Verse.chapter_id == chapter.id,
-            Verse.verse_number >= start_verse_num,
-            Verse.verse_number <= end_verse_num
-        ).order_by(Verse.verse_number).all()
-        
-        if not verses:
-            return jsonify({'error': f'Verses not found for reference "{ref}"'}), 404
-        
-        # Combine text for the range
-        combined_text = ' '.join([verse.text for verse in verses])
-        
-        return jsonify({
-            'reference': ref,
-            'verses': [verse.to_dict() for verse in verses],
-            'combined_text': combined_text,
-            'book': book.to_dict(),
-            'chapter': chapter.to_dict()
-        }), 200
-        
-    except (ValueError, IndexError) as e:
+        verse_ranges = resolver.resolve(ref)
+    except ReferenceNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except InvalidReference:
         return jsonify({'error': f'Invalid reference format: {ref}. Use format like "John 3:16" or "Romans 3:23-24"'}), 400
+    
+    canon = resolver.canon
+    verse_positions = [
+        position
+        for verse_range in verse_ranges
+        for position in range(verse_range.start_position, verse_range.end_position + 1)
+    ]
+    
+    # Combine text for the range
+    combined_text = ' '.join([canon.texts[position] for position in verse_positions])
+    
+    first = verse_ranges[0]
+    return jsonify({
+        'reference': ref,
+        'canonical_reference': '; '.join(resolver.format(verse_range) for verse_range in verse_ranges),
+        'verses': [canon.verse_dict(position) for position in verse_positions],
+        'combined_text': combined_text,
+        'book': canon.book_dict(first.book),
+        'chapter': canon.chapter_dict(canon.verse_chapters[first.start_position]),
+        'ranges': [reference_payload(resolver, verse_range, include_verses=False) for verse_range in verse_ranges]
+    }), 200
+
+@bible_bp.route('/references/resolve', methods=['POST'])
+def resolve_references():
+    """Parse and resolve a batch of reference strings to verse id ranges"""
+    data = request.get_json(silent=True) or {}
+    references = data.get('references')
+    include_verses = bool(data.get('include_verses', False))
+    
+    if not isinstance(references, list) or not all(isinstance(ref, str) for ref in references):
+        return jsonify({'error': 'references must be a list of strings'}), 400
+    
+    if len(references) > MAX_BATCH_REFERENCES:
+        return jsonify({'error': f'At most {MAX_BATCH_REFERENCES} references per request'}), 400
+    
+    resolver = get_reference_resolver()
+    results = []
+    for ref in references:
+        try:
+            verse_ranges = resolver.resolve(ref)
+        except (InvalidReference, ReferenceNotFound) as e:
+            results.append({'input': ref, 'error': str(e)})
+            continue
+        results.append({
+            'input': ref,
+            'ranges': [reference_payload(resolver, verse_range, include_verses) for verse_range in verse_ranges]
+        })
+    
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'resolved': sum(1 for result in results if 'ranges' in result)
+    }), 200
@@ -4,10 +4,13 @@ from models import (
     BookMetadata, ChapterMetadata
 )
 from sqlalchemy.orm import joinedload
+import config
+from http_cache import http_cached
 
 metadata_bp = Blueprint('metadata', __name__)
 
 @metadata_bp.route('/book/<int:book_id>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_DEFAULT_MAX_AGE)
 def get_book_metadata(book_id):
     """Get complete metadata for a book"""
     try:
@@ -38,6 +41,7 @@ def get_book_metadata(book_id):
         return jsonify({'error': str(e)}), 500
 
 @metadata_bp.route('/chapter/<int:chapter_id>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_DEFAULT_MAX_AGE)
 def get_chapter_metadata(chapter_id):
     """Get complete metadata for a chapter including book context"""
     try:
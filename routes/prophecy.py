@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
-from models import db, MessianicProphecy, Verse, Chapter, Book
+from models import db, MessianicProphecy, ProphecyFulfillment, Verse, Chapter, Book
 from sqlalchemy import or_, and_, text
+from sqlalchemy.orm import joinedload
+from canon import get_canon
 
 prophecy_bp = Blueprint('prophecy', __name__)
 
@@ -9,12 +11,13 @@ def get_chapter_prophecies(book_id, chapter_number):
     """Get all prophecies related to a specific chapter (both prophecies and fulfillments)"""
     
     # Get the chapter
-    chapter = Chapter.query.filter_by(book_id=book_id, chapter_number=chapter_number).first()
-    if not chapter:
+    canon = get_canon()
+    chapter_position = canon.find_chapter(book_id, chapter_number)
+    if chapter_position is None:
         return jsonify({'error': 'Chapter not found'}), 404
     
     # Get all verse IDs in this chapter
-    verse_ids = [v.id for v in chapter.verses]
+    verse_ids = [canon.verse_ids[position] for position in canon.chapter_verses(chapter_position)]
     
     # Find prophecies where this chapter contains the prophecy verse(s)
     prophecy_verses = MessianicProphecy.query.filter(
@@ -24,20 +27,16 @@ def get_chapter_prophecies(book_id, chapter_number):
         )
     ).all()
     
-    # Find prophecies where this chapter contains fulfillment verse(s)
-    # Need to check JSON fulfillment_references for verse IDs
-    fulfillment_prophecies = []
-    for verse_id in verse_ids:
-        prophecies = db.session.execute(text("""
-            SELECT * FROM messianic_prophecies mp
-            WHERE mp.fulfillment_references::text LIKE :verse_pattern
-        """), {'verse_pattern': f'%"verse_start_id": {verse_id}%'}).fetchall()
-        
-        for prophecy_row in prophecies:
-            # Convert row to MessianicProphecy object
-            prophecy = MessianicProphecy.query.get(prophecy_row.id)
-            if prophecy not in fulfillment_prophecies:
-                fulfillment_prophecies.append(prophecy)
+    # Find fulfillments that start in this chapter (one indexed query)
+    fulfillments = ProphecyFulfillment.query.options(
+        joinedload(ProphecyFulfillment.prophecy)
+    ).filter_by(chapter_id=canon.chapter_ids[chapter_position]).order_by(
+        ProphecyFulfillment.verse_start_id, ProphecyFulfillment.prophecy_id, ProphecyFulfillment.position
+    ).all()
+    
+    def prophecy_reference(prophecy):
+        position = canon.get_verse(prophecy.prophecy_verse_start)
+        return canon.verse_reference(position) if position is not None else None
     
     # Format response
     result = {
@@ -51,8 +50,10 @@ def get_chapter_prophecies(book_id, chapter_number):
     # Process prophecy verses
     for prophecy in prophecy_verses:
         # Get verse numbers for highlighting
-        start_verse_num = prophecy.start_verse.verse_number if prophecy.start_verse.chapter_id == chapter.id else None
-        end_verse_num = prophecy.end_verse.verse_number if prophecy.end_verse.chapter_id == chapter.id else None
+        start_position = canon.get_verse(prophecy.prophecy_verse_start)
+        end_position = canon.get_verse(prophecy.prophecy_verse_end)
+        start_verse_num = canon.verse_numbers[start_position] if start_position is not None and canon.verse_chapters[start_position] == chapter_position else None
+        end_verse_num = canon.verse_numbers[end_position] if end_position is not None and canon.verse_chapters[end_position] == chapter_position else None
         
         if start_verse_num:
             verse_range = list(range(start_verse_num, (end_verse_num or start_verse_num) + 1))
@@ -64,22 +65,20 @@ def get_chapter_prophecies(book_id, chapter_number):
             })
     
     # Process fulfillment verses
-    for prophecy in fulfillment_prophecies:
-        for fulfillment_ref in prophecy.fulfillment_references:
-            if fulfillment_ref.get('verse_start_id') in verse_ids:
-                # Find the verse number
-                verse = Verse.query.get(fulfillment_ref['verse_start_id'])
-                if verse and verse.chapter_id == chapter.id:
-                    verse_range = list(range(
-                        fulfillment_ref['verse_start'], 
-                        fulfillment_ref['verse_end'] + 1
-                    ))
-                    result['fulfillment_verses'].append({
-                        'prophecy_id': prophecy.id,
-                        'verse_numbers': verse_range,
-                        'fulfillment_type': fulfillment_ref['fulfillment_type'],
-                        'original_prophecy': f"{prophecy.start_verse.chapter.book.name} {prophecy.start_verse.chapter.chapter_number}:{prophecy.start_verse.verse_number}"
-                    })
+    fulfillment_prophecies = []
+    for fulfillment in fulfillments:
+        start_position = canon.get_verse(fulfillment.verse_start_id)
+        end_position = canon.get_verse(fulfillment.verse_end_id)
+        if start_position is None or end_position is None:
+            continue
+        result['fulfillment_verses'].append({
+            'prophecy_id': fulfillment.prophecy_id,
+            'verse_numbers': list(range(canon.verse_numbers[start_position], canon.verse_numbers[end_position] + 1)),
+            'fulfillment_type': fulfillment.fulfillment_type,
+            'original_prophecy': prophecy_reference(fulfillment.prophecy)
+        })
+        if fulfillment.prophecy not in fulfillment_prophecies:
+            fulfillment_prophecies.append(fulfillment.prophecy)
     
     # Add full prophecy data for sidebar
     all_prophecies = set(prophecy_verses + fulfillment_prophecies)
@@ -88,7 +87,7 @@ def get_chapter_prophecies(book_id, chapter_number):
             'id': prophecy.id,
             'claim': prophecy.claim,
             'category': prophecy.category.value,
-            'prophecy_reference': f"{prophecy.start_verse.chapter.book.name} {prophecy.start_verse.chapter.chapter_number}:{prophecy.start_verse.verse_number}",
+            'prophecy_reference': prophecy_reference(prophecy),
             'fulfillment_explanation': prophecy.fulfillment_explanation,
             'fulfillment_references': [
                 {
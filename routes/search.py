@@ -4,9 +4,40 @@ from models import (
     db, Book, Chapter, Verse,
     BookMetadata, ChapterMetadata
 )
+from autocomplete import get_autocomplete_index
+from canon import get_canon
+from serializers import book_chapter_count
+from search_service import search_verse_ids
 
 search_bp = Blueprint('search', __name__)
 
+def verse_search_results(verse_ids):
+    """Compact verse results (with chapter and book stubs) in ranked order"""
+    canon = get_canon()
+    results = []
+    for verse_id in verse_ids:
+        position = canon.get_verse(verse_id)
+        if position is None:
+            continue
+        chapter_position = canon.verse_chapters[position]
+        book = canon.chapter_book(chapter_position)
+        results.append({
+            'id': verse_id,
+            'verse_number': canon.verse_numbers[position],
+            'text': canon.texts[position],
+            'reference': canon.verse_reference(position),
+            'chapter': {
+                'id': canon.chapter_ids[chapter_position],
+                'chapter_number': canon.chapter_numbers[chapter_position]
+            },
+            'book': {
+                'id': book.id,
+                'name': book.name,
+                'abbreviation': book.abbreviation
+            }
+        })
+    return results
+
 @search_bp.route('/books', methods=['GET'])
 def search_books():
     """Search for books by name or abbreviation"""
@@ -28,7 +59,7 @@ def search_books():
             'name': book.name,
             'abbreviation': book.abbreviation,
             'testament': book.testament,
-            'chapter_count': len(book.chapters)
+            'chapter_count': book_chapter_count(book.id)
         } for book in books]
     })
 
@@ -39,31 +70,11 @@ def search_verses():
     if not query or len(query) < 3:
         return jsonify({'verses': []})
     
-    # Search verse text (case-insensitive)
-    verses = db.session.query(Verse, Chapter, Book).join(
-        Chapter, Verse.chapter_id == Chapter.id
-    ).join(
-        Book, Chapter.book_id == Book.id
-    ).filter(
-        Verse.text.ilike(f'%{query}%')
-    ).order_by(Book.order_number, Chapter.chapter_number, Verse.verse_number).limit(50).all()
+    # Ranked full-text search over verse text
+    verse_ids, _ = search_verse_ids(query, limit=50, with_total=False)
     
     return jsonify({
-        'verses': [{
-            'id': verse.id,
-            'verse_number': verse.verse_number,
-            'text': verse.text,
-            'reference': f"{book.name} {chapter.chapter_number}:{verse.verse_number}",
-            'chapter': {
-                'id': chapter.id,
-                'chapter_number': chapter.chapter_number
-            },
-            'book': {
-                'id': book.id,
-                'name': book.name,
-                'abbreviation': book.abbreviation
-            }
-        } for verse, chapter, book in verses]
+        'verses': verse_search_results(verse_ids)
     })
 
 @search_bp.route('/chapters', methods=['GET'])
@@ -100,25 +111,12 @@ def search_chapters():
 def search_suggestions():
     """Get search suggestions for autocomplete"""
     query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), 25))
     if not query or len(query) < 2:
         return jsonify({'suggestions': []})
     
-    suggestions = []
-    
-    # Search books
-    books = Book.query.filter(
-        or_(
-            Book.name.ilike(f'%{query}%'),
-            Book.abbreviation.ilike(f'%{query}%')
-        )
-    ).limit(10).all()
-    for book in books:
-        suggestions.append({
-            'type': 'book',
-            'id': book.id,
-            'name': book.name,
-            'display': f"Book: {book.name}"
-        })
+    # Typed, ranked suggestions (books, words, Strong's entries, chapters) from the in-memory index
+    suggestions = get_autocomplete_index().suggest(query, limit=limit)
     
     return jsonify({'suggestions': suggestions})
 
@@ -142,13 +140,7 @@ def comprehensive_search():
     ).limit(10).all()
     
     # Search verses
-    verses = db.session.query(Verse, Chapter, Book).join(
-        Chapter, Verse.chapter_id == Chapter.id
-    ).join(
-        Book, Chapter.book_id == Book.id
-    ).filter(
-        Verse.text.ilike(f'%{query}%')
-    ).order_by(Book.order_number, Chapter.chapter_number, Verse.verse_number).limit(20).all()
+    verse_ids, _ = search_verse_ids(query, limit=20, with_total=False)
     
     # Search chapter summaries
     chapters = db.session.query(Chapter, Book, ChapterMetadata).join(
@@ -165,23 +157,9 @@ def comprehensive_search():
             'name': book.name,
             'abbreviation': book.abbreviation,
             'testament': book.testament,
-            'chapter_count': len(book.chapters)
+            'chapter_count': book_chapter_count(book.id)
         } for book in books],
-        'verses': [{
-            'id': verse.id,
-            'verse_number': verse.verse_number,
-            'text': verse.text,
-            'reference': f"{book.name} {chapter.chapter_number}:{verse.verse_number}",
-            'chapter': {
-                'id': chapter.id,
-                'chapter_number': chapter.chapter_number
-            },
-            'book': {
-                'id': book.id,
-                'name': book.name,
-                'abbreviation': book.abbreviation
-            }
-        } for verse, chapter, book in verses],
+        'verses': verse_search_results(verse_ids),
         'chapters': [{
             'id': chapter.id,
             'chapter_number': chapter.chapter_number,
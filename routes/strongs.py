@@ -1,16 +1,29 @@
 from flask import Blueprint, request, jsonify
-from models import StrongsEntry, VerseStrongsMapping, Verse, Chapter, Book, StrongsConcordanceCache, db
-from sqlalchemy import or_
+from models import StrongsEntry, VerseStrongsMapping, Verse, Chapter, Book, db
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from marshmallow import Schema, fields, ValidationError
+from canon import get_canon
+import config
+from http_cache import http_cached
+from concordance import build_concordance, concordance_payload, get_concordance_row
+from lexicon import get_lexicon
+from search_service import search_strongs_entries
+from serializers import verse_payloads
+import base64
+import json
 import re
 
 strongs_bp = Blueprint('strongs', __name__)
 
+STRONGS_SEARCH_SORTS = ['relevance', 'frequency']
+
 class StrongsSearchSchema(Schema):
     query = fields.Str(required=True, validate=lambda x: len(x.strip()) > 0)
     language = fields.Str(required=False, validate=lambda x: x in ['hebrew', 'greek', 'both'])
 
 @strongs_bp.route('/lookup/<strongs_number>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_DEFAULT_MAX_AGE)
 def lookup_strongs_number(strongs_number):
     """Look up a specific Strong's number (e.g., H430, G2316)"""
     # Validate format
@@ -23,13 +36,17 @@ def lookup_strongs_number(strongs_number):
     
     # Get verses that use this Strong's number
     mappings = VerseStrongsMapping.query.filter_by(strongs_number=strongs_number).limit(10).all()
+    verses_by_id = {
+        verse_data['id']: verse_data
+        for verse_data in verse_payloads([mapping.verse_id for mapping in mappings], include_strongs=True)
+    }
     verse_examples = []
     
     for mapping in mappings:
-        verse = mapping.verse
-        verse_data = verse.to_dict(include_strongs=True)
+        if mapping.verse_id not in verses_by_id:
+            continue
         verse_examples.append({
-            'verse': verse_data,
+            'verse': verses_by_id[mapping.verse_id],
             'word_position': mapping.word_position,
             'grammatical_info': mapping.grammatical_info
         })
@@ -46,6 +63,7 @@ def search_strongs():
     query = request.args.get('q', '').strip()
     language = request.args.get('language', 'both').lower()
     limit = request.args.get('limit', 20, type=int)
+    sort = request.args.get('sort', 'relevance').lower()
     
     if not query:
         return jsonify({'error': 'Query parameter q is required'}), 400
@@ -56,177 +74,205 @@ def search_strongs():
     if limit > 100:
         limit = 100
     
-    # Build query based on language filter
-    base_query = StrongsEntry.query.filter(
-        or_(
-            StrongsEntry.definition.ilike(f'%{query}%'),
-            StrongsEntry.transliteration.ilike(f'%{query}%'),
-            StrongsEntry.kjv_usage.ilike(f'%{query}%')
-        )
-    )
+    if sort not in STRONGS_SEARCH_SORTS:
+        return jsonify({'error': f'Invalid sort. Valid options: {STRONGS_SEARCH_SORTS}'}), 400
     
-    if language == 'hebrew':
-        base_query = base_query.filter(StrongsEntry.language == 'Hebrew')
-    elif language == 'greek':
-        base_query = base_query.filter(StrongsEntry.language == 'Greek')
-    
-    entries = base_query.limit(limit).all()
+    # Ranked full-text + trigram search with exact-match boosts
+    entries = search_strongs_entries(query, language=language, limit=limit, sort=sort)
     
     return jsonify({
         'query': query,
         'language_filter': language,
+        'sort': sort,
         'results': [entry.to_dict() for entry in entries],
         'count': len(entries)
     }), 200
 
 @strongs_bp.route('/concordance/<strongs_number>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_DEFAULT_MAX_AGE)
 def get_concordance(strongs_number):
     """Get all verses that contain a specific Strong's number (concordance view)"""
     # Validate format
     if not re.match(r'^[HG]\d+$', strongs_number):
         return jsonify({'error': 'Invalid Strong\'s number format. Use H#### for Hebrew or G#### for Greek.'}), 400
     
-    # Check cache first
-    cached_result = StrongsConcordanceCache.query.filter_by(strongs_number=strongs_number).first()
-    if cached_result:
-        return jsonify(cached_result.result_data), 200
-    
-    # Get the Strong's entry
-    entry = StrongsEntry.query.filter_by(strongs_number=strongs_number).first()
+    # Single read of the entry and its precomputed concordance row
+    entry, concordance = get_concordance_row(strongs_number)
     if not entry:
         return jsonify({'error': f'Strong\'s number {strongs_number} not found'}), 404
     
-    # Get all verses with this Strong's number, grouped by book
-    mappings = VerseStrongsMapping.query.filter_by(strongs_number=strongs_number)\
-        .join(Verse)\
-        .join(Chapter)\
-        .join(Book)\
-        .order_by(Book.id, Chapter.chapter_number, Verse.verse_number)\
-        .all()
+    # Numbers added since the last `flask build-concordance` are built on first request
+    if concordance is None:
+        build_concordance(strongs_number)
+        entry, concordance = get_concordance_row(strongs_number)
     
-    # Group by book
-    book_groups = {}
-    total_verses = 0
+    return jsonify(concordance_payload(entry, concordance)), 200
+
+def encode_cursor(chapter_number, verse_number):
+    """Opaque pagination cursor for a (chapter_number, verse_number) position"""
+    return base64.urlsafe_b64encode(json.dumps([chapter_number, verse_number]).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError for a malformed cursor"""
+    try:
+        chapter_number, verse_number = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return int(chapter_number), int(verse_number)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def concordance_page_query(strongs_number, book_id, after, limit):
+    """One row per verse with its word positions aggregated in SQL, keyset-paginated in reading order"""
+    rows_query = db.session.query(
+        VerseStrongsMapping.verse_id,
+        Chapter.chapter_number,
+        Verse.verse_number,
+        func.array_agg(aggregate_order_by(VerseStrongsMapping.word_position, VerseStrongsMapping.word_position))
+    ).join(Verse, VerseStrongsMapping.verse_id == Verse.id)\
+        .join(Chapter, Verse.chapter_id == Chapter.id)\
+        .filter(VerseStrongsMapping.strongs_number == strongs_number)\
+        .filter(Chapter.book_id == book_id)
     
-    for mapping in mappings:
-        verse = mapping.verse
-        book = verse.chapter.book
-        
-        if book.id not in book_groups:
-            book_groups[book.id] = {
-                'book': book.to_dict(),
-                'verse_count': 0,
-                'sample_verses': []
-            }
-        
-        book_groups[book.id]['verse_count'] += 1
-        total_verses += 1
-        
-        # Add first 3 verses as samples
-        if len(book_groups[book.id]['sample_verses']) < 3:
-            verse_data = verse.to_dict(include_strongs=True)
-            verse_data['book'] = book.to_dict()
-            verse_data['chapter_info'] = verse.chapter.to_dict()
-            book_groups[book.id]['sample_verses'].append(verse_data)
-    
-    book_groups_list = list(book_groups.values())
-    
-    result_data = {
-        'strongs_entry': entry.to_dict(),
-        'book_groups': book_groups_list,
-        'total_books': len(book_groups_list),
-        'total_verses': total_verses
-    }
+    if after is not None:
+        rows_query = rows_query.filter(tuple_(Chapter.chapter_number, Verse.verse_number) > tuple_(*after))
     
-    # Cache the result (handle duplicates properly)
-    try:
-        cache_entry = StrongsConcordanceCache(
-            strongs_number=strongs_number,
-            result_data=result_data
-        )
-        db.session.add(cache_entry)
-        db.session.commit()
-    except Exception as e:
-        # If duplicate key error, just rollback and continue
-        db.session.rollback()
-        print(f"Cache entry already exists for {strongs_number}, skipping cache update")
-    
-    return jsonify(result_data), 200
+    return rows_query.group_by(VerseStrongsMapping.verse_id, Chapter.chapter_number, Verse.verse_number)\
+        .order_by(Chapter.chapter_number, Verse.verse_number)\
+        .limit(limit)
 
 @strongs_bp.route('/concordance/<strongs_number>/book/<book_name>', methods=['GET'])
+@http_cached(config.HTTP_CACHE_DEFAULT_MAX_AGE)
 def get_concordance_by_book(strongs_number, book_name):
-    """Get all verses with a Strong's number in a specific book"""
+    """Get verses with a Strong's number in a specific book, one page at a time"""
     # Validate format
     if not re.match(r'^[HG]\d+$', strongs_number):
         return jsonify({'error': 'Invalid Strong\'s number format. Use H#### for Hebrew or G#### for Greek.'}), 400
     
+    limit = request.args.get('limit', 50, type=int)
+    cursor = request.args.get('cursor', '').strip()
+    
+    if limit < 1:
+        return jsonify({'error': 'limit must be at least 1'}), 400
+    if limit > 200:
+        limit = 200
+    
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
     # Get the book
-    book = Book.query.filter_by(name=book_name).first()
+    book = get_canon().find_book(book_name)
     if not book:
         return jsonify({'error': f'Book {book_name} not found'}), 404
     
-    # Get all verses with this Strong's number in this book, grouped by verse to avoid duplicates
-    mappings = VerseStrongsMapping.query.filter_by(strongs_number=strongs_number)\
-        .join(Verse)\
-        .join(Chapter)\
-        .filter(Chapter.book_id == book.id)\
-        .order_by(Chapter.chapter_number, Verse.verse_number, VerseStrongsMapping.word_position)\
-        .all()
+    # Fetch one extra row to learn whether another page follows
+    rows = concordance_page_query(strongs_number, book.id, after, limit + 1).all()
     
-    # Group by verse to merge duplicates and collect word positions
-    verse_groups = {}
-    for mapping in mappings:
-        verse = mapping.verse
-        if verse.id not in verse_groups:
-            verse_groups[verse.id] = {
-                'verse': verse,
-                'word_positions': []
-            }
-        verse_groups[verse.id]['word_positions'].append(mapping.word_position)
-    
-    results = []
-    for verse_group in verse_groups.values():
-        verse = verse_group['verse']
-        verse_data = verse.to_dict(include_strongs=True)
-        verse_data['book'] = book.to_dict()
-        verse_data['chapter_info'] = verse.chapter.to_dict()
-        verse_data['word_positions'] = verse_group['word_positions']  # Add word positions for highlighting
-        results.append(verse_data)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    word_positions = {verse_id: positions for verse_id, _, _, positions in rows}
+    results = verse_payloads(list(word_positions), include_strongs=True, include_book=True, include_chapter=True)
+    for verse_data in results:
+        verse_data['word_positions'] = word_positions[verse_data['id']]  # Add word positions for highlighting
     
     return jsonify({
-        'results': results
+        'results': results,
+        'count': len(results),
+        'limit': limit,
+        'has_more': has_more,
+        'next_cursor': encode_cursor(rows[-1][1], rows[-1][2]) if has_more else None
     }), 200
 
+def verse_mappings_query(verse_id):
+    """A verse's word mappings in word order"""
+    return VerseStrongsMapping.query.filter_by(verse_id=verse_id).order_by(VerseStrongsMapping.word_position)
+
 @strongs_bp.route('/verse/<int:verse_id>/strongs', methods=['GET'])
+@http_cached(config.HTTP_CACHE_DEFAULT_MAX_AGE)
 def get_verse_strongs(verse_id):
     """Get all Strong's numbers and their definitions for a specific verse"""
-    verse = Verse.query.get(verse_id)
-    if not verse:
+    verse_data = verse_payloads([verse_id], include_strongs=True)
+    if not verse_data:
         return jsonify({'error': 'Verse not found'}), 404
     
     # Get all Strong's mappings for this verse
-    mappings = VerseStrongsMapping.query.filter_by(verse_id=verse_id)\
-        .order_by(VerseStrongsMapping.word_position).all()
+    mappings = verse_mappings_query(verse_id).all()
+    
+    # Definitions for every number at once, from the in-memory lexicon
+    entries = get_lexicon().entries({mapping.strongs_number for mapping in mappings})
     
     strongs_data = []
     unique_numbers = set()
     
     for mapping in mappings:
-        if mapping.strongs_number not in unique_numbers:
-            entry = StrongsEntry.query.filter_by(strongs_number=mapping.strongs_number).first()
-            if entry:
-                strongs_data.append({
-                    'mapping': mapping.to_dict(),
-                    'definition': entry.to_dict()
-                })
-                unique_numbers.add(mapping.strongs_number)
+        if mapping.strongs_number not in unique_numbers and mapping.strongs_number in entries:
+            strongs_data.append({
+                'mapping': mapping.to_dict(),
+                'definition': entries[mapping.strongs_number]
+            })
+            unique_numbers.add(mapping.strongs_number)
     
     return jsonify({
-        'verse': verse.to_dict(include_strongs=True),
+        'verse': verse_data[0],
         'strongs_analysis': strongs_data,
         'total_strongs_numbers': len(unique_numbers)
     }), 200
 
+def chapter_mappings_query(verse_ids):
+    """Word mappings for a chapter's verses, selecting only the columns the response needs"""
+    return db.session.query(
+        VerseStrongsMapping.verse_id,
+        VerseStrongsMapping.word_position,
+        VerseStrongsMapping.strongs_number,
+        VerseStrongsMapping.grammatical_info
+    ).filter(VerseStrongsMapping.verse_id.in_(verse_ids))\
+        .order_by(VerseStrongsMapping.verse_id, VerseStrongsMapping.word_position)
+
+@strongs_bp.route('/chapter/<int:chapter_id>/strongs', methods=['GET'])
+@http_cached(config.HTTP_CACHE_DEFAULT_MAX_AGE)
+def get_chapter_strongs(chapter_id):
+    """Get the Strong's lexicon and per-verse word positions for a whole chapter"""
+    canon = get_canon()
+    chapter_position = canon.get_chapter(chapter_id)
+    if chapter_position is None:
+        return jsonify({'error': 'Chapter not found'}), 404
+    
+    verse_positions = canon.chapter_verses(chapter_position)
+    verse_ids = [canon.verse_ids[position] for position in verse_positions]
+    
+    # Every word mapping in the chapter in one column-only query
+    rows = chapter_mappings_query(verse_ids).all()
+    
+    words_by_verse = {}
+    for verse_id, word_position, strongs_number, grammatical_info in rows:
+        words_by_verse.setdefault(verse_id, []).append({
+            'word_position': word_position,
+            'strongs_number': strongs_number,
+            'grammatical_info': grammatical_info
+        })
+    
+    lexicon = get_lexicon().entries({row.strongs_number for row in rows})
+    
+    verses = [
+        {
+            'verse_id': canon.verse_ids[position],
+            'verse_number': canon.verse_numbers[position],
+            'words': words_by_verse.get(canon.verse_ids[position], [])
+        }
+        for position in verse_positions
+    ]
+    
+    return jsonify({
+        'chapter': canon.chapter_dict(chapter_position),
+        'reference': f"{canon.chapter_book(chapter_position).name} {canon.chapter_numbers[chapter_position]}",
+        'lexicon': lexicon,
+        'verses': verses,
+        'total_strongs_numbers': len(lexicon)
+    }), 200
+
 @strongs_bp.route('/stats', methods=['GET'])
 def get_strongs_stats():
     """Get statistics about Strong's concordance data"""
@@ -0,0 +1,23 @@
+"""Cache for grouped verse search results (/api/bible/search/grouped).
+
+Keys are the normalized query (case-folded, whitespace collapsed), so case
+variants share an entry. The cache is data-versioned, so an import
+invalidates every entry. Storage, eviction and stampede protection come
+from cache.py.
+"""
+import config
+from cache import Cache
+
+
+def normalize_search_query(query):
+    """Case-fold and collapse whitespace; search syntax is case-insensitive, so results are unchanged"""
+    return ' '.join(query.casefold().split())
+
+
+grouped_search_cache = Cache(
+    'search_grouped',
+    memory_entries=config.SEARCH_CACHE_MEMORY_ENTRIES,
+    ttl=config.SEARCH_CACHE_MAX_AGE_HOURS * 3600,
+    data_versioned=True,
+    shared=True
+)
@@ -0,0 +1,201 @@
+"""Full-text verse and Strong's lexicon search shared by the blueprints.
+
+Queries run against the generated ``verses.text_search`` tsvector column (GIN
+indexed) and are ranked with ts_rank. The query syntax supports:
+
+    grace faith          both words (AND is the default)
+    grace OR mercy       either word ("|" also works)
+    "living water"       exact phrase
+    -law / NOT law       exclude a word
+    redeem*              prefix match
+
+Lexicon search combines the weighted ``strongs_entries.definition_search``
+tsvector with pg_trgm matching on transliterations, boosting exact Strong's
+number and transliteration matches.
+"""
+import re
+
+from sqlalchemy import case, func, or_, select
+
+from models import db, Verse, Chapter, StrongsConcordance, StrongsEntry, VerseStrongsMapping
+
+SEARCH_CONFIG = 'english'
+
+# Postgres' english stop words; a query made only of these matches nothing via
+# the tsvector, so it falls back to a substring scan instead
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can did do does doing don down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own s
+same she should so some such t than that the their theirs them themselves then
+there these they this those through to too under until up very was we were
+what when where which while who whom why will with you your yours yourself
+yourselves
+""".split())
+
+_TOKEN_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_PATTERN = re.compile(r'[0-9A-Za-z]+')
+_STRONGS_NUMBER_PATTERN = re.compile(r'^[HG]\d+$', re.IGNORECASE)
+
+LEXICON_LANGUAGES = {'hebrew': 'Hebrew', 'greek': 'Greek'}
+
+
+def _words(text):
+    return [word.lower() for word in _WORD_PATTERN.findall(text)]
+
+
+def parse_search_query(query):
+    """Translate user search syntax into a to_tsquery() expression.
+
+    Returns (tsquery_text, has_indexable_terms). Only alphanumeric words ever
+    reach the tsquery string, so user input cannot inject tsquery operators.
+    """
+    clauses = []  # Each clause is a list of OR'd terms
+    pending_or = False
+    negate_next = False
+    indexable = False
+
+    for match in _TOKEN_PATTERN.finditer(query):
+        phrase, token = match.groups()
+
+        if token is not None:
+            upper = token.upper()
+            if upper in ('OR', '|'):
+                pending_or = bool(clauses)
+                continue
+            if upper in ('AND', '&'):
+                continue
+            if upper == 'NOT':
+                negate_next = True
+                continue
+
+            negated = negate_next or token.startswith('-')
+            prefix = token.endswith('*')
+            words = _words(token)
+        else:
+            negated = negate_next
+            prefix = False
+            words = _words(phrase)
+        negate_next = False
+
+        if not words:
+            continue
+        if not all(word in STOP_WORDS for word in words):
+            indexable = True
+
+        term = ' <-> '.join(words)
+        if prefix:
+            term += ':*'
+        if len(words) > 1:
+            term = f'({term})'
+        if negated:
+            term = f'!{term}'
+
+        if pending_or:
+            clauses[-1].append(term)
+        else:
+            clauses.append([term])
+        pending_or = False
+
+    tsquery_text = ' & '.join(
+        clause[0] if len(clause) == 1 else '(' + ' | '.join(clause) + ')'
+        for clause in clauses
+    )
+    return tsquery_text, indexable
+
+
+def _matching_verses(query, columns, book_ids=None, join_chapters=False):
+    """Build a query selecting `columns` for verses matching `query`, best match first"""
+    tsquery_text, indexable = parse_search_query(query)
+
+    if indexable:
+        ts_query = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+        verse_query = db.session.query(*columns).filter(Verse.text_search.bool_op('@@')(ts_query))
+        order = (func.ts_rank(Verse.text_search, ts_query).desc(), Verse.id)
+    else:
+        verse_query = db.session.query(*columns).filter(Verse.text.ilike(f'%{query}%'))
+        order = (Verse.id,)
+
+    if book_ids is not None or join_chapters:
+        verse_query = verse_query.join(Chapter, Verse.chapter_id == Chapter.id)
+    if book_ids is not None:
+        verse_query = verse_query.filter(Chapter.book_id.in_(book_ids))
+
+    return verse_query, order
+
+
+def search_verse_ids_query(query, limit=50, offset=0, book_ids=None):
+    """The ranked, paginated verse id query behind search_verse_ids"""
+    verse_query, order = _matching_verses(query, [Verse.id], book_ids)
+    return verse_query.order_by(*order).offset(offset).limit(limit)
+
+
+def search_verse_ids(query, limit=50, offset=0, book_ids=None, with_total=True):
+    """Return (ranked verse ids, total match count or None)"""
+    total = _matching_verses(query, [Verse.id], book_ids)[0].count() if with_total else None
+    verse_ids = [row.id for row in search_verse_ids_query(query, limit, offset, book_ids).all()]
+    return verse_ids, total
+
+
+def search_verse_books(query):
+    """Return every match as (verse_id, book_id), best match first"""
+    verse_query, order = _matching_verses(query, [Verse.id, Chapter.book_id], join_chapters=True)
+    return verse_query.order_by(*order).all()
+
+
+def strongs_search_query(query, language='both', limit=20, sort='relevance'):
+    """Build the ranked StrongsEntry query for `query`.
+
+    Matches the definition/KJV usage vector, or a transliteration by substring
+    or trigram similarity, or the Strong's number itself. Exact number and
+    transliteration matches rank first. sort='frequency' orders matches by
+    corpus occurrences instead: from the precomputed concordance, or counted
+    from verse_strongs_mappings for numbers it has no row for (e.g. before
+    `flask build-concordance` has run).
+    """
+    tsquery_text, indexable = parse_search_query(query)
+    number = query.strip().upper() if _STRONGS_NUMBER_PATTERN.match(query.strip()) else None
+
+    conditions = [
+        StrongsEntry.transliteration.ilike(f'%{query}%'),
+        StrongsEntry.transliteration.op('%')(query)  # pg_trgm similarity, for misspelled transliterations
+    ]
+    rank = func.coalesce(func.similarity(StrongsEntry.transliteration, query), 0.0)
+    if indexable:
+        ts_query = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+        conditions.append(StrongsEntry.definition_search.bool_op('@@')(ts_query))
+        rank = rank + func.ts_rank(StrongsEntry.definition_search, ts_query)
+    if number:
+        conditions.append(StrongsEntry.strongs_number == number)
+
+    score = (
+        case((StrongsEntry.strongs_number == (number or ''), 100.0), else_=0.0)
+        + case((func.lower(StrongsEntry.transliteration) == query.strip().lower(), 10.0), else_=0.0)
+        + rank
+    )
+
+    entry_query = StrongsEntry.query.filter(or_(*conditions))
+    if language in LEXICON_LANGUAGES:
+        entry_query = entry_query.filter(StrongsEntry.language == LEXICON_LANGUAGES[language])
+
+    if sort == 'frequency':
+        mapped_count = (
+            select(func.count())
+            .where(VerseStrongsMapping.strongs_number == StrongsEntry.strongs_number)
+            .correlate(StrongsEntry)
+            .scalar_subquery()
+        )
+        entry_query = entry_query.outerjoin(
+            StrongsConcordance, StrongsConcordance.strongs_number == StrongsEntry.strongs_number
+        ).order_by(func.coalesce(StrongsConcordance.total_verses, mapped_count).desc(), score.desc(), StrongsEntry.id)
+    else:
+        entry_query = entry_query.order_by(score.desc(), StrongsEntry.id)
+
+    return entry_query.limit(limit)
+
+
+def search_strongs_entries(query, language='both', limit=20, sort='relevance'):
+    """Return ranked StrongsEntry rows matching `query` (see strongs_search_query)"""
+    return strongs_search_query(query, language, limit, sort).all()
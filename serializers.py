@@ -0,0 +1,75 @@
+"""Batched serialization for verses, chapters and books.
+
+Reference strings and chapter/verse counts come from the canon store, so
+serializing a page of results costs no queries beyond the one that selected
+the verse ids. Verses missing from the worker's canon snapshot (e.g. imported
+after it was loaded) fall back to a single eager-loaded query.
+"""
+from sqlalchemy.orm import joinedload
+
+from canon import get_canon
+from models import Verse, Chapter
+
+
+def book_payload(book_id):
+    """Serialize a book like Book.to_dict, without loading its chapters"""
+    canon = get_canon()
+    return canon.book_dict(canon.get_book(book_id))
+
+
+def book_chapter_count(book_id):
+    """Number of chapters in a book, without loading them"""
+    book = get_canon().get_book(book_id)
+    return book.chapter_end - book.chapter_start if book else 0
+
+
+def chapter_payload(chapter_id):
+    """Serialize a chapter like Chapter.to_dict, without loading its verses"""
+    canon = get_canon()
+    return canon.chapter_dict(canon.get_chapter(chapter_id))
+
+
+def verses_by_id_query(verse_ids):
+    """Verses with their chapters and books, for ids missing from the canon store"""
+    return Verse.query.options(
+        joinedload(Verse.chapter).joinedload(Chapter.book)
+    ).filter(Verse.id.in_(verse_ids))
+
+
+def verse_payloads(verse_ids, include_strongs=False, include_book=False, include_chapter=False):
+    """Serialize verses in the given order like Verse.to_dict.
+
+    include_book adds the verse's book under 'book' and include_chapter adds
+    its chapter under 'chapter_info', matching the existing response shapes.
+    """
+    canon = get_canon()
+    positions = {verse_id: canon.get_verse(verse_id) for verse_id in verse_ids}
+
+    missing = [verse_id for verse_id, position in positions.items() if position is None]
+    fallback = {}
+    if missing:
+        verses = verses_by_id_query(missing).all()
+        fallback = {verse.id: verse for verse in verses}
+
+    payloads = []
+    for verse_id in verse_ids:
+        position = positions[verse_id]
+        if position is not None:
+            chapter_position = canon.verse_chapters[position]
+            verse_data = canon.verse_dict(position, include_strongs=include_strongs)
+            if include_book:
+                verse_data['book'] = canon.book_dict(canon.chapter_book(chapter_position))
+            if include_chapter:
+                verse_data['chapter_info'] = canon.chapter_dict(chapter_position)
+        elif verse_id in fallback:
+            verse = fallback[verse_id]
+            verse_data = verse.to_dict(include_strongs=include_strongs)
+            if include_book:
+                verse_data['book'] = verse.chapter.book.to_dict()
+            if include_chapter:
+                verse_data['chapter_info'] = verse.chapter.to_dict()
+        else:
+            continue
+        payloads.append(verse_data)
+
+    return payloads
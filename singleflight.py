@@ -0,0 +1,124 @@
+"""Single-flight coalescing of identical in-flight work.
+
+Within a worker, the first caller for a key becomes its leader and concurrent
+callers for the same key wait for the leader's result instead of repeating
+the work. Across workers, leaders serialize on a Postgres advisory lock per
+key; a leader that had to wait for the lock re-checks the shared cache before
+doing the work itself.
+"""
+from contextlib import contextmanager
+import hashlib
+import logging
+import threading
+import time
+
+from db_pool import get_lock_engine
+from models import db
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """A single in-flight computation that followers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise TimeoutError('Timed out waiting for an identical in-flight request')
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Process-local registry of in-flight keys"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def claim(self, keys):
+        """Split keys into (keys this caller leads, {key: Flight} led by someone else)"""
+        led = []
+        followed = {}
+        with self._lock:
+            for key in keys:
+                flight = self._flights.get(key)
+                if flight is None:
+                    self._flights[key] = Flight()
+                    led.append(key)
+                else:
+                    followed[key] = flight
+        return led, followed
+
+    def resolve(self, key, result=None, error=None):
+        """Publish a leader's result (or error) to its followers; later calls are no-ops"""
+        with self._lock:
+            flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.result = result
+            flight.error = error
+            flight.done.set()
+
+
+def advisory_lock_id(key):
+    """Stable signed 64-bit advisory lock id for a key"""
+    digest = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _poll_lock(connection, lock_id, deadline, poll_interval):
+    """Try an advisory lock until it is granted or the deadline passes"""
+    while True:
+        if connection.execute(db.text('SELECT pg_try_advisory_lock(:lock_id)'), {'lock_id': lock_id}).scalar():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+@contextmanager
+def advisory_locks(keys, timeout, poll_interval=0.25):
+    """Hold cross-worker locks on `keys` for the duration of the block.
+
+    Yields True when every lock was acquired and False when `timeout` ran out
+    first, in which case the caller proceeds uncoordinated. Locks are taken in
+    sorted order with pg_try_advisory_lock polling, so waiters never deadlock
+    and never block a database backend. On databases other than Postgres this
+    is a no-op stand-in; the in-process SingleFlight still coalesces requests
+    within the worker.
+    """
+    if not keys or db.engine.dialect.name != 'postgresql':
+        yield True
+        return
+
+    lock_ids = sorted({advisory_lock_id(key) for key in keys})
+    held = []
+    # A connection from the separate lock engine, so a lock held for the length of
+    # a model call never occupies the app pool, and session commits never touch it
+    connection = get_lock_engine().connect()
+    try:
+        deadline = time.monotonic() + timeout
+        for lock_id in lock_ids:
+            if not _poll_lock(connection, lock_id, deadline, poll_interval):
+                break
+            held.append(lock_id)
+
+        acquired = len(held) == len(lock_ids)
+        if not acquired:
+            logger.warning(f"Advisory lock wait timed out after {timeout}s; continuing without it")
+        yield acquired
+    finally:
+        try:
+            for lock_id in held:
+                connection.execute(db.text('SELECT pg_advisory_unlock(:lock_id)'), {'lock_id': lock_id})
+            connection.commit()
+        except Exception:
+            # Postgres drops session locks with the backend, so discard the connection
+            connection.invalidate()
+        finally:
+            connection.close()
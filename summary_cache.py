@@ -0,0 +1,223 @@
+"""Per-perspective cache of generated verse summaries.
+
+Rows are keyed by (verse range, perspective, prompt version), so a request
+only generates the perspectives that are not cached yet, and concurrent
+writers upsert instead of racing on insert. Shared by /summary and
+/scholarly-consensus.
+
+Scholarly consensus results go through the shared cache API (cache.py) in the
+'consensus' namespace. They are keyed by the sorted perspective set,
+versioned by both prompt versions, and expire after CONSENSUS_CACHE_TTL_HOURS.
+
+Generation goes through a single-flight layer keyed by (verse range,
+perspective, prompt version): identical concurrent requests, in this worker
+or another, wait for one generation instead of each calling the model.
+"""
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert
+
+from ai_client import (
+    CONSENSUS_PROMPT_VERSION, CrossReference, FallbackAnalysis, SUMMARY_PROMPT_VERSION,
+    TheologicalAnalysis, TheologicalPerspective, gemini_client
+)
+from cache import Cache
+import config
+from db_pool import release_db_connection
+from models import db, PerspectiveSummary
+from singleflight import SingleFlight, advisory_locks
+
+_flights = SingleFlight()
+
+
+def summary_key(start_verse_id, end_verse_id, perspective):
+    return ('summary', start_verse_id, end_verse_id, perspective.value, SUMMARY_PROMPT_VERSION)
+
+
+def cached_analyses_query(start_verse_id, end_verse_id, perspectives):
+    """Stored summaries for the requested perspectives at the current prompt version"""
+    return PerspectiveSummary.query.filter(
+        PerspectiveSummary.verse_range_start == start_verse_id,
+        PerspectiveSummary.verse_range_end == end_verse_id,
+        PerspectiveSummary.prompt_version == SUMMARY_PROMPT_VERSION,
+        PerspectiveSummary.perspective.in_([p.value for p in perspectives])
+    )
+
+
+def get_cached_analyses(start_verse_id, end_verse_id, perspectives):
+    """Return {perspective: TheologicalAnalysis} for the requested perspectives that are cached"""
+    rows = cached_analyses_query(start_verse_id, end_verse_id, perspectives).all()
+
+    return {
+        TheologicalPerspective(row.perspective): TheologicalAnalysis(
+            perspective_name=TheologicalPerspective(row.perspective),
+            response_text=row.response_text,
+            cross_references=[CrossReference(**ref) for ref in row.cross_references]
+        )
+        for row in rows
+    }
+
+
+def store_analyses(start_verse_id, end_verse_id, analyses):
+    """Upsert generated analyses; fallback placeholders are never cached"""
+    now = datetime.utcnow()
+    rows = [
+        {
+            'verse_range_start': start_verse_id,
+            'verse_range_end': end_verse_id,
+            'perspective': analysis.perspective_name.value,
+            'prompt_version': SUMMARY_PROMPT_VERSION,
+            'response_text': analysis.response_text,
+            'cross_references': [ref.dict() for ref in analysis.cross_references],
+            'created_at': now,
+            'updated_at': now
+        }
+        for analysis in analyses
+        if not isinstance(analysis, FallbackAnalysis)
+    ]
+    if not rows:
+        return
+
+    stmt = insert(PerspectiveSummary).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint='uq_perspective_summaries_key',
+        set_={
+            'response_text': stmt.excluded.response_text,
+            'cross_references': stmt.excluded.cross_references,
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    db.session.execute(stmt)
+    db.session.commit()
+
+
+def get_or_generate_analyses(start_verse_id, end_verse_id, perspectives, generate):
+    """Return ({perspective: analysis}, set of perspectives served from cache).
+
+    `generate(missing_perspectives)` must return analyses in the same order.
+    Each missing perspective is generated at most once across identical
+    concurrent requests.
+    """
+    analyses = get_cached_analyses(start_verse_id, end_verse_id, perspectives)
+    cached = set(analyses)
+
+    missing = {
+        summary_key(start_verse_id, end_verse_id, perspective): perspective
+        for perspective in perspectives if perspective not in cached
+    }
+    if not missing:
+        return analyses, cached
+
+    led, followed = _flights.claim(list(missing))
+    if followed:
+        gemini_client.metrics.increment('summary', 'coalesced_perspectives', len(followed))
+
+    # Nothing below needs a pooled connection until results are stored
+    release_db_connection()
+
+    try:
+        if led:
+            led_perspectives = [missing[key] for key in led]
+            with advisory_locks(led, timeout=config.AI_SINGLE_FLIGHT_WAIT_SECONDS):
+                # Another worker may have generated these while we waited for the lock
+                fresh = get_cached_analyses(start_verse_id, end_verse_id, led_perspectives)
+                to_generate = [p for p in led_perspectives if p not in fresh]
+                if to_generate:
+                    release_db_connection()
+                    generated = generate(to_generate)
+                    store_analyses(start_verse_id, end_verse_id, generated)
+                    fresh.update(zip(to_generate, generated))
+            analyses.update(fresh)
+            for key in led:
+                _flights.resolve(key, result=fresh[missing[key]])
+    except Exception as e:
+        for key in led:
+            _flights.resolve(key, error=e)
+        raise
+
+    for key, flight in followed.items():
+        analyses[missing[key]] = flight.wait(timeout=config.AI_SINGLE_FLIGHT_WAIT_SECONDS)
+
+    return analyses, cached
+
+
+def stream_analyses(start_verse_id, end_verse_id, perspectives, generate_stream):
+    """Yield (kind, perspective, payload) events for a streamed summary.
+
+    Cached perspectives come first as 'cached' events, then each missing one
+    as an 'analysis' event when it finishes, with 'delta' text chunks in
+    between when token streaming is on. `generate_stream(missing_perspectives)`
+    yields events shaped like GeminiClient._iter_perspective_tasks. The DB
+    session is released before generation starts and only reopened briefly to
+    store the results. Perspectives already in flight in this worker are
+    awaited rather than generated again.
+    """
+    analyses = get_cached_analyses(start_verse_id, end_verse_id, perspectives)
+    missing = {
+        summary_key(start_verse_id, end_verse_id, perspective): perspective
+        for perspective in perspectives if perspective not in analyses
+    }
+    led, followed = _flights.claim(list(missing))
+    if followed:
+        gemini_client.metrics.increment('summary', 'coalesced_perspectives', len(followed))
+
+    # Don't hold a pooled connection for the length of the stream
+    db.session.remove()
+
+    generated = []
+    try:
+        for perspective in perspectives:
+            if perspective in analyses:
+                yield 'cached', perspective, analyses[perspective]
+
+        if led:
+            led_perspectives = [missing[key] for key in led]
+            for kind, index, payload in generate_stream(led_perspectives):
+                perspective = led_perspectives[index]
+                if kind == 'analysis':
+                    generated.append(payload)
+                    _flights.resolve(summary_key(start_verse_id, end_verse_id, perspective), result=payload)
+                yield kind, perspective, payload
+
+        for key, flight in followed.items():
+            yield 'analysis', missing[key], flight.wait(timeout=config.AI_SINGLE_FLIGHT_WAIT_SECONDS)
+    finally:
+        # Also reached when the client disconnects mid-stream
+        for key in led:
+            _flights.resolve(key, error=RuntimeError('Streaming generation was abandoned'))
+        if generated:
+            try:
+                store_analyses(start_verse_id, end_verse_id, generated)
+            except Exception as e:
+                print(f"Error storing streamed analyses: {str(e)}")
+            finally:
+                db.session.remove()
+
+
+def consensus_key(perspectives):
+    """Order-independent key for a set of perspectives"""
+    return ','.join(sorted({p.value for p in perspectives}))
+
+
+def consensus_prompt_version():
+    # The consensus is built from the perspective summaries, so both prompts version it
+    return f"{CONSENSUS_PROMPT_VERSION}+{SUMMARY_PROMPT_VERSION}"
+
+
+consensus_cache = Cache(
+    'consensus',
+    memory_entries=config.CONSENSUS_CACHE_MEMORY_ENTRIES,
+    ttl=config.CONSENSUS_CACHE_TTL_HOURS * 3600,
+    version=consensus_prompt_version(),
+    shared=True
+)
+
+
+def get_cached_consensus(start_verse_id, end_verse_id, perspectives):
+    """Return the cached, unexpired consensus data for a perspective set, or None"""
+    return consensus_cache.get((start_verse_id, end_verse_id, consensus_key(perspectives)))
+
+
+def store_consensus(start_verse_id, end_verse_id, perspectives, consensus_data):
+    """Store a consensus result, restarting its TTL"""
+    consensus_cache.set((start_verse_id, end_verse_id, consensus_key(perspectives)), consensus_data)
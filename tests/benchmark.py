@@ -0,0 +1,26 @@
+"""Timing helpers for the slow-marked benchmarks (run them with pytest -m slow -s to see the numbers)."""
+import time
+
+
+def latencies(fn, runs, warmup=10):
+    """Sorted wall-clock times of `runs` calls to fn, in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of already sorted samples"""
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def summarize(name, samples):
+    """Print and return p50/p99 for sorted samples"""
+    summary = {'p50': percentile(samples, 0.50), 'p99': percentile(samples, 0.99)}
+    print(f"{name:<40} p50 {summary['p50']:8.3f} ms   p99 {summary['p99']:8.3f} ms")
+    return summary
@@ -0,0 +1,119 @@
+"""Shared fixtures: a throwaway Postgres seeded with tests/seed.py, and a query counter.
+
+Database tests run against TEST_DATABASE_URL when it is set (the database is
+wiped), otherwise against an embedded Postgres started for the session (see
+requirements-dev.txt). Without either they are skipped; unit tests still run.
+"""
+from contextlib import contextmanager
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event
+
+import config
+from canon import CanonStore
+from tests.seed import canon_rows, seed_database
+
+
+@pytest.fixture(scope='session')
+def database_url():
+    url = os.environ.get('TEST_DATABASE_URL')
+    if url:
+        yield url
+        return
+
+    try:
+        import embedded_postgres
+    except ImportError:
+        pytest.skip('Set TEST_DATABASE_URL or install embedded-postgres to run database tests')
+
+    with tempfile.TemporaryDirectory(prefix='libros-test-pg-') as directory:
+        server = embedded_postgres.get_server(directory, cleanup_mode='stop')
+        try:
+            yield server.get_uri().replace('postgresql://', 'postgresql+psycopg2://', 1)
+        finally:
+            server.cleanup()
+
+
+@pytest.fixture(scope='session')
+def app(database_url):
+    """The Flask app on a freshly created and seeded schema"""
+    os.environ['DATABASE_URL'] = database_url
+
+    # Deterministic caching for query counts: no background preload, no version re-reads mid-test
+    config.CHAPTER_CACHE_PRELOAD = False
+    config.AUTOCOMPLETE_PRELOAD = False
+    config.DATA_VERSION_TTL_SECONDS = 3600
+
+    from app import app as flask_app
+    from models import db
+
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('DROP SCHEMA public CASCADE')
+            connection.exec_driver_sql('CREATE SCHEMA public')
+            connection.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        db.create_all()
+        seed_database(db)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        db.session.remove()
+
+    yield flask_app
+
+    with flask_app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield
+
+
+@pytest.fixture(scope='session')
+def canon():
+    """An in-memory canon built from the seed rows, for tests that don't need the database"""
+    return CanonStore(*canon_rows())
+
+
+class QueryCounter:
+    """before_cursor_execute listener that records every statement sent to the database"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine):
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter)
+
+
+@pytest.fixture
+def query_counter(app):
+    """Count statements run on the app engine inside `with query_counter() as queries:`"""
+    from models import db
+
+    with app.app_context():
+        engine = db.engine
+    return lambda: count_queries(engine)
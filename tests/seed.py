@@ -0,0 +1,180 @@
+"""A small, deterministic canon and lexicon for the test database.
+
+Every book of the Protestant canon is present so alias and prefix resolution
+behave as in production, but each book only has a few short chapters. A few
+chapters get longer verse counts where tests or known verses rely on them.
+"""
+from collections import namedtuple
+
+BOOKS = [
+    ('Genesis', 'Gen', 'Old'), ('Exodus', 'Exod', 'Old'), ('Leviticus', 'Lev', 'Old'),
+    ('Numbers', 'Num', 'Old'), ('Deuteronomy', 'Deut', 'Old'), ('Joshua', 'Josh', 'Old'),
+    ('Judges', 'Judg', 'Old'), ('Ruth', 'Ruth', 'Old'), ('1 Samuel', '1Sam', 'Old'),
+    ('2 Samuel', '2Sam', 'Old'), ('1 Kings', '1Kgs', 'Old'), ('2 Kings', '2Kgs', 'Old'),
+    ('1 Chronicles', '1Chr', 'Old'), ('2 Chronicles', '2Chr', 'Old'), ('Ezra', 'Ezra', 'Old'),
+    ('Nehemiah', 'Neh', 'Old'), ('Esther', 'Esth', 'Old'), ('Job', 'Job', 'Old'),
+    ('Psalms', 'Ps', 'Old'), ('Proverbs', 'Prov', 'Old'), ('Ecclesiastes', 'Eccl', 'Old'),
+    ('Song of Solomon', 'Song', 'Old'), ('Isaiah', 'Isa', 'Old'), ('Jeremiah', 'Jer', 'Old'),
+    ('Lamentations', 'Lam', 'Old'), ('Ezekiel', 'Ezek', 'Old'), ('Daniel', 'Dan', 'Old'),
+    ('Hosea', 'Hos', 'Old'), ('Joel', 'Joel', 'Old'), ('Amos', 'Amos', 'Old'),
+    ('Obadiah', 'Obad', 'Old'), ('Jonah', 'Jonah', 'Old'), ('Micah', 'Mic', 'Old'),
+    ('Nahum', 'Nah', 'Old'), ('Habakkuk', 'Hab', 'Old'), ('Zephaniah', 'Zeph', 'Old'),
+    ('Haggai', 'Hag', 'Old'), ('Zechariah', 'Zech', 'Old'), ('Malachi', 'Mal', 'Old'),
+    ('Matthew', 'Matt', 'New'), ('Mark', 'Mark', 'New'), ('Luke', 'Luke', 'New'),
+    ('John', 'John', 'New'), ('Acts', 'Acts', 'New'), ('Romans', 'Rom', 'New'),
+    ('1 Corinthians', '1Cor', 'New'), ('2 Corinthians', '2Cor', 'New'), ('Galatians', 'Gal', 'New'),
+    ('Ephesians', 'Eph', 'New'), ('Philippians', 'Phil', 'New'), ('Colossians', 'Col', 'New'),
+    ('1 Thessalonians', '1Thess', 'New'), ('2 Thessalonians', '2Thess', 'New'),
+    ('1 Timothy', '1Tim', 'New'), ('2 Timothy', '2Tim', 'New'), ('Titus', 'Titus', 'New'),
+    ('Philemon', 'Phlm', 'New'), ('Hebrews', 'Heb', 'New'), ('James', 'Jas', 'New'),
+    ('1 Peter', '1Pet', 'New'), ('2 Peter', '2Pet', 'New'), ('1 John', '1John', 'New'),
+    ('2 John', '2John', 'New'), ('3 John', '3John', 'New'), ('Jude', 'Jude', 'New'),
+    ('Revelation', 'Rev', 'New'),
+]
+
+SINGLE_CHAPTER_BOOKS = {'Obadiah', 'Philemon', '2 John', '3 John', 'Jude'}
+
+# Verse counts per chapter where tests need more than the default
+VERSE_COUNTS = {
+    ('Genesis', 1): 31, ('Genesis', 2): 25,
+    ('Psalms', 2): 12,
+    ('John', 3): 36,
+    ('Romans', 1): 32,
+    ('1 John', 2): 29,
+    ('Jude', 1): 25,
+}
+DEFAULT_CHAPTERS = 3
+DEFAULT_VERSES = 6
+
+KNOWN_TEXTS = {
+    ('Genesis', 1, 1): 'In the beginning God created the heaven and the earth.',
+    ('Genesis', 1, 2): 'And the earth was without form, and void; and darkness was upon the face of the deep.',
+    ('Genesis', 1, 3): 'And God said, Let there be light: and there was light.',
+    ('Psalms', 2, 7): 'I will declare the decree: the LORD hath said unto me, Thou art my Son.',
+    ('John', 3, 16): 'For God so loved the world, that he gave his only begotten Son.',
+    ('Romans', 1, 17): 'For therein is the righteousness of God revealed from faith to faith.',
+    ('1 John', 2, 16): 'For all that is in the world, the lust of the flesh, and the lust of the eyes.',
+    ('Hebrews', 1, 5): 'For unto which of the angels said he at any time, Thou art my Son.',
+}
+
+# Strong's numbers attached to verses: (book, chapter, verse) -> [(number, english word)]
+VERSE_STRONGS = {
+    ('Genesis', 1, 1): [('H7225', 'beginning'), ('H430', 'God'), ('H1254', 'created'), ('H8064', 'heaven'), ('H776', 'earth')],
+    ('Genesis', 1, 2): [('H776', 'earth'), ('H2822', 'darkness')],
+    ('Genesis', 1, 3): [('H430', 'God'), ('H216', 'light')],
+    ('Psalms', 2, 7): [('H1121', 'Son')],
+    ('John', 3, 16): [('G2316', 'God'), ('G25', 'loved'), ('G2889', 'world'), ('G5207', 'Son')],
+    ('Romans', 1, 17): [('G2316', 'God'), ('G4102', 'faith')],
+    ('1 John', 2, 16): [('G2889', 'world'), ('G1939', 'lust')],
+    ('Hebrews', 1, 5): [('G5207', 'Son')],
+}
+
+STRONGS_ENTRIES = [
+    # (number, language, transliteration, pronunciation, definition, kjv_usage)
+    ('H430', 'Hebrew', "'elohiym", 'el-o-heem', 'gods in the ordinary sense; but specifically used of the supreme God', 'God, god, judge'),
+    ('H776', 'Hebrew', "'erets", 'eh-rets', 'the earth, land, country', 'earth, land, country'),
+    ('H1121', 'Hebrew', 'ben', 'bane', 'a son, as a builder of the family name', 'son, child'),
+    ('H1254', 'Hebrew', "bara'", 'baw-raw', 'to create; to shape or form', 'create, creator, make'),
+    ('H216', 'Hebrew', "'owr", 'ore', 'illumination or luminary, light', 'light, bright, morning'),
+    ('H2822', 'Hebrew', 'choshek', 'kho-shek', 'the dark; hence misery, destruction, death, ignorance', 'darkness, dark, night'),
+    ('H7225', 'Hebrew', "re'shiyth", 'ray-sheeth', 'the first, in place, time, order or rank; beginning', 'beginning, chief, first'),
+    ('H8064', 'Hebrew', 'shamayim', 'shaw-mah-yim', 'the sky; the heavens', 'heaven, air'),
+    ('G25', 'Greek', 'agapao', 'ag-ap-ah-o', 'to love in a social or moral sense', 'love, beloved'),
+    ('G1939', 'Greek', 'epithumia', 'ep-ee-thoo-mee-ah', 'a longing, especially for what is forbidden', 'lust, desire, concupiscence'),
+    ('G2316', 'Greek', 'theos', 'theh-os', 'a deity, especially the supreme Divinity', 'God, god, godly'),
+    ('G2889', 'Greek', 'kosmos', 'kos-mos', 'orderly arrangement; the world', 'world, adorning'),
+    ('G4102', 'Greek', 'pistis', 'pis-tis', 'persuasion, credence; moral conviction; faith', 'faith, assurance, belief'),
+    ('G5207', 'Greek', 'huios', 'hwee-os', 'a son, used very widely of immediate, remote or figurative kinship', 'son, child'),
+]
+
+BookRow = namedtuple('BookRow', ['id', 'name', 'abbreviation', 'testament', 'order_number'])
+ChapterRow = namedtuple('ChapterRow', ['id', 'book_id', 'chapter_number'])
+VerseRow = namedtuple('VerseRow', ['id', 'chapter_id', 'verse_number', 'text', 'text_with_strongs', 'strongs_numbers'])
+
+
+def _verse_strongs(key, text):
+    words = VERSE_STRONGS.get(key)
+    if not words:
+        return None, None
+    text_with_strongs = text
+    for number, word in words:
+        text_with_strongs = text_with_strongs.replace(word, f'{word}[{number}]', 1)
+    return text_with_strongs, [number for number, _ in words]
+
+
+def canon_rows():
+    """(book rows, chapter rows, verse rows) in canonical order, with stable ids"""
+    books, chapters, verses = [], [], []
+    chapter_id = verse_id = 0
+
+    for order_number, (name, abbreviation, testament) in enumerate(BOOKS, start=1):
+        books.append(BookRow(order_number, name, abbreviation, testament, order_number))
+        chapter_count = 1 if name in SINGLE_CHAPTER_BOOKS else DEFAULT_CHAPTERS
+        for chapter_number in range(1, chapter_count + 1):
+            chapter_id += 1
+            chapters.append(ChapterRow(chapter_id, order_number, chapter_number))
+            for verse_number in range(1, VERSE_COUNTS.get((name, chapter_number), DEFAULT_VERSES) + 1):
+                verse_id += 1
+                key = (name, chapter_number, verse_number)
+                text = KNOWN_TEXTS.get(key, f'The word of {name} chapter {chapter_number} verse {verse_number}.')
+                text_with_strongs, strongs_numbers = _verse_strongs(key, text)
+                verses.append(VerseRow(verse_id, chapter_id, verse_number, text, text_with_strongs, strongs_numbers))
+
+    return books, chapters, verses
+
+
+def verse_id(book_name, chapter_number, verse_number):
+    """Seeded id of a verse"""
+    _, chapters, verses = canon_rows()
+    book_id = next(index for index, book in enumerate(BOOKS, start=1) if book[0] == book_name)
+    chapter = next(row for row in chapters if row.book_id == book_id and row.chapter_number == chapter_number)
+    return next(row.id for row in verses if row.chapter_id == chapter.id and row.verse_number == verse_number)
+
+
+def seed_database(db):
+    """Insert the canon, lexicon and one prophecy with its fulfillment; leaves the data version at 2"""
+    from models import (
+        Book, BookGenre, BookMetadata, Chapter, ChapterMetadata, DataVersion, MessianicProphecy,
+        ProphecyCategory, StrongsEntry, Verse, VerseStrongsMapping
+    )
+
+    books, chapters, verses = canon_rows()
+    db.session.add_all(Book(**row._asdict()) for row in books)
+    db.session.flush()
+    db.session.add_all(Chapter(**row._asdict()) for row in chapters)
+    db.session.flush()
+    db.session.add_all(Verse(**row._asdict()) for row in verses)
+    db.session.flush()
+
+    db.session.add_all(
+        StrongsEntry(strongs_number=number, language=language, transliteration=transliteration,
+                     pronunciation=pronunciation, definition=definition, kjv_usage=kjv_usage)
+        for number, language, transliteration, pronunciation, definition, kjv_usage in STRONGS_ENTRIES
+    )
+    for key, words in VERSE_STRONGS.items():
+        for position, (number, _) in enumerate(words):
+            db.session.add(VerseStrongsMapping(verse_id=verse_id(*key), strongs_number=number, word_position=position))
+
+    db.session.add(BookMetadata(
+        book_id=1, author='Moses', genre=BookGenre.LAW, primary_audience='Israel', start_year=-1450, end_year=-1410
+    ))
+    db.session.add(ChapterMetadata(chapter_id=1, summary='The creation of the heavens and the earth.'))
+    db.session.add(DataVersion(id=1, version=1))
+    db.session.flush()
+
+    prophecy = MessianicProphecy(
+        claim='The Messiah is declared to be the Son of God.',
+        category=ProphecyCategory.DIVINE_NATURE,
+        prophecy_verse_start=verse_id('Psalms', 2, 7),
+        prophecy_verse_end=verse_id('Psalms', 2, 7),
+        fulfillment_references=[
+            {'book_name': 'Hebrews', 'chapter': 1, 'verse_start': 5, 'verse_end': 5,
+             'verse_start_id': verse_id('Hebrews', 1, 5), 'fulfillment_type': 'direct'}
+        ],
+        fulfillment_explanation='Hebrews applies Psalm 2:7 to Christ.',
+        generated_from_book='Psalms'
+    )
+    db.session.add(prophecy)
+    db.session.flush()
+    prophecy.sync_fulfillments()
+    db.session.commit()
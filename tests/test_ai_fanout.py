@@ -0,0 +1,190 @@
+"""Deadlines and fan-out accounting in GeminiClient._iter_perspective_tasks, with the model faked out."""
+import threading
+import time
+
+import pytest
+
+import ai_client
+from ai_client import FallbackAnalysis, GeminiClient, PerspectiveTask, TheologicalAnalysis, TheologicalPerspective
+from tests.benchmark import latencies, summarize
+
+PERSPECTIVES = list(TheologicalPerspective)[:4]
+
+
+def tasks(count=len(PERSPECTIVES)):
+    return [
+        PerspectiveTask(perspective, 'system', f'prompt {index}', f'fallback {index}')
+        for index, perspective in enumerate(PERSPECTIVES[:count])
+    ]
+
+
+def analysis(task):
+    return TheologicalAnalysis(perspective_name=task.perspective, response_text=task.prompt, cross_references=[])
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    monkeypatch.setattr(ai_client.config, 'AI_CALL_TIMEOUT_SECONDS', 0.2)
+    monkeypatch.setattr(ai_client.config, 'AI_REQUEST_FANOUT', 2)
+    return GeminiClient()
+
+
+def test_trickling_stream_times_out(gemini, monkeypatch):
+    stop = threading.Event()
+
+    def stream(task, on_text):
+        if task.prompt == 'prompt 0':
+            # Never finishes, but never goes quiet long enough to hit a get() timeout
+            while not stop.wait(0.01):
+                on_text('.')
+        return analysis(task)
+
+    monkeypatch.setattr(gemini, '_stream_perspective_analysis', stream)
+    try:
+        start = time.monotonic()
+        events = list(gemini._iter_perspective_tasks(tasks(2), concurrent=True, stream_tokens=True))
+        elapsed = time.monotonic() - start
+    finally:
+        stop.set()
+
+    results = {index: payload for kind, index, payload in events if kind == 'analysis'}
+    assert elapsed < 1.0
+    assert isinstance(results[0], FallbackAnalysis)
+    assert results[1].response_text == 'prompt 1'
+    assert any(kind == 'delta' and index == 0 for kind, index, _ in events)
+
+
+def test_timed_out_calls_keep_their_fan_out_slot_until_they_return(gemini, monkeypatch):
+    release = threading.Event()
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def generate(task):
+        with lock:
+            in_flight.append(task.prompt)
+            peak.append(len(in_flight))
+        try:
+            if task.prompt in ('prompt 0', 'prompt 1'):
+                release.wait(5)
+            return analysis(task)
+        finally:
+            with lock:
+                in_flight.remove(task.prompt)
+
+    monkeypatch.setattr(gemini, '_generate_perspective_analysis', generate)
+    monkeypatch.setattr(ai_client.config, 'AI_CALL_TIMEOUT_SECONDS', 0.5)
+    # After the calls time out (0.5s), before the request stops waiting for them (1.0s)
+    threading.Timer(0.75, release.set).start()
+
+    results = {}
+    for kind, index, payload in gemini._iter_perspective_tasks(tasks(4), concurrent=True):
+        results[index] = payload
+        if index in (0, 1):
+            # Timed out, but the stuck calls still hold both slots
+            assert not release.is_set()
+
+    assert max(peak) == 2
+    assert isinstance(results[0], FallbackAnalysis) and isinstance(results[1], FallbackAnalysis)
+    assert results[2].response_text == 'prompt 2' and results[3].response_text == 'prompt 3'
+
+
+def test_calls_that_never_return_stop_holding_slots(gemini, monkeypatch):
+    release = threading.Event()
+
+    def generate(task):
+        if task.prompt == 'prompt 0':
+            release.wait(5)
+        return analysis(task)
+
+    monkeypatch.setattr(gemini, '_generate_perspective_analysis', generate)
+    monkeypatch.setattr(ai_client.config, 'AI_REQUEST_FANOUT', 1)
+    try:
+        start = time.monotonic()
+        results = dict(
+            (index, payload) for kind, index, payload in gemini._iter_perspective_tasks(tasks(2), concurrent=True)
+        )
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+
+    # One timeout for the call, one more waiting for it to return
+    assert elapsed < 1.0
+    assert isinstance(results[0], FallbackAnalysis)
+    assert results[1].response_text == 'prompt 1'
+
+
+def test_failed_calls_fall_back_without_waiting(gemini, monkeypatch):
+    def generate(task):
+        if task.prompt == 'prompt 1':
+            raise RuntimeError('model unavailable')
+        return analysis(task)
+
+    monkeypatch.setattr(gemini, '_generate_perspective_analysis', generate)
+
+    results = dict(
+        (index, payload) for kind, index, payload in gemini._iter_perspective_tasks(tasks(3), concurrent=True)
+    )
+    assert isinstance(results[1], FallbackAnalysis)
+    assert [results[index].response_text for index in (0, 2)] == ['prompt 0', 'prompt 2']
+
+
+def test_batched_call_runs_on_the_executor_with_a_timeout(gemini, monkeypatch):
+    monkeypatch.setattr(ai_client.config, 'AI_BATCHED_CALL_TIMEOUT_STEP_SECONDS', 0.1)
+    release = threading.Event()
+    calls = []
+
+    def call_model(kind, **kwargs):
+        calls.append((kind, threading.current_thread().name, kwargs['config'].http_options.timeout))
+        release.wait(5)
+        raise RuntimeError('abandoned')
+
+    monkeypatch.setattr(gemini, '_call_model', call_model)
+    monkeypatch.setattr(gemini, '_generate_perspective_analysis', analysis)
+    perspectives = PERSPECTIVES[:3]
+    try:
+        start = time.monotonic()
+        result = gemini.generate_verse_summary('text', 'John 3:16', perspectives,
+                                               mode=ai_client.GenerationMode.BATCHED)
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+
+    # 0.2s plus 0.1s for each perspective after the first, then each one is retried on its own
+    assert 0.4 <= elapsed < 1.0
+    [(kind, thread_name, http_timeout)] = calls
+    assert kind == 'batched'
+    assert thread_name.startswith('gemini')
+    assert http_timeout == 400
+    assert [a.perspective_name for a in result.analyses] == perspectives
+    assert not any(isinstance(a, FallbackAnalysis) for a in result.analyses)
+
+
+CALL_SECONDS = 0.05
+
+
+def sleeping_generate(task):
+    time.sleep(CALL_SECONDS)
+    return analysis(task)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('fanout', [1, 2, 5])
+def test_fan_out_benchmark(gemini, monkeypatch, fanout):
+    monkeypatch.setattr(gemini, '_generate_perspective_analysis', sleeping_generate)
+    monkeypatch.setattr(ai_client.config, 'AI_CALL_TIMEOUT_SECONDS', 5)
+    monkeypatch.setattr(ai_client.config, 'AI_REQUEST_FANOUT', fanout)
+    perspectives = list(TheologicalPerspective)[:5]
+
+    def summary(concurrent):
+        result = gemini.generate_verse_summary('text', 'John 3:16', perspectives, concurrent=concurrent,
+                                               mode=ai_client.GenerationMode.PER_PERSPECTIVE)
+        assert [a.perspective_name for a in result.analyses] == perspectives
+
+    sequential = summarize(f'sequential, {len(perspectives)} calls', latencies(lambda: summary(False), 5, warmup=1))
+    concurrent = summarize(f'concurrent, fan-out {fanout}', latencies(lambda: summary(True), 5, warmup=1))
+
+    # Calls run in ceil(calls / fanout) waves
+    waves = -(-len(perspectives) // fanout)
+    assert sequential['p50'] >= len(perspectives) * CALL_SECONDS * 1000
+    assert waves * CALL_SECONDS * 1000 <= concurrent['p50'] < (waves + 1) * CALL_SECONDS * 1000
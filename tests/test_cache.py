@@ -0,0 +1,157 @@
+from collections import Counter
+import time
+
+import pytest
+
+import cache as cache_module
+import config
+from cache import Cache, DatabaseTier, FileTier, MemoryTier, _MISSING
+from models import db, CacheEntry, StrongsEntry
+from tests.benchmark import latencies, summarize
+
+NAMESPACE = 'test-tier'
+
+
+@pytest.fixture
+def tier(app_context):
+    tier = DatabaseTier()
+    yield tier
+    tier.clear(NAMESPACE)
+    db.session.rollback()
+
+
+def accessed_at(key):
+    with db.engine.connect() as connection:
+        return connection.execute(db.select(CacheEntry.accessed_at).where(CacheEntry.key == key)).scalar()
+
+
+def test_round_trip(tier):
+    tier.set(f'{NAMESPACE}:1:a', {'answer': 42}, None)
+
+    assert tier.get(f'{NAMESPACE}:1:a') == ({'answer': 42}, None)
+    assert tier.get(f'{NAMESPACE}:1:missing') == (_MISSING, None)
+
+    tier.delete(f'{NAMESPACE}:1:a')
+    assert tier.get(f'{NAMESPACE}:1:a') == (_MISSING, None)
+
+
+def test_expired_entries_miss(tier):
+    tier.set(f'{NAMESPACE}:1:old', 'stale', time.time() - 60)
+    assert tier.get(f'{NAMESPACE}:1:old') == (_MISSING, None)
+
+
+def test_cache_calls_leave_the_request_session_alone(tier):
+    entry = StrongsEntry.query.filter_by(strongs_number='G25').one()
+    original = entry.definition
+    entry.definition = 'uncommitted edit'
+    db.session.flush()
+
+    tier.set(f'{NAMESPACE}:1:a', 'value', None)
+    tier.get(f'{NAMESPACE}:1:a')
+    tier.evict(10000)
+
+    db.session.rollback()
+    assert StrongsEntry.query.filter_by(strongs_number='G25').one().definition == original
+
+
+def test_reads_do_not_write(tier, query_counter):
+    tier.set(f'{NAMESPACE}:1:a', 'value', None)
+
+    with query_counter() as queries:
+        for _ in range(5):
+            assert tier.get(f'{NAMESPACE}:1:a') == ('value', None)
+
+    assert queries.count == 5
+    assert all(statement.lstrip().upper().startswith('SELECT') for statement in queries.statements)
+
+
+def test_eviction_keeps_the_most_recently_read_entries(tier):
+    for name in ('a', 'b', 'c'):
+        tier.set(f'{NAMESPACE}:1:{name}', name, None)
+    written = accessed_at(f'{NAMESPACE}:1:a')
+
+    tier.get(f'{NAMESPACE}:1:a')
+    assert accessed_at(f'{NAMESPACE}:1:a') == written
+
+    # The batched touch runs first, so 'a' counts as the newest (other namespaces' rows go too)
+    tier.evict(1)
+    assert accessed_at(f'{NAMESPACE}:1:a') > written
+    assert tier.get(f'{NAMESPACE}:1:a') == ('a', None)
+    assert tier.get(f'{NAMESPACE}:1:b') == (_MISSING, None)
+    assert tier.get(f'{NAMESPACE}:1:c') == (_MISSING, None)
+
+
+def test_shared_evictions_are_counted_per_namespace(tier, client, monkeypatch):
+    monkeypatch.setattr(cache_module, '_shared_evictions', Counter())
+    monkeypatch.setattr(config, 'CACHE_SHARED_MAX_ENTRIES', 10000)
+    expired = time.time() - 60
+    for name in ('a', 'b', 'c'):
+        tier.set(f'{NAMESPACE}:1:{name}', name, expired)
+    tier.set('search_grouped:1:expired', 'stale', expired)
+
+    evicted = cache_module.evict_shared(tier)
+
+    assert evicted[NAMESPACE] == 3
+    assert evicted['search_grouped'] == 1
+    stats = client.get('/api/bible/search/grouped/cache-stats').get_json()['search_cache']
+    assert stats['shared_evictions'] == 1
+    assert cache_module.cache_stats()['shared_evictions'] == sum(evicted.values())
+
+
+# Shaped like a grouped search result
+BENCHMARK_VALUE = {
+    'query': 'benchmark',
+    'book_groups': [
+        {'book': {'id': book_id, 'name': f'Book {book_id}'}, 'verse_count': book_id,
+         'sample_verses': [{'id': i, 'text': 'In the beginning God created the heaven and the earth.'} for i in range(3)]}
+        for book_id in range(20)
+    ]
+}
+BENCHMARK_ENTRIES = 200
+
+
+@pytest.mark.slow
+def test_tier_benchmark(tier, tmp_path):
+    tiers = [MemoryTier(BENCHMARK_ENTRIES), tier, FileTier(str(tmp_path))]
+    keys = [f'{NAMESPACE}:1:{i}' for i in range(BENCHMARK_ENTRIES)]
+    expires_at = time.time() + 300
+
+    gets = {}
+    for cache_tier in tiers:
+        pending = iter(keys)
+        summarize(f'{cache_tier.name} set', latencies(
+            lambda: cache_tier.set(next(pending), BENCHMARK_VALUE, expires_at), BENCHMARK_ENTRIES, warmup=0
+        ))
+        for key in keys[::37]:
+            value, stored_expires_at = cache_tier.get(key)
+            assert value == BENCHMARK_VALUE
+            assert stored_expires_at == pytest.approx(expires_at, abs=1e-3)
+
+        pending = iter(keys)
+        gets[cache_tier.name] = summarize(f'{cache_tier.name} get', latencies(
+            lambda: cache_tier.get(next(pending)), BENCHMARK_ENTRIES, warmup=0
+        ))
+        cache_tier.clear(NAMESPACE)
+        assert cache_tier.get(keys[0]) == (_MISSING, None)
+
+    assert gets['memory']['p50'] < gets['database']['p50']
+    assert gets['memory']['p50'] < gets['file']['p50']
+    assert gets['memory']['p99'] < gets['database']['p50']
+
+
+def test_long_grouped_search_queries_are_cached(client):
+    query = 'love ' * 120
+    first = client.get('/api/bible/search/grouped', query_string={'q': query})
+    assert first.status_code == 200
+
+    cached = client.get('/api/bible/search/grouped', query_string={'q': query.upper()})
+    assert cached.status_code == 200
+    assert cached.get_json()['book_groups'] == first.get_json()['book_groups']
+
+
+def test_long_keys_are_hashed_to_fit_the_key_column():
+    cache = Cache('test-long-keys', memory_entries=10)
+    long_key = cache.full_key('love ' * 120)
+    assert len(long_key) <= CacheEntry.__table__.c.key.type.length
+    assert long_key != cache.full_key('love ' * 121)
+    assert cache.full_key('short') == 'test-long-keys:1:short'
@@ -0,0 +1,63 @@
+"""Chapter and verse reads from the canon store against the ORM reads they replaced."""
+import pytest
+
+from canon import get_canon
+from models import db, Chapter, Verse
+from tests.benchmark import latencies, summarize
+from tests.seed import verse_id
+
+pytestmark = pytest.mark.slow
+
+RUNS = 500
+
+
+def orm_chapter(chapter_id):
+    chapter = db.session.get(Chapter, chapter_id)
+    chapter_data = chapter.to_dict()
+    chapter_data['verses'] = [verse.to_dict() for verse in chapter.verses]
+    chapter_data['book'] = chapter.book.to_dict()
+    db.session.remove()
+    return chapter_data
+
+
+def canon_chapter(chapter_id):
+    canon = get_canon()
+    chapter_position = canon.get_chapter(chapter_id)
+    chapter_data = canon.chapter_dict(chapter_position)
+    chapter_data['verses'] = [canon.verse_dict(position) for position in canon.chapter_verses(chapter_position)]
+    chapter_data['book'] = canon.book_dict(canon.chapter_book(chapter_position))
+    return chapter_data
+
+
+def orm_verse(verse_id):
+    verse = db.session.get(Verse, verse_id)
+    verse_data = verse.to_dict()
+    verse_data['chapter'] = verse.chapter.to_dict()
+    verse_data['book'] = verse.chapter.book.to_dict()
+    db.session.remove()
+    return verse_data
+
+
+def canon_verse(verse_id):
+    canon = get_canon()
+    position = canon.get_verse(verse_id)
+    chapter_position = canon.verse_chapters[position]
+    verse_data = canon.verse_dict(position)
+    verse_data['chapter'] = canon.chapter_dict(chapter_position)
+    verse_data['book'] = canon.book_dict(canon.chapter_book(chapter_position))
+    return verse_data
+
+
+@pytest.mark.parametrize('name, orm_read, canon_read, key', [
+    ('chapter (John 3)', orm_chapter, canon_chapter, lambda: db.session.get(Verse, verse_id('John', 3, 16)).chapter_id),
+    ('verse (John 3:16)', orm_verse, canon_verse, lambda: verse_id('John', 3, 16)),
+])
+def test_canon_store_reads_beat_the_orm(app_context, name, orm_read, canon_read, key):
+    key = key()
+    assert canon_read(key) == orm_read(key)
+
+    orm = summarize(f'orm {name}', latencies(lambda: orm_read(key), RUNS))
+    canon = summarize(f'canon {name}', latencies(lambda: canon_read(key), RUNS))
+
+    assert canon['p50'] * 10 < orm['p50']
+    assert canon['p99'] < orm['p99']
@@ -0,0 +1,139 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+import data_version
+from models import db, MessianicProphecy
+from tests.seed import verse_id
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def stored_version():
+    return db.session.execute(db.text('SELECT version FROM data_version WHERE id = 1')).scalar()
+
+
+def test_sync_fulfillments_bumps_the_version_with_the_callers_commit(app_context):
+    before = stored_version()
+
+    MessianicProphecy.query.first().sync_fulfillments()
+    db.session.rollback()
+    assert stored_version() == before
+
+    MessianicProphecy.query.first().sync_fulfillments()
+    db.session.commit()
+    assert stored_version() == before + 1
+
+
+def fulfillment_ref(book, chapter, verse_start, verse_end):
+    return {'book_name': book, 'chapter': chapter, 'verse_start': verse_start, 'verse_end': verse_end,
+            'verse_start_id': verse_id(book, chapter, verse_start), 'fulfillment_type': 'direct'}
+
+
+def test_sync_fulfillments_query_count_does_not_grow_with_references(app_context, query_counter):
+    prophecy = MessianicProphecy.query.first()
+    counts = []
+    for refs in (
+        [fulfillment_ref('Hebrews', 1, 5, 5)],
+        [fulfillment_ref('Hebrews', 1, 5, 5), fulfillment_ref('John', 3, 16, 16),
+         fulfillment_ref('Romans', 1, 10, 11), {'verse_start_id': None, 'fulfillment_type': 'direct'}]
+    ):
+        prophecy.fulfillment_references = refs
+        db.session.flush()
+        prophecy.fulfillments  # Load the current rows outside the count
+        with query_counter() as queries:
+            prophecy.sync_fulfillments()
+        counts.append(queries.count)
+        db.session.flush()
+
+    assert counts[0] == counts[1]
+    assert [(f.verse_start_id, f.verse_end_id, f.position) for f in prophecy.fulfillments] == [
+        (verse_id('Hebrews', 1, 5), verse_id('Hebrews', 1, 5), 0),
+        (verse_id('John', 3, 16), verse_id('John', 3, 16), 1),
+        (verse_id('Romans', 1, 10), verse_id('Romans', 1, 11), 2)
+    ]
+    db.session.rollback()
+
+
+def test_bump_data_version_is_picked_up_by_the_worker(app_context):
+    version = data_version.get_data_version()
+    assert data_version.bump_data_version() == stored_version()
+    assert data_version.get_data_version() == version + 1
+
+
+@pytest.fixture
+def migrations_database(database_url):
+    """A second database on the test server, with the current schema stamped at head"""
+    admin = create_engine(database_url, isolation_level='AUTOCOMMIT')
+    with admin.connect() as connection:
+        connection.exec_driver_sql('DROP DATABASE IF EXISTS libros_migrations')
+        connection.exec_driver_sql('CREATE DATABASE libros_migrations')
+
+    url = make_url(database_url).set(database='libros_migrations')
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('INSERT INTO data_version (id, version, updated_at) VALUES (1, 1, now())')
+
+    def flask_db(*args):
+        env = dict(os.environ, DATABASE_URL=url.render_as_string(hide_password=False), FLASK_APP='app.py')
+        subprocess.run([sys.executable, '-m', 'flask', 'db', *args], cwd=REPO_ROOT, env=env, check=True,
+                       capture_output=True)
+        with engine.connect() as connection:
+            return connection.exec_driver_sql('SELECT version FROM data_version').scalar()
+
+    yield flask_db
+
+    engine.dispose()
+    with admin.connect() as connection:
+        connection.exec_driver_sql('DROP DATABASE libros_migrations')
+    admin.dispose()
+
+
+def test_applying_migrations_bumps_the_version(migrations_database):
+    assert migrations_database('stamp', 'head') == 1
+    assert migrations_database('downgrade') == 2
+    assert migrations_database('upgrade') == 3
+    # Nothing to apply, nothing to bump
+    assert migrations_database('upgrade') == 3
+
+
+def test_stores_are_rebuilt_without_blocking_other_requests(monkeypatch):
+    building = threading.Event()
+    release = threading.Event()
+    installed = []
+
+    def build_stores():
+        building.set()
+        assert release.wait(5)
+        return 'stores'
+
+    monkeypatch.setattr(data_version, '_version', 5)
+    monkeypatch.setattr(data_version, '_checked_at', float('-inf'))
+    monkeypatch.setattr(data_version, '_read_version', lambda: 6)
+    monkeypatch.setattr(data_version, '_build_stores', build_stores)
+    monkeypatch.setattr(data_version, '_install_stores', installed.append)
+
+    results = []
+    rebuilding = threading.Thread(target=lambda: results.append(data_version.get_data_version()))
+    rebuilding.start()
+    assert building.wait(5)
+
+    # Served from memory with the old version while the new stores are built
+    assert data_version.get_data_version() == 5
+    monkeypatch.setattr(data_version, '_checked_at', float('-inf'))
+    assert data_version.get_data_version() == 5
+    assert installed == []
+
+    release.set()
+    rebuilding.join(5)
+    assert results == [6]
+    assert installed == ['stores']
+    assert data_version.get_data_version() == 6
@@ -0,0 +1,80 @@
+"""No pooled connection is held while a model call runs."""
+import pytest
+from sqlalchemy.orm.exc import DetachedInstanceError
+
+import ai_client
+from ai_client import ConsensusAnalysis, MultiPerspectiveAnalysis, TheologicalAnalysis
+from db_pool import release_db_connection
+from models import db, Verse
+from tests.seed import verse_id
+
+
+class FakeGemini:
+    """Records how many app-pool connections were checked out during each model call"""
+
+    def __init__(self):
+        self.checked_out = []
+
+    def _record(self):
+        self.checked_out.append(db.engine.pool.checkedout())
+
+    def _analyses(self, perspectives, text):
+        return MultiPerspectiveAnalysis(analyses=[
+            TheologicalAnalysis(perspective_name=perspective, response_text=text, cross_references=[])
+            for perspective in perspectives
+        ])
+
+    def generate_verse_summary(self, verse_text, reference, perspectives, strongs_data=None, mode=None):
+        self._record()
+        return self._analyses(perspectives, f'summary of {reference}')
+
+    def generate_question_response(self, verse_text, reference, question, perspectives, strongs_data=None):
+        self._record()
+        return self._analyses(perspectives, f'answer to {question}')
+
+    def generate_scholarly_consensus_analysis(self, verse_text, reference, existing_analyses):
+        self._record()
+        return ConsensusAnalysis(
+            overall_consensus_score=0.5, consensus_classification='moderate', summary='summary',
+            theological_dimensions=[], interpretive_approach_alignment=0.5, literal_vs_figurative=[],
+            historical_context_emphasis=[], application_focus=[], cross_reference_overlap=0.0,
+            early_church_alignment=[], reformation_era_impact=[], modern_theological_development=[],
+            historical_trajectory='trajectory', creedal_connections=[]
+        )
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    fake = FakeGemini()
+    for name in ('generate_verse_summary', 'generate_question_response', 'generate_scholarly_consensus_analysis'):
+        monkeypatch.setattr(ai_client.gemini_client, name, getattr(fake, name))
+    return fake
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/analysis/summary', {'verse_range_start': verse_id('Romans', 1, 1)}),
+    ('/api/analysis/question', {'verse_range_start': verse_id('Romans', 1, 2), 'question': 'Who is the author?'}),
+    ('/api/analysis/scholarly-consensus', {
+        'verse_range_start': verse_id('Romans', 1, 3), 'perspectives': ['catholic', 'baptist']
+    }),
+])
+def test_no_connection_is_checked_out_during_the_model_call(client, fake_gemini, path, body):
+    response = client.post(path, json=body)
+
+    assert response.status_code == 200, response.get_json()
+    assert fake_gemini.checked_out
+    assert set(fake_gemini.checked_out) == {0}
+
+
+def test_released_objects_fail_instead_of_reloading(app_context):
+    verse = db.session.get(Verse, verse_id('John', 3, 16))
+    text = verse.text
+    checked_out = db.engine.pool.checkedout()
+
+    release_db_connection()
+
+    assert db.engine.pool.checkedout() == checked_out - 1
+    assert verse.text == text
+    with pytest.raises(DetachedInstanceError):
+        verse.chapter
+    assert db.engine.pool.checkedout() == checked_out - 1
@@ -0,0 +1,52 @@
+import gzip
+import json
+
+CHAPTER_URL = '/api/bible/books/1/chapters/1'
+GZIP = {'Accept-Encoding': 'gzip'}
+IDENTITY = {'Accept-Encoding': 'identity'}
+
+
+def test_matching_etag_is_answered_with_304(client):
+    response = client.get('/api/bible/books')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'public, max-age=86400'
+
+    cached = client.get('/api/bible/books', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == response.headers['ETag']
+    assert cached.headers['Cache-Control'] == response.headers['Cache-Control']
+
+
+def test_etag_depends_on_url(client):
+    assert client.get('/api/bible/books/1').headers['ETag'] != client.get('/api/bible/books/2').headers['ETag']
+
+
+def test_chapter_gzip_and_identity_have_different_etags(client):
+    compressed = client.get(CHAPTER_URL, headers=GZIP)
+    plain = client.get(CHAPTER_URL, headers=IDENTITY)
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in plain.headers
+    assert json.loads(gzip.decompress(compressed.get_data())) == plain.get_json()
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+
+def test_chapter_etag_does_not_validate_the_other_coding(client):
+    compressed = client.get(CHAPTER_URL, headers=GZIP)
+
+    # A cache holding the gzip body must not get a 304 for an identity request
+    plain = client.get(CHAPTER_URL, headers=dict(IDENTITY, **{'If-None-Match': compressed.headers['ETag']}))
+    assert plain.status_code == 200
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.get_json()['chapter']['chapter_number'] == 1
+
+
+def test_chapter_304_keeps_vary(client):
+    compressed = client.get(CHAPTER_URL, headers=GZIP)
+
+    cached = client.get(CHAPTER_URL, headers=dict(GZIP, **{'If-None-Match': compressed.headers['ETag']}))
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == compressed.headers['ETag']
+    assert 'Accept-Encoding' in cached.headers['Vary']
@@ -0,0 +1,107 @@
+"""Strong's lexicon search over a recorded query set: ranking, and latency against the old ILIKE scan.
+
+The seeded lexicon is padded to the size of the real one (~14k entries) with
+synthetic entries inside a transaction that is rolled back afterwards. Their
+transliterations and definitions share no words or trigrams with the recorded
+queries, so rankings are decided by the seeded entries alone.
+"""
+import random
+
+import pytest
+from sqlalchemy import insert, or_
+
+from models import db, StrongsConcordance, StrongsEntry
+from search_service import search_strongs_entries
+from tests.benchmark import latencies, summarize
+
+pytestmark = pytest.mark.slow
+
+LEXICON_SIZE = 14000
+RUNS = 10  # Passes over the whole query set
+
+# (query, language, sort, Strong's numbers expected first, in order)
+RECORDED_QUERIES = [
+    ('G25', 'both', 'relevance', ['G25']),
+    ('h430', 'both', 'relevance', ['H430']),
+    ('agapao', 'both', 'relevance', ['G25']),
+    ('agapo', 'both', 'relevance', ['G25']),  # Misspelled transliteration, matched by trigram similarity
+    ('theos', 'both', 'relevance', ['G2316']),
+    ('kosmos', 'both', 'relevance', ['G2889']),
+    ('love', 'both', 'relevance', ['G25']),
+    ('faith', 'both', 'relevance', ['G4102']),
+    ('create', 'both', 'relevance', ['H1254']),
+    ('darkness', 'both', 'relevance', ['H2822']),
+    ('heavens', 'both', 'relevance', ['H8064']),
+    ('beginning', 'both', 'relevance', ['H7225']),
+    ('god', 'greek', 'relevance', ['G2316']),
+    ('god', 'hebrew', 'relevance', ['H430']),
+    ('lust OR desire', 'both', 'relevance', ['G1939']),
+    ('son', 'both', 'frequency', ['G5207', 'H1121']),
+]
+
+# Letters that appear in none of the recorded queries' transliterations
+SYNTHETIC_LETTERS = 'bdfnruvwyz'
+
+
+def synthetic_word(rng):
+    return ''.join(rng.choice(SYNTHETIC_LETTERS) for _ in range(rng.randint(4, 9)))
+
+
+def synthetic_entries(count, seed=430):
+    rng = random.Random(seed)
+    for index in range(count):
+        yield {
+            'strongs_number': f'X{index}',
+            'language': rng.choice(['Hebrew', 'Greek']),
+            'transliteration': synthetic_word(rng),
+            'pronunciation': synthetic_word(rng),
+            'definition': ' '.join(synthetic_word(rng) for _ in range(rng.randint(5, 15))),
+            'kjv_usage': ', '.join(synthetic_word(rng) for _ in range(rng.randint(1, 4)))
+        }
+
+
+@pytest.fixture(scope='module')
+def full_lexicon(app):
+    with app.app_context():
+        seeded = StrongsEntry.query.count()
+        db.session.execute(insert(StrongsEntry), list(synthetic_entries(LEXICON_SIZE - seeded)))
+        for number, total_verses in (('H1121', 40), ('G5207', 90)):
+            db.session.merge(StrongsConcordance(strongs_number=number, total_verses=total_verses, total_books=1,
+                                                book_groups=[]))
+        # Merge the bulk insert into the GIN indexes, as VACUUM would after a real import
+        for index in ('ix_strongs_entries_definition_search', 'ix_strongs_entries_transliteration_trgm'):
+            db.session.execute(db.text('SELECT gin_clean_pending_list(CAST(:index AS regclass))'), {'index': index})
+        db.session.execute(db.text('ANALYZE strongs_entries'))
+        try:
+            yield
+        finally:
+            db.session.rollback()
+
+
+def ilike_search(query, limit=20):
+    """The search this replaced: three unindexed substring scans, in no particular order"""
+    return StrongsEntry.query.filter(or_(
+        StrongsEntry.definition.ilike(f'%{query}%'),
+        StrongsEntry.transliteration.ilike(f'%{query}%'),
+        StrongsEntry.kjv_usage.ilike(f'%{query}%')
+    )).limit(limit).all()
+
+
+@pytest.mark.parametrize('query, language, sort, expected', RECORDED_QUERIES)
+def test_recorded_query_ranking(full_lexicon, query, language, sort, expected):
+    numbers = [entry.strongs_number for entry in search_strongs_entries(query, language=language, sort=sort)]
+    assert numbers[:len(expected)] == expected
+    assert not any(number.startswith('X') for number in numbers)
+
+
+def test_ranked_search_is_faster_than_the_ilike_scan(full_lexicon):
+    queries = [query for query, _, _, _ in RECORDED_QUERIES]
+
+    def run(search):
+        for query in queries:
+            search(query)
+
+    old = summarize(f'ilike scan, {len(queries)} queries', latencies(lambda: run(ilike_search), RUNS, warmup=1))
+    new = summarize(f'ranked search, {len(queries)} queries', latencies(lambda: run(search_strongs_entries), RUNS, warmup=1))
+
+    assert new['p50'] * 5 < old['p50']
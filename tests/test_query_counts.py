@@ -0,0 +1,69 @@
+"""Query-count regression tests for the bible, search and strongs blueprints.
+
+Each endpoint is requested once to warm the in-memory stores and caches, then
+counted on a second request. Serialization must never lazy-load per row, so
+counts are fixed no matter how many verses, books or entries are returned.
+"""
+import pytest
+
+ENDPOINT_QUERIES = [
+    # Served from the canon store (and the chapter cache) once warm
+    ('/api/bible/books', 0),
+    ('/api/bible/books/1', 0),
+    ('/api/bible/books/1/chapters', 0),
+    ('/api/bible/books/1/chapters/1', 0),
+    ('/api/bible/chapters/1', 0),
+    ('/api/bible/chapters/1/verses', 0),
+    ('/api/bible/verses/1', 0),
+    ('/api/bible/verses/range?start=1&end=40', 0),
+    ('/api/bible/books/resolve/genesis', 0),
+    ('/api/bible/reference?ref=Gen%201:1-2:3', 0),
+    # Full-text search: a count and one page of ids
+    ('/api/bible/search?q=God', 2),
+    ('/api/bible/search/grouped?q=God', 0),
+    ('/api/search/books?q=gen', 1),
+    ('/api/search/verses?q=light', 1),
+    ('/api/search/chapters?q=gen', 1),
+    ('/api/search/suggestions?q=gen', 0),
+    ('/api/search/comprehensive?q=God', 3),
+    # Strong's
+    ('/api/strongs/lookup/H430', 3),
+    ('/api/strongs/search?q=god', 1),
+    ('/api/strongs/concordance/H430', 1),
+    ('/api/strongs/concordance/H430/book/Genesis', 1),
+    ('/api/strongs/verse/1/strongs', 1),
+    ('/api/strongs/chapter/1/strongs', 1),
+]
+
+
+@pytest.mark.parametrize('url, expected', ENDPOINT_QUERIES)
+def test_endpoint_query_count(client, query_counter, url, expected):
+    assert client.get(url).status_code == 200
+
+    with query_counter() as queries:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert queries.count == expected, queries.statements
+
+
+@pytest.mark.parametrize('small, large', [
+    ('/api/bible/verses/range?start=1&end=1', '/api/bible/verses/range?start=1&end=200'),
+    ('/api/bible/chapters/2/verses', '/api/bible/chapters/1/verses'),
+    ('/api/bible/search?q=light', '/api/bible/search?q=word&limit=50'),
+    ('/api/search/verses?q=light', '/api/search/verses?q=word'),
+    ('/api/search/books?q=genesis', '/api/search/books?q=o'),
+    ('/api/strongs/chapter/2/strongs', '/api/strongs/chapter/1/strongs'),
+])
+def test_query_count_does_not_grow_with_results(client, query_counter, small, large):
+    client.get(small)
+    client.get(large)
+
+    with query_counter() as small_queries:
+        small_response = client.get(small)
+    with query_counter() as large_queries:
+        large_response = client.get(large)
+
+    assert small_response.status_code == large_response.status_code == 200
+    assert len(large_response.get_data()) > len(small_response.get_data())
+    assert large_queries.count == small_queries.count
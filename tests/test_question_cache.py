@@ -0,0 +1,62 @@
+import pytest
+
+from ai_client import TheologicalPerspective
+import config
+from question_cache import QuestionCache, normalize_question
+
+PERSPECTIVE = TheologicalPerspective.CATHOLIC
+
+
+def cache():
+    return QuestionCache(max_entries=100, similarity_threshold=config.QUESTION_CACHE_SIMILARITY)
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ('Is salvation by faith?', 'Is salvation not by faith?'),
+    ('Is salvation by faith?', "Isn't salvation by faith?"),
+    ('Can a man be saved by works?', 'Can a man be saved without works?'),
+    ('Why did Jesus weep?', 'How did Jesus weep?'),
+    ('Who wrote this psalm?', 'When was this psalm written?'),
+    ('What happened before the flood?', 'What happened after the flood?'),
+    ('Was Abraham justified before circumcision?', 'Was Abraham justified after circumcision?'),
+    ('Did all the disciples believe?', 'Did some of the disciples believe?'),
+    ('Is faith more important than works?', 'Is faith less important than works?'),
+])
+def test_questions_that_differ_in_meaning_miss(cached, asked):
+    questions = cache()
+    questions.put(1, 3, PERSPECTIVE, cached, 'answer')
+
+    assert questions.get(1, 3, PERSPECTIVE, asked) == (None, None)
+    assert normalize_question(cached) != normalize_question(asked)
+
+
+@pytest.mark.parametrize('cached, asked, match', [
+    ('What does this verse mean?', 'what does THIS verse mean', 'exact'),
+    ('Is salvation not by faith?', "Isn't salvation by faith", 'similar'),
+    ('Why did Jesus weep at the tomb of Lazarus?', 'Why did Jesus weep at Lazarus tomb?', 'similar'),
+])
+def test_rephrasings_hit(cached, asked, match):
+    questions = cache()
+    questions.put(1, 3, PERSPECTIVE, cached, 'answer')
+
+    assert questions.get(1, 3, PERSPECTIVE, asked) == ('answer', match)
+
+
+def test_entries_are_scoped_to_verse_range_and_perspective():
+    questions = cache()
+    questions.put(1, 3, PERSPECTIVE, 'Why did Jesus weep?', 'answer')
+
+    assert questions.get(1, 4, PERSPECTIVE, 'Why did Jesus weep?') == (None, None)
+    assert questions.get(1, 3, TheologicalPerspective.EASTERN_ORTHODOX, 'Why did Jesus weep?') == (None, None)
+
+
+def test_least_recently_used_entries_are_evicted():
+    questions = QuestionCache(max_entries=2)
+    questions.put(1, 1, PERSPECTIVE, 'Who is speaking?', 'a')
+    questions.put(1, 1, PERSPECTIVE, 'Who is listening?', 'b')
+    questions.get(1, 1, PERSPECTIVE, 'Who is speaking?')
+    questions.put(1, 1, PERSPECTIVE, 'Where are they?', 'c')
+
+    assert questions.get(1, 1, PERSPECTIVE, 'Who is listening?') == (None, None)
+    assert questions.get(1, 1, PERSPECTIVE, 'Who is speaking?') == ('a', 'exact')
+    assert questions.stats()['evictions'] == 1
@@ -0,0 +1,166 @@
+import random
+import time
+
+import pytest
+
+from references import (
+    COMMON_ALIASES, MAX_REFERENCE_LENGTH, InvalidReference, ReferenceNotFound, ReferenceResolver, VerseRange
+)
+
+
+@pytest.fixture(scope='module')
+def resolver(canon):
+    return ReferenceResolver(canon)
+
+
+def resolve(resolver, text):
+    return [resolver.format(verse_range) for verse_range in resolver.resolve(text)]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('John 3:16', ['John 3:16']),
+    ('1 Jn 2:16', ['1 John 2:16']),
+    ('1jn 2:16', ['1 John 2:16']),
+    ('I John 2:16', ['1 John 2:16']),
+    ('First John 2:16', ['1 John 2:16']),
+    ('1st John 2:16', ['1 John 2:16']),
+    ('Gen 1:1-2:3', ['Genesis 1:1-2:3']),
+    ('Gen 1:1–3', ['Genesis 1:1-3']),
+    ('Gen. 1.1', ['Genesis 1:1']),
+    ('Ps 2', ['Psalms 2']),
+    ('Psalm 2:7', ['Psalms 2:7']),
+    ('Gen 1-2', ['Genesis 1:1-2:25']),
+    ('Rom 1:28, 31; 1:1-2', ['Romans 1:28', 'Romans 1:31', 'Romans 1:1-2']),
+    ('John 3:16; Rom 1:17', ['John 3:16', 'Romans 1:17']),
+    ('Rom 1; 2', ['Romans 1', 'Romans 2']),
+    ('Jude 5', ['Jude 1:5']),
+    ('Jude 3-5', ['Jude 1:3-5']),
+    ('Jude 1:5', ['Jude 1:5']),
+    ('jude 1', ['Jude 1:1']),
+    ('Song of Solomon 2:1', ['Song of Solomon 2:1']),
+    ('Hab 1:1', ['Habakkuk 1:1']),
+    ('Heb 1:5', ['Hebrews 1:5']),
+    ('Hb 1:5', ['Hebrews 1:5']),
+])
+def test_resolve(resolver, text, expected):
+    assert resolve(resolver, text) == expected
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('I John', '1 John'),
+    ('First John', '1 John'),
+    ('1st John', '1 John'),
+    ('1 Jn', '1 John'),
+    ('II Kings', '2 Kings'),
+    ('Second Samuel', '2 Samuel'),
+    ('III John', '3 John'),
+    ('Gen', 'Genesis'),
+    ('Deut', 'Deuteronomy'),
+    ('Ps', 'Psalms'),
+    ('Hab', 'Habakkuk'),
+    ('Hb', 'Hebrews'),
+    ('Phil', 'Philippians'),
+    ('Phlm', 'Philemon'),
+    ('Rev', 'Revelation'),
+])
+def test_find_book(resolver, name, expected):
+    assert resolver.find_book(name).name == expected
+
+
+@pytest.mark.parametrize('name', ['Jo', 'J', 'Ph', 'Xyz', ''])
+def test_ambiguous_or_unknown_book_names(resolver, name):
+    assert resolver.find_book(name) is None
+
+
+def test_common_aliases_name_one_book_each():
+    variants = [variant for aliases in COMMON_ALIASES.values() for variant in aliases]
+    assert len(variants) == len(set(variants))
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '   ',
+    'John',
+    '3:16',
+    'John 3:16 and more',
+    'John 3:16-',
+    'John :16',
+    'John 3:16,,',
+    'Gen 2:3-1:1',
+    'Gen 1:5-3',
+    'x' * (MAX_REFERENCE_LENGTH + 1),
+])
+def test_invalid_references(resolver, text):
+    with pytest.raises(InvalidReference):
+        resolver.resolve(text)
+
+
+@pytest.mark.parametrize('text', [
+    'Hezekiah 1:1',
+    'Jo 3:16',
+    'Gen 99',
+    'Gen 1:99',
+    'Gen 1:1-99:1',
+    'Jude 26',
+    'Jude 2:1',
+    'Rom 1:28, 99',
+])
+def test_references_that_do_not_exist(resolver, text):
+    with pytest.raises(ReferenceNotFound):
+        resolver.resolve(text)
+
+
+FUZZ_ALPHABET = "abcdefghijklmnopqrstuvwxyz JOHNGEN0123456789:.,;-–—'\t\néЖ"
+FUZZ_FRAGMENTS = ['1 ', 'I ', 'first ', 'john', 'gen', 'ps', 'jude', ' 3', ':16', '-', ', ', '; ', '.', '2:3', ' ']
+
+
+def fuzz_inputs(count, seed=2316):
+    rng = random.Random(seed)
+    for _ in range(count):
+        if rng.random() < 0.5:
+            yield ''.join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 40)))
+        else:
+            yield ''.join(rng.choice(FUZZ_FRAGMENTS) for _ in range(rng.randint(1, 12)))
+
+
+PATHOLOGICAL_INPUTS = [
+    'a' + ' ' * MAX_REFERENCE_LENGTH,
+    'a' + ' ' * (MAX_REFERENCE_LENGTH - 2) + 'x',
+    'a ' * (MAX_REFERENCE_LENGTH // 2),
+    '1' * MAX_REFERENCE_LENGTH,
+    'Gen ' + '9' * 200,
+    'Gen 1' + ':1' * 400,
+    'Gen 1:1' + ', 2' * 300,
+    'Gen 1:1' + '; 1:1' * 150,
+    ';' * MAX_REFERENCE_LENGTH,
+    '.' * MAX_REFERENCE_LENGTH,
+    "a'" * (MAX_REFERENCE_LENGTH // 2),
+    'first first first john 1',
+    '\x00\x01 john 3:16',
+    '١٢:٣',  # Arabic-Indic digits
+]
+
+
+def check_resolves_cleanly(resolver, canon, text):
+    """Only InvalidReference or ReferenceNotFound may escape, quickly; results are in bounds"""
+    start = time.perf_counter()
+    try:
+        ranges = resolver.resolve(text)
+    except (InvalidReference, ReferenceNotFound):
+        ranges = []
+    assert time.perf_counter() - start < 0.5, text
+
+    for verse_range in ranges:
+        assert isinstance(verse_range, VerseRange), text
+        assert 0 <= verse_range.start_position <= verse_range.end_position < len(canon.verse_ids), text
+        assert resolver.format(verse_range), text
+
+
+def test_fuzz_random_input(resolver, canon):
+    for text in fuzz_inputs(5000):
+        check_resolves_cleanly(resolver, canon, text)
+
+
+@pytest.mark.parametrize('text', PATHOLOGICAL_INPUTS)
+def test_fuzz_pathological_input(resolver, canon, text):
+    check_resolves_cleanly(resolver, canon, text)
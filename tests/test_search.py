@@ -0,0 +1,76 @@
+import pytest
+
+import autocomplete
+from models import db, StrongsConcordance
+import routes.search
+from search_service import search_strongs_entries
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.limits = []
+
+    def suggest(self, query, limit=10):
+        self.limits.append(limit)
+        return []
+
+
+@pytest.mark.parametrize('params, expected', [
+    ({}, 10),
+    ({'limit': 3}, 3),
+    ({'limit': 1}, 1),
+    ({'limit': 0}, 1),
+    ({'limit': -5}, 1),
+    ({'limit': 100}, 25),
+    ({'limit': 'many'}, 10),
+])
+def test_suggestion_limit_is_clamped(client, monkeypatch, params, expected):
+    index = RecordingIndex()
+    monkeypatch.setattr(routes.search, 'get_autocomplete_index', lambda: index)
+
+    response = client.get('/api/search/suggestions', query_string=dict(params, q='jo'))
+    assert response.status_code == 200
+    assert index.limits == [expected]
+
+
+def test_suggestions_respect_the_limit(client):
+    def suggestions(**params):
+        return client.get('/api/search/suggestions', query_string=dict({'q': 'jo'}, **params)).get_json()['suggestions']
+
+    assert len(suggestions()) == 10
+    assert len(suggestions(limit=3)) == 3
+    assert len(suggestions(limit=-5)) == 1
+    assert suggestions(q='j') == []
+
+
+def test_preload_builds_the_index_before_the_first_request(app, monkeypatch):
+    monkeypatch.setattr(autocomplete, '_index', None)
+
+    autocomplete.start_autocomplete_preload(app).join(30)
+
+    assert autocomplete._index is not None
+    with app.app_context():
+        assert autocomplete.get_autocomplete_index() is autocomplete._index
+
+
+def frequency_order(query):
+    return [entry.strongs_number for entry in search_strongs_entries(query, sort='frequency')]
+
+
+@pytest.fixture
+def no_concordance(app_context):
+    """No concordance rows, as before `flask build-concordance` has run"""
+    StrongsConcordance.query.delete()
+    yield
+    db.session.rollback()
+
+
+def test_frequency_sort_counts_mappings_without_a_concordance(no_concordance):
+    # G5207 has two seeded mappings, H1121 one
+    assert frequency_order('son')[:2] == ['G5207', 'H1121']
+
+
+def test_frequency_sort_prefers_the_concordance_row(no_concordance):
+    db.session.add(StrongsConcordance(strongs_number='H1121', total_verses=40, total_books=1, book_groups=[]))
+    db.session.flush()
+    assert frequency_order('son')[:2] == ['H1121', 'G5207']
@@ -0,0 +1,120 @@
+"""Load tests for summary single-flight: many identical requests, one generation per perspective."""
+from collections import Counter
+import threading
+import time
+
+import pytest
+
+from ai_client import TheologicalAnalysis, TheologicalPerspective
+from models import db, PerspectiveSummary
+import summary_cache
+from singleflight import SingleFlight
+from tests.seed import verse_id
+
+pytestmark = pytest.mark.slow
+
+PERSPECTIVES = [TheologicalPerspective.CATHOLIC, TheologicalPerspective.BAPTIST]
+GENERATE_SECONDS = 0.3
+
+
+class Generator:
+    """A slow stand-in for the model that counts calls per perspective"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, perspectives):
+        with self._lock:
+            self.calls.update(perspectives)
+        time.sleep(GENERATE_SECONDS)
+        return [
+            TheologicalAnalysis(perspective_name=perspective, response_text=f'{perspective.value} summary',
+                                cross_references=[])
+            for perspective in perspectives
+        ]
+
+
+class WorkerFlights:
+    """One SingleFlight per simulated worker, picked by the calling thread, so only advisory locks coordinate workers"""
+
+    def __init__(self):
+        self._flights = {}
+        self._local = threading.local()
+
+    def join(self, worker):
+        self._local.worker = worker
+        self._flights.setdefault(worker, SingleFlight())
+
+    def claim(self, keys):
+        return self._flights[self._local.worker].claim(keys)
+
+    def resolve(self, key, result=None, error=None):
+        self._flights[self._local.worker].resolve(key, result=result, error=error)
+
+
+def run_identical_requests(app, start_verse_id, workers, threads_per_worker, flights=None):
+    generate = Generator()
+    barrier = threading.Barrier(workers * threads_per_worker)
+    results = []
+    errors = []
+
+    def request(worker):
+        with app.app_context():
+            if flights is not None:
+                flights.join(worker)
+            barrier.wait()
+            try:
+                analyses, _ = summary_cache.get_or_generate_analyses(
+                    start_verse_id, start_verse_id, PERSPECTIVES, generate
+                )
+                results.append({p: a.response_text for p, a in analyses.items()})
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [
+        threading.Thread(target=request, args=(worker,))
+        for worker in range(workers) for _ in range(threads_per_worker)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    elapsed = time.monotonic() - start
+
+    assert errors == []
+    assert len(results) == len(threads)
+    assert all(result == results[0] for result in results)
+    return generate.calls, elapsed
+
+
+def stored_rows(app, start_verse_id):
+    with app.app_context():
+        return PerspectiveSummary.query.filter_by(verse_range_start=start_verse_id).count()
+
+
+def test_identical_requests_in_one_worker_generate_once(app):
+    start_verse_id = verse_id('Romans', 1, 10)
+
+    calls, elapsed = run_identical_requests(app, start_verse_id, workers=1, threads_per_worker=24)
+
+    assert calls == Counter(PERSPECTIVES)
+    assert elapsed < GENERATE_SECONDS * 3
+    assert stored_rows(app, start_verse_id) == len(PERSPECTIVES)
+
+
+def test_identical_requests_across_workers_generate_once(app, monkeypatch):
+    start_verse_id = verse_id('Romans', 1, 11)
+    monkeypatch.setattr(summary_cache, '_flights', WorkerFlights())
+
+    calls, elapsed = run_identical_requests(
+        app, start_verse_id, workers=4, threads_per_worker=6, flights=summary_cache._flights
+    )
+
+    # Each worker's leader waits on the advisory lock, then finds the first leader's rows
+    assert calls == Counter(PERSPECTIVES)
+    assert stored_rows(app, start_verse_id) == len(PERSPECTIVES)
+    print(f"24 requests over 4 workers: {calls.total()} generations in {elapsed * 1000:.0f} ms")